@@ -0,0 +1,210 @@
+"""
+Analysis Store module
+
+This module persists AI analysis results in a small SQLite database (through
+SQLAlchemy Core, like the trade store) so they survive restarts. Entries are
+keyed by symbol and by a fingerprint of the closed candles of the indicator
+frame that was sent to the model, which means a poll that only moved the
+still-open candle never triggers a second LLM call. A reused result is
+restamped, so it counts as fresh again. The store is bounded by entry count
+and total payload size, evicting the least recently used entries first.
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import (
+    create_engine, event, inspect, MetaData, Table, Column, Integer, Float, String, Text,
+    Index, select, update, delete, func
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+metadata = MetaData()
+
+analyses_table = Table(
+    "analyses", metadata,
+    Column("symbol", String(20), primary_key=True),
+    Column("fingerprint", String(64), primary_key=True),
+    # When the result was last confirmed to match the market data
+    Column("timestamp", String(40), nullable=False),
+    # When the model produced it
+    Column("analyzed_at", String(40), nullable=False),
+    Column("last_access", Float, nullable=False),
+    Column("size", Integer, nullable=False),
+    Column("payload", Text, nullable=False),
+    Index("idx_analyses_last_access", "last_access"),
+    Index("idx_analyses_symbol_timestamp", "symbol", "timestamp"),
+)
+
+insert_or_replace = analyses_table.insert().prefix_with("OR REPLACE")
+
+
+def frame_fingerprint(frame):
+    """
+    Return a stable hash of a candle frame's columns and closed candles.
+
+    The last row is the candle that is still open; it changes with every
+    trade, so it is left out.
+    """
+    closed = frame.iloc[:-1]
+    digest = hashlib.sha256()
+    digest.update("|".join(map(str, closed.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(closed, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _json_default(value):
+    """Serialize numpy scalars, timestamps and other stragglers."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
+
+class AnalysisStore:
+    """SQLite-backed, size-bounded LRU store of AI analysis results."""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._latest = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.engine = create_engine(f"sqlite:///{self.path}", connect_args={"check_same_thread": False})
+        event.listen(self.engine, "connect", self._configure_connection)
+        self._drop_outdated_table()
+        metadata.create_all(self.engine)
+
+    @staticmethod
+    def _configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    def _drop_outdated_table(self):
+        """Drop a table written by an older layout; it only holds cached results."""
+        inspector = inspect(self.engine)
+        if not inspector.has_table(analyses_table.name):
+            return
+        stored = {column["name"] for column in inspector.get_columns(analyses_table.name)}
+        if stored != set(analyses_table.columns.keys()):
+            logger.info("Dropping AI analysis cache stored in an older layout")
+            analyses_table.drop(self.engine)
+
+    @staticmethod
+    def _decode(timestamp, analyzed_at, payload):
+        timestamp = datetime.fromisoformat(timestamp)
+        analyzed_at = datetime.fromisoformat(analyzed_at)
+        return {
+            "status": "success",
+            "data": json.loads(payload),
+            "timestamp": timestamp,
+            "analyzed_at": analyzed_at,
+            # The model was not asked again for this result
+            "reused": timestamp != analyzed_at
+        }
+
+    def get(self, symbol, fingerprint):
+        """
+        Return the stored result for (symbol, fingerprint), or None.
+
+        A hit means the market data still matches the analysis, so the entry
+        is restamped to now and becomes the symbol's latest result.
+        """
+        key = (analyses_table.c.symbol == symbol) & (analyses_table.c.fingerprint == fingerprint)
+        with self._lock, self.engine.begin() as conn:
+            row = conn.execute(select(analyses_table).where(key)).first()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            timestamp = datetime.now().isoformat()
+            conn.execute(update(analyses_table).where(key).values(timestamp=timestamp, last_access=time.time()))
+        result = self._decode(timestamp, row.analyzed_at, row.payload)
+        self._latest[symbol] = result
+        return result
+
+    def put(self, symbol, fingerprint, result):
+        """Store a formatted analysis result ({"status", "data", "timestamp"})."""
+        payload = json.dumps(result["data"], default=_json_default)
+        timestamp = result["timestamp"].isoformat()
+        with self._lock, self.engine.begin() as conn:
+            conn.execute(insert_or_replace, {
+                "symbol": symbol,
+                "fingerprint": fingerprint,
+                "timestamp": timestamp,
+                "analyzed_at": timestamp,
+                "last_access": time.time(),
+                "size": len(payload),
+                "payload": payload,
+            })
+            self._evict(conn)
+        self._latest[symbol] = result
+
+    def latest(self, symbol):
+        """Return the most recent result for a symbol, loading it from disk after a restart."""
+        result = self._latest.get(symbol)
+        if result is not None:
+            return result
+        query = (select(analyses_table)
+                 .where(analyses_table.c.symbol == symbol)
+                 .order_by(analyses_table.c.timestamp.desc())
+                 .limit(1))
+        with self._lock, self.engine.connect() as conn:
+            row = conn.execute(query).first()
+        if row is None:
+            return None
+        result = self._decode(row.timestamp, row.analyzed_at, row.payload)
+        self._latest[symbol] = result
+        return result
+
+    @staticmethod
+    def _totals(conn):
+        return conn.execute(select(func.count(), func.coalesce(func.sum(analyses_table.c.size), 0))).one()
+
+    def _evict(self, conn):
+        """Drop least recently used entries until both bounds are met. Caller holds the lock."""
+        count, total = self._totals(conn)
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = 0
+        rows = conn.execute(
+            select(analyses_table.c.symbol, analyses_table.c.fingerprint, analyses_table.c.size)
+            .order_by(analyses_table.c.last_access.asc())
+        ).all()
+        for symbol, fingerprint, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute(delete(analyses_table).where(
+                (analyses_table.c.symbol == symbol) & (analyses_table.c.fingerprint == fingerprint)))
+            count -= 1
+            total -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} AI analysis cache entr{'y' if evicted == 1 else 'ies'}")
+
+    def stats(self):
+        """Return hit/miss counters and the on-disk footprint."""
+        with self._lock, self.engine.connect() as conn:
+            count, total = self._totals(conn)
+        return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": total}
+
+    def close(self):
+        with self._lock:
+            self.engine.dispose()
@@ -0,0 +1,304 @@
+"""
+Backtest module
+
+This module replays historical candles through the technical indicators and
+the stop-loss / take-profit rules that add_position applies to live trades
+(5% stop, 10% take-profit, optional ATR-based dynamic stop and trailing
+stop), and scores the simulated trades with the utils performance metrics.
+
+Indicators and entry signals are computed over the whole series with NumPy.
+Each simulated position finds its exit with a vectorized scan forward from
+its entry, so one parameter set costs O(candles) array work. Parameter
+sweeps are spread across every core with a process pool that receives the
+candle arrays once per worker.
+"""
+
+import os
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils import get_performance_summary, calculate_profit_loss
+from indicator_engine import (
+    SMA_PERIODS, EMA_PERIODS, MACD_SIGNAL_PERIOD, RSI_PERIOD, ATR_PERIOD, BB_PERIOD, BB_STD,
+    AO_FAST_PERIOD, AO_SLOW_PERIOD, STOCH_RSI_PERIOD, STOCH_RSI_SMOOTH, MFI_PERIOD
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Defaults used by the API when it opens a position (see /api/execute-trade)
+DEFAULT_PARAMS = {
+    "stop_loss_pct": 0.05,
+    "take_profit_pct": 0.10,
+    "trailing_stop_pct": 0.0,
+    "dynamic_stop_loss": True,
+    "atr_multiplier": 3.0,
+    # Entry rule: RSI at or below this level, optionally only above the 50-period SMA
+    "rsi_entry": 30.0,
+    "trend_filter": True,
+    "position_size_usd": 1000.0,
+    "fee_pct": 0.0,
+}
+
+# First exit scan window; doubled until an exit is found
+SCAN_CHUNK = 256
+
+
+def _wilder(values, period):
+    """Wilder smoothing seeded with the mean of the first `period` values (NaN before)."""
+    result = np.full(len(values), np.nan)
+    if len(values) < period:
+        return result
+    seeded = values[period - 1:].astype(float).copy()
+    seeded[0] = values[:period].mean()
+    smoothed = pd.Series(seeded).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+    result[period - 1:] = smoothed
+    return result
+
+
+def compute_indicators(frame):
+    """
+    Compute the indicator engine's columns over a whole candle frame at once.
+
+    Uses the same definitions as indicator_engine (pandas-style SMA, EMA with
+    adjust=False, sample-std Bollinger Bands, Wilder RSI and ATR, Awesome
+    Oscillator, Stochastic RSI and MFI). MFI is left empty without a volume column.
+    """
+    close = frame["close"].astype(float)
+    high = frame["high"].astype(float) if "high" in frame.columns else close
+    low = frame["low"].astype(float) if "low" in frame.columns else close
+    result = frame.copy()
+
+    for period in SMA_PERIODS:
+        result[f"sma_{period}"] = close.rolling(period).mean()
+    for period in EMA_PERIODS:
+        result[f"ema_{period}"] = close.ewm(span=period, adjust=False).mean()
+
+    result["macd"] = result["ema_12"] - result["ema_26"]
+    result["macd_signal"] = result["macd"].ewm(span=MACD_SIGNAL_PERIOD, adjust=False).mean()
+    result["macd_hist"] = result["macd"] - result["macd_signal"]
+
+    middle = close.rolling(BB_PERIOD).mean()
+    std = close.rolling(BB_PERIOD).std()
+    result["bb_middle"] = middle
+    result["bb_upper"] = middle + BB_STD * std
+    result["bb_lower"] = middle - BB_STD * std
+
+    change = close.diff().to_numpy()[1:]
+    avg_gain = _wilder(np.maximum(change, 0.0), RSI_PERIOD)
+    avg_loss = _wilder(np.maximum(-change, 0.0), RSI_PERIOD)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    rsi[np.isnan(avg_gain)] = np.nan
+    result["rsi"] = np.concatenate(([np.nan], rsi))
+
+    prev_close = close.shift(1)
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    result["atr"] = _wilder(true_range.to_numpy(), ATR_PERIOD)
+
+    median = (high + low) / 2.0
+    result["awesome_oscillator"] = median.rolling(AO_FAST_PERIOD).mean() - median.rolling(AO_SLOW_PERIOD).mean()
+
+    rsi_series = result["rsi"]
+    rsi_low = rsi_series.rolling(STOCH_RSI_PERIOD).min()
+    rsi_high = rsi_series.rolling(STOCH_RSI_PERIOD).max()
+    stoch = ((rsi_series - rsi_low) / (rsi_high - rsi_low) * 100.0).where(rsi_high > rsi_low)
+    result["stoch_rsi_k"] = stoch.rolling(STOCH_RSI_SMOOTH).mean()
+    result["stoch_rsi_d"] = result["stoch_rsi_k"].rolling(STOCH_RSI_SMOOTH).mean()
+
+    if "volume" in frame.columns:
+        typical = (high + low + close) / 3.0
+        flow = typical * frame["volume"].astype(float)
+        direction = typical.diff()
+        positive = flow.where(direction > 0, 0.0).where(direction.notna()).rolling(MFI_PERIOD).sum()
+        negative = flow.where(direction < 0, 0.0).where(direction.notna()).rolling(MFI_PERIOD).sum()
+        mfi = (100.0 - 100.0 / (1.0 + positive / negative)).where(negative > 0, 100.0)
+        result["mfi"] = mfi.where(positive.notna())
+    else:
+        result["mfi"] = np.nan
+    return result
+
+
+def param_grid(**options):
+    """
+    Build the cartesian product of parameter options.
+
+    Example:
+        param_grid(rsi_entry=[25, 30, 35], stop_loss_pct=[0.03, 0.05])
+    """
+    names = list(options)
+    return [dict(zip(names, values)) for values in itertools.product(*(options[name] for name in names))]
+
+
+def _arrays(frame):
+    """Extract the arrays a simulation needs from an indicator frame."""
+    close = frame["close"].to_numpy(dtype=float)
+    return {
+        "close": close,
+        "high": frame["high"].to_numpy(dtype=float) if "high" in frame.columns else close,
+        "low": frame["low"].to_numpy(dtype=float) if "low" in frame.columns else close,
+        "rsi": frame["rsi"].to_numpy(dtype=float),
+        "atr": frame["atr"].to_numpy(dtype=float),
+        "sma_50": frame["sma_50"].to_numpy(dtype=float),
+    }
+
+
+def _find_exit(arrays, entry, stop, target, trailing_pct):
+    """
+    Return (exit_index, exit_price, reason) of a long position opened at `entry`.
+
+    The stop is checked before the take-profit within a candle, the
+    conservative assumption when only OHLC data is available.
+    """
+    high, low = arrays["high"], arrays["low"]
+    n = len(high)
+    start = entry + 1
+    peak = -np.inf
+    chunk = SCAN_CHUNK
+    while start < n:
+        end = min(n, start + chunk)
+        window_high = high[start:end]
+        stops = np.full(end - start, stop)
+        if trailing_pct > 0:
+            # The trailing stop follows the highest high seen before each candle
+            peaks = np.maximum.accumulate(np.concatenate(([max(peak, arrays["close"][entry])], window_high)))[:-1]
+            stops = np.maximum(stops, peaks * (1 - trailing_pct))
+            peak = max(peak, window_high.max())
+        stop_hit = low[start:end] <= stops
+        target_hit = window_high >= target
+        hit = stop_hit | target_hit
+        if hit.any():
+            offset = int(hit.argmax())
+            if stop_hit[offset]:
+                return start + offset, float(stops[offset]), "stop_loss"
+            return start + offset, float(target), "take_profit"
+        start = end
+        chunk *= 2
+    return n - 1, float(arrays["close"][n - 1]), "end_of_data"
+
+
+def simulate(arrays, params):
+    """
+    Simulate one parameter set over precomputed arrays.
+
+    Returns:
+        List of trade dicts (entry/exit price, size, indexes and exit reason)
+        in the shape utils.get_performance_summary expects
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    close, rsi, atr = arrays["close"], arrays["rsi"], arrays["atr"]
+
+    with np.errstate(invalid="ignore"):
+        signal = rsi <= p["rsi_entry"]
+        if p["trend_filter"]:
+            signal &= close > arrays["sma_50"]
+    entries = np.flatnonzero(signal)
+
+    trades = []
+    position = 0
+    while position < len(entries):
+        entry = int(entries[position])
+        entry_price = close[entry]
+        stop = entry_price * (1 - p["stop_loss_pct"])
+        if p["dynamic_stop_loss"] and not np.isnan(atr[entry]):
+            # ATR stop, never looser than the fixed percentage stop
+            stop = max(stop, entry_price - p["atr_multiplier"] * atr[entry])
+        target = entry_price * (1 + p["take_profit_pct"])
+
+        exit_index, exit_price, reason = _find_exit(arrays, entry, stop, target, p["trailing_stop_pct"])
+        size = float(p["position_size_usd"] / entry_price)
+        trade = {
+            "side": "BUY",
+            "entry_index": entry,
+            "exit_index": exit_index,
+            "entry_price": float(entry_price),
+            "exit_price": exit_price,
+            "size": size,
+            "reason": reason,
+        }
+        if p["fee_pct"]:
+            # Fold round-trip fees into the exit price so the P&L helpers see them
+            fees = (entry_price + exit_price) * p["fee_pct"]
+            trade["exit_price"] = exit_price - fees
+        trades.append(trade)
+
+        # One position at a time: the next entry comes after this exit
+        position = int(np.searchsorted(entries, exit_index, side="right"))
+    return trades
+
+
+def score(trades):
+    """Score simulated trades with the utils performance metrics."""
+    summary = get_performance_summary(trades)
+    summary["total_return_usd"] = sum(
+        calculate_profit_loss(t["entry_price"], t["exit_price"], t["size"]) for t in trades
+    )
+    summary["exit_reasons"] = {
+        reason: sum(1 for t in trades if t["reason"] == reason)
+        for reason in ("stop_loss", "take_profit", "end_of_data")
+    }
+    return summary
+
+
+def run_backtest(frame, params=None, indicator_func=compute_indicators):
+    """
+    Backtest one parameter set over a candle frame.
+
+    Args:
+        frame: Candles with open/high/low/close columns
+        params: Overrides of DEFAULT_PARAMS
+        indicator_func: Callable(frame) -> frame with indicator columns, e.g. a
+            trader's calculate_technical_indicators
+
+    Returns:
+        Dictionary with the parameters, the score and the trades
+    """
+    arrays = _arrays(indicator_func(frame))
+    trades = simulate(arrays, params or {})
+    return {"params": {**DEFAULT_PARAMS, **(params or {})}, "score": score(trades), "trades": trades}
+
+
+# Process pool sweep: each worker receives the arrays once through its initializer
+_worker_arrays = None
+
+
+def _init_worker(arrays):
+    global _worker_arrays
+    _worker_arrays = arrays
+
+
+def _sweep_task(params):
+    return _sweep_task_with(_worker_arrays, params)
+
+
+def run_sweep(frame, grid, processes=None, indicator_func=compute_indicators, sort_by="profit_loss"):
+    """
+    Backtest every parameter set in `grid` across all cores.
+
+    Indicators are computed once; only the signals and exits depend on the
+    parameters.
+
+    Returns:
+        One result per parameter set (without trades), best `sort_by` first
+    """
+    arrays = _arrays(indicator_func(frame))
+    processes = processes or os.cpu_count() or 1
+
+    if processes == 1 or len(grid) == 1:
+        results = [_sweep_task_with(arrays, params) for params in grid]
+    else:
+        chunksize = max(1, len(grid) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(arrays,)) as pool:
+            results = list(pool.map(_sweep_task, grid, chunksize=chunksize))
+
+    logger.info(f"Backtested {len(grid)} parameter set(s) over {len(arrays['close'])} candle(s)")
+    return sorted(results, key=lambda result: result["score"].get(sort_by) or 0, reverse=True)
+
+
+def _sweep_task_with(arrays, params):
+    trades = simulate(arrays, params)
+    return {"params": {**DEFAULT_PARAMS, **params}, "score": score(trades)}
@@ -0,0 +1,182 @@
+"""
+Balance Service module
+
+This module serves account balances from one shared snapshot. All accounts
+are fetched with a single fetch_account_balance() call at most once per TTL
+(with USD and BTC taken from the trader's direct balance methods when it
+has them), concurrent callers share the in-flight request, and the snapshot is dropped
+as soon as one of our own orders fills so the next read sees the new
+balances. Every snapshot carries its fetch time so responses can report how
+stale they are.
+"""
+
+import os
+import copy
+import time
+import logging
+import threading
+import functools
+from datetime import datetime
+from concurrent.futures import Future
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds a balance snapshot is served before it is fetched again
+BALANCE_TTL = float(os.getenv("BALANCE_TTL", "5"))
+
+# Currencies whose balance the trader reads more accurately with a direct method
+DIRECT_BALANCE_METHODS = (("USD", "get_usd_balance"), ("BTC", "get_btc_balance"))
+
+
+def fetch_balances(trader):
+    """
+    Fetch every account through `trader`, overriding USD and BTC with its direct balance methods.
+
+    A direct method that is missing, fails or returns None leaves the
+    fetched balance as it is.
+    """
+    balances = trader.fetch_account_balance() or {}
+    for currency, method in DIRECT_BALANCE_METHODS:
+        if not hasattr(trader, method):
+            continue
+        try:
+            value = getattr(trader, method)()
+        except Exception as e:
+            logger.warning(f"Error using direct balance method {method}: {e}")
+            continue
+        if value is None:
+            continue
+        account = balances.setdefault(currency, {"available": 0.0, "hold": 0.0, "total": 0.0})
+        if isinstance(account, dict):
+            account["available"] = value
+            # The direct methods have no hold information
+            account["total"] = value
+    return balances
+
+
+class BalanceSnapshot:
+    """Balances of every account as returned by fetch_account_balance()."""
+
+    __slots__ = ("balances", "fetched_at", "fetched_monotonic")
+
+    def __init__(self, balances, fetched_at, fetched_monotonic):
+        self.balances = balances
+        self.fetched_at = fetched_at
+        self.fetched_monotonic = fetched_monotonic
+
+    @property
+    def age(self):
+        """Seconds since the balances were fetched."""
+        return time.monotonic() - self.fetched_monotonic
+
+    def available(self, currency):
+        """Return the available balance of one currency, 0.0 if it has no account."""
+        return (self.balances.get(currency) or {}).get("available", 0.0)
+
+    def freshness(self):
+        """Return the as_of/age_seconds fields reported alongside the balances."""
+        return {"as_of": self.fetched_at.isoformat(), "age_seconds": round(self.age, 3)}
+
+
+class BalanceService:
+    """Shared, short-lived balance snapshot of the configured account."""
+
+    def __init__(self, ttl=BALANCE_TTL):
+        self.ttl = ttl
+        self._snapshot = None
+        self._inflight = None
+        # Bumped on invalidation so a fetch started before it is not cached
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, trader, max_age=None):
+        """
+        Return the balance snapshot, fetching it through `trader` when stale.
+
+        Every trader built from the configured keys sees the same account, so
+        they all share one snapshot; call invalidate() when the keys change.
+
+        Args:
+            trader: The trader the balances are fetched through (see fetch_balances)
+            max_age: Optional tighter freshness bound in seconds than the TTL
+
+        Returns:
+            A BalanceSnapshot; its balances dict is a copy safe to modify
+        """
+        max_age = self.ttl if max_age is None else min(max_age, self.ttl)
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.age < max_age:
+                self.hits += 1
+                return self._copy(snapshot)
+
+            self.misses += 1
+            future = self._inflight
+            owner = future is None
+            if owner:
+                future = self._inflight = Future()
+            generation = self._generation
+
+        if not owner:
+            # Another caller is already fetching - share its result
+            return self._copy(future.result())
+
+        try:
+            balances = fetch_balances(trader)
+            snapshot = BalanceSnapshot(balances, datetime.now(), time.monotonic())
+            with self._lock:
+                if generation == self._generation:
+                    self._snapshot = snapshot
+            future.set_result(snapshot)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight is future:
+                    self._inflight = None
+
+        return self._copy(snapshot)
+
+    @staticmethod
+    def _copy(snapshot):
+        return BalanceSnapshot(copy.deepcopy(snapshot.balances), snapshot.fetched_at, snapshot.fetched_monotonic)
+
+    def invalidate(self):
+        """Drop the snapshot, e.g. right after an order fills."""
+        with self._lock:
+            self._snapshot = None
+            # Callers from now on must not join a fetch that began before the fill
+            self._inflight = None
+            self._generation += 1
+
+    def track_fills(self, trader):
+        """Drop the snapshot after every order `trader` sends; wraps execute_trade on the instance, once."""
+        if trader is None or getattr(trader, "_balance_tracked", False):
+            return trader
+        trader._balance_tracked = True
+        original = trader.execute_trade
+
+        @functools.wraps(original)
+        def execute_trade(*args, **kwargs):
+            try:
+                return original(*args, **kwargs)
+            finally:
+                # Failed and timed-out orders may still have (partly) filled
+                self.invalidate()
+
+        trader.execute_trade = execute_trade
+        return trader
+
+    def stats(self):
+        with self._lock:
+            snapshot = self._snapshot
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "age_seconds": round(snapshot.age, 3) if snapshot is not None else None,
+            }
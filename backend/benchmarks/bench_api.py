@@ -0,0 +1,397 @@
+"""
+Endpoint benchmark suite
+
+Starts the API in a child process with the stub trader (see stub_trader.py)
+in place of BitcoinAITrader, drives /api/market-data, /api/profit-summary,
+/api/trade-history, /api/ai-analysis and the /ws WebSocket at a fixed
+concurrency, and reports throughput, p50/p95/p99 latency and the server's
+peak RSS. It also times the utils P&L functions at increasing trade counts.
+
+Results are written as JSON. Pass a previous results file as --baseline to
+compare against it; the exit status is 1 when any metric regressed by more
+than --tolerance.
+
+Usage:
+    python benchmarks/bench_api.py [--concurrency 16] [--requests 500]
+                                   [--ws-clients 50] [--ws-pings 20]
+                                   [--output bench_api.json] [--baseline baseline.json]
+                                   [--micro-sizes 1000,100000,1000000]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
+
+import stub_trader
+
+# HTTP scenarios: name -> request path
+HTTP_SCENARIOS = {
+    "market-data": "/api/market-data?symbol=BTC&granularity=ONE_HOUR",
+    "profit-summary": "/api/profit-summary",
+    "trade-history": "/api/trade-history?limit=50",
+    "ai-analysis": "/api/ai-analysis?symbol=BTC",
+}
+WS_SCENARIO = "ws"
+
+# Metrics compared against a baseline and whether higher values are better
+COMPARED_METRICS = {"throughput_rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+
+STARTUP_TIMEOUT = 60
+
+
+# Server
+
+def serve(args):
+    """Run the API with the stub trader; used by the benchmark's child process."""
+    stub_trader.install()
+    stub_trader.configure(
+        exchange_latency=args.exchange_latency_ms / 1000.0,
+        ai_latency=args.ai_latency_ms / 1000.0,
+        init_latency=args.init_latency_ms / 1000.0,
+        trade_count=args.trades,
+    )
+
+    import logging
+    import uvicorn
+
+    # Configured before main so its INFO-level basicConfig does not apply
+    logging.basicConfig(level=logging.WARNING)
+    import main
+
+    main.keyring.set(stub_trader.STUB_KEYS)
+    main.price_oracle.fetch_ticker = stub_trader.stub_ticker
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(args, data_dir):
+    """Start the stub-backed API in a child process; returns (process, base_url)."""
+    port = _free_port()
+    command = [
+        sys.executable, str(Path(__file__).resolve()), "--serve", "--port", str(port),
+        "--trades", str(args.trades),
+        "--exchange-latency-ms", str(args.exchange_latency_ms),
+        "--ai-latency-ms", str(args.ai_latency_ms),
+        "--init-latency-ms", str(args.init_latency_ms),
+    ]
+    # A fresh home directory keeps the app's local stores out of the real one
+    env = {**os.environ, "HOME": str(data_dir), "PUSH_INTERVAL": str(args.push_interval)}
+    process = subprocess.Popen(command, cwd=str(Path(__file__).parent.parent), env=env)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def wait_for(process, url, check, interval=0.2):
+    """Poll `url` until check(response) is true; returns the seconds waited."""
+    started = time.monotonic()
+    while time.monotonic() - started < STARTUP_TIMEOUT:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with status {process.returncode}")
+        try:
+            if check(requests.get(url, timeout=1)):
+                return time.monotonic() - started
+        except requests.RequestException:
+            pass
+        time.sleep(interval)
+    process.terminate()
+    raise RuntimeError(f"API server did not become ready within {STARTUP_TIMEOUT}s")
+
+
+def trader_ready(response):
+    return response.status_code == 200 and response.json().get("trader") == "ready"
+
+
+def start_server(args, data_dir):
+    """Start the stub-backed API and wait until its trader is ready."""
+    process, base_url = spawn_server(args, data_dir)
+    wait_for(process, f"{base_url}/api/ready", trader_ready)
+    return process, base_url
+
+
+def peak_rss_mb(pid):
+    """Peak resident set size of a live process in MB (Linux only, else None)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+
+# Load generation
+
+def summarize(latencies, errors, elapsed, concurrency):
+    """Throughput and latency percentiles of one scenario."""
+    completed = len(latencies)
+    result = {
+        "requests": completed + errors,
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 2) if elapsed > 0 else None,
+    }
+    if completed:
+        samples = np.array(latencies) * 1000.0
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        result.update({
+            "mean_ms": round(float(samples.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(samples.max()), 3),
+        })
+    return result
+
+
+def run_http(url, total, concurrency, warmup):
+    """Send `total` GET requests from `concurrency` threads, each with its own session."""
+    local = threading.local()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            ok = session().get(url, timeout=60).status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(warmup):
+            session().get(url, timeout=60)
+        started = time.perf_counter()
+        list(pool.map(one, range(total)))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, errors[0], elapsed, concurrency)
+
+
+async def _ws_client(url, pings, latencies, connect_times):
+    import websockets
+
+    started = time.perf_counter()
+    async with websockets.connect(url) as websocket:
+        connect_times.append(time.perf_counter() - started)
+        for _ in range(pings):
+            sent = time.perf_counter()
+            await websocket.send("ping")
+            # Pushed topic updates may arrive before the pong
+            while '"pong"' not in await websocket.recv():
+                pass
+            latencies.append(time.perf_counter() - sent)
+
+
+async def _run_ws(url, clients, pings):
+    latencies, connect_times = [], []
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_ws_client(url, pings, latencies, connect_times) for _ in range(clients)),
+                                   return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    errors = sum(1 for result in results if isinstance(result, Exception))
+    result = summarize(latencies, errors, elapsed, clients)
+    if connect_times:
+        result["connect_p50_ms"] = round(float(np.percentile(np.array(connect_times) * 1000.0, 50)), 3)
+    return result
+
+
+def run_ws(base_url, clients, pings):
+    """Open `clients` WebSockets subscribed to positions and profit and time ping round trips."""
+    url = base_url.replace("http://", "ws://") + "/ws?topics=positions,profit"
+    return asyncio.run(_run_ws(url, clients, pings))
+
+
+# utils P&L micro-benchmarks
+
+def _best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000.0, 3)
+
+
+def run_micro(sizes, repeat):
+    """Time the utils P&L functions over `sizes` trades; returns {function: {size: ms}}."""
+    from utils import (
+        calculate_profit_loss,
+        calculate_profit_loss_percentage,
+        get_performance_summary,
+        calculate_total_profit_summary,
+    )
+    from bench_performance_summary import generate_trades
+
+    results = {name: {} for name in (
+        "calculate_profit_loss", "calculate_profit_loss_percentage",
+        "get_performance_summary", "calculate_total_profit_summary",
+    )}
+    for count in sizes:
+        trades = generate_trades(count)
+        closed = [t for t in trades if "exit_price" in t]
+        history = stub_trader.stub_trade_history(count)
+        positions = [{"id": f"open-{i}", "entry_price": 60000 + i, "size": 0.01} for i in range(100)]
+
+        results["calculate_profit_loss"][str(count)] = _best_of(
+            lambda: [calculate_profit_loss(t["entry_price"], t["exit_price"], t["size"], t["side"] == "BUY") for t in closed], repeat)
+        results["calculate_profit_loss_percentage"][str(count)] = _best_of(
+            lambda: [calculate_profit_loss_percentage(t["entry_price"], t["exit_price"], t["side"] == "BUY") for t in closed], repeat)
+        results["get_performance_summary"][str(count)] = _best_of(lambda: get_performance_summary(trades), repeat)
+        results["calculate_total_profit_summary"][str(count)] = _best_of(
+            lambda: calculate_total_profit_summary(history, positions, 61000.0), repeat)
+        print(f"  utils P&L at {count} trades: " + ", ".join(f"{name} {values[str(count)]:.1f} ms" for name, values in results.items()))
+    return results
+
+
+# Baseline comparison
+
+def _change(current, baseline):
+    if current is None or baseline in (None, 0):
+        return None
+    return (current - baseline) / baseline
+
+
+def compare(results, baseline, tolerance):
+    """Print metric changes against a baseline; returns the list of regressions."""
+    regressions = []
+
+    def check(label, current, previous, higher_is_better):
+        change = _change(current, previous)
+        if change is None:
+            return
+        worse = -change if higher_is_better else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        print(f"  {label:<55} {previous:>12.3f} -> {current:>12.3f} ({change:+.1%}) {flag}")
+        if flag:
+            regressions.append(label)
+
+    print(f"\nComparison with baseline from {baseline.get('timestamp')} (tolerance {tolerance:.0%}):")
+    for name, metrics in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name, {})
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            check(f"{name} {metric}", metrics.get(metric), previous.get(metric), higher_is_better)
+    check("server peak_rss_mb", results.get("server_peak_rss_mb"), baseline.get("server_peak_rss_mb"), False)
+    for function, timings in results.get("micro", {}).items():
+        for size, ms in timings.items():
+            check(f"{function} @{size} ms", ms, baseline.get("micro", {}).get(function, {}).get(size), False)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent HTTP clients")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per HTTP endpoint")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per endpoint")
+    parser.add_argument("--ws-clients", type=int, default=50, help="Concurrent WebSocket connections")
+    parser.add_argument("--ws-pings", type=int, default=20, help="Ping round trips per WebSocket")
+    parser.add_argument("--endpoints", default=",".join(list(HTTP_SCENARIOS) + [WS_SCENARIO]),
+                        help="Comma-separated scenarios to run")
+    parser.add_argument("--trades", type=int, default=1000, help="Trades in the stub trade history")
+    parser.add_argument("--exchange-latency-ms", type=float, default=0.0, help="Emulated exchange latency per call")
+    parser.add_argument("--ai-latency-ms", type=float, default=0.0, help="Emulated model latency per analysis")
+    parser.add_argument("--init-latency-ms", type=float, default=0.0, help="Emulated trader construction time")
+    parser.add_argument("--push-interval", type=int, default=1, help="PUSH_INTERVAL of the server")
+    parser.add_argument("--micro-sizes", default="1000,100000,1000000", help="Trade counts of the utils benchmarks")
+    parser.add_argument("--micro-repeat", type=int, default=3)
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--output", default="bench_api.json", help="Results file")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return 0
+
+    scenarios = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in HTTP_SCENARIOS and name != WS_SCENARIO]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("serve", "port", "baseline")},
+        "endpoints": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench-api-") as data_dir:
+        process, base_url = start_server(args, data_dir)
+        try:
+            results["startup_rss_mb"] = peak_rss_mb(process.pid)
+            for name in scenarios:
+                if name == WS_SCENARIO:
+                    metrics = run_ws(base_url, args.ws_clients, args.ws_pings)
+                else:
+                    metrics = run_http(base_url + HTTP_SCENARIOS[name], args.requests, args.concurrency, args.warmup)
+                # VmHWM is a high-water mark, so this is the peak up to the end of the scenario
+                metrics["peak_rss_mb"] = peak_rss_mb(process.pid)
+                results["endpoints"][name] = metrics
+                print(f"  {name:<15} {metrics['throughput_rps'] or 0:>9.1f} req/s  p50 {metrics.get('p50_ms', 0):>8.2f} ms  "
+                      f"p95 {metrics.get('p95_ms', 0):>8.2f} ms  p99 {metrics.get('p99_ms', 0):>8.2f} ms  errors {metrics['errors']}")
+            results["server_peak_rss_mb"] = peak_rss_mb(process.pid)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    if results["server_peak_rss_mb"] is None:
+        # Outside Linux, fall back to the exited child's maximum RSS
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        results["server_peak_rss_mb"] = maxrss / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0)
+
+    if not args.skip_micro:
+        results["micro"] = run_micro([int(size) for size in args.micro_sizes.split(",")], args.micro_repeat)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark for utils.get_performance_summary
+
+Generates synthetic trades, checks the vectorized summary against the
+per-trade helpers and times it at increasing trade counts.
+
+Usage:
+    python benchmarks/bench_performance_summary.py [--sizes 1000,100000,1000000]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import (
+    get_performance_summary,
+    is_successful_trade,
+    calculate_profit_loss
+)
+
+
+def generate_trades(count, seed=42):
+    """Generate synthetic trades, about 80% of them closed."""
+    rng = random.Random(seed)
+    trades = []
+    for _ in range(count):
+        entry_price = rng.uniform(10000, 70000)
+        trade = {
+            "entry_price": entry_price,
+            "size": rng.uniform(0.001, 1.0),
+            "side": rng.choice(["BUY", "SELL"]),
+        }
+        if rng.random() < 0.8:
+            trade["exit_price"] = entry_price * rng.uniform(0.9, 1.1)
+        trades.append(trade)
+    return trades
+
+
+def reference_summary(trades):
+    """Summary built with the per-trade helpers, one list pass per metric."""
+    def pl(t):
+        return calculate_profit_loss(t['entry_price'], t['exit_price'], t['size'], t.get('side', 'BUY') == 'BUY')
+
+    winning = [t for t in trades if is_successful_trade(t)]
+    losing = [t for t in trades if not is_successful_trade(t) and 'exit_price' in t]
+    return {
+        "total_trades": len(trades),
+        "win_rate": len(winning) / len(trades) * 100,
+        "profit_loss": sum(pl(t) for t in trades if 'exit_price' in t),
+        "avg_profit_per_trade": sum(pl(t) for t in winning) / len(winning) if winning else 0,
+        "avg_loss_per_trade": sum(pl(t) for t in losing) / len(losing) if losing else 0,
+        "max_profit": max([pl(t) for t in winning] or [0]),
+        "max_loss": min([pl(t) for t in losing] or [0]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated trade counts")
+    args = parser.parse_args()
+
+    for count in [int(size) for size in args.sizes.split(",")]:
+        trades = generate_trades(count)
+
+        started = time.perf_counter()
+        summary = get_performance_summary(trades)
+        vectorized = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reference = reference_summary(trades)
+        per_trade = time.perf_counter() - started
+
+        mismatched = [key for key in reference if reference[key] != summary[key]]
+        status = "OK" if not mismatched else f"MISMATCH {mismatched}"
+        print(f"{count:>9} trades | vectorized {vectorized * 1000:9.1f} ms | per-trade {per_trade * 1000:9.1f} ms | {status}")
+
+
+if __name__ == "__main__":
+    main()
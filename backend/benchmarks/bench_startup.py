@@ -0,0 +1,174 @@
+"""
+Startup timing report
+
+Measures how long the API takes to come up with the stub trader (see
+stub_trader.py):
+
+- the import-time breakdown of `import main` per top-level package, from
+  python -X importtime
+- the time from process start until /api/health answers (the server accepts
+  traffic) and until /api/ready reports the trader as ready, plus the
+  startup timings the app records itself
+
+Results are written as JSON; pass a previous results file as --baseline to
+flag regressions beyond --tolerance (exit status 1).
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 3] [--init-latency-ms 2000]
+                                       [--output bench_startup.json] [--baseline baseline.json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+
+import requests
+
+sys.path.append(str(Path(__file__).parent))
+
+from bench_api import spawn_server, wait_for, trader_ready
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Packages whose import time changes below this many milliseconds are noise
+MIN_PACKAGE_CHANGE_MS = 5.0
+
+IMPORT_MAIN = (
+    "import sys; sys.path.insert(0, 'benchmarks'); "
+    "import stub_trader; stub_trader.install(); import main"
+)
+
+
+def import_breakdown(data_dir):
+    """Import main once under -X importtime; returns (total_ms, {package: self_ms})."""
+    env = {**os.environ, "HOME": str(data_dir)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_MAIN],
+        cwd=str(BACKEND_DIR), env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing main failed:\n{result.stderr[-2000:]}")
+
+    packages = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000.0
+        if name.strip() == "main":
+            total = int(cumulative_us) / 1000.0
+    return total, dict(packages)
+
+
+def time_to_ready(args, data_dir):
+    """Start the API once; returns seconds until it served /api/health and until the trader was ready."""
+    process, base_url = spawn_server(args, data_dir)
+    try:
+        serving = wait_for(process, f"{base_url}/api/health", lambda response: response.status_code == 200, interval=0.02)
+        ready = serving + wait_for(process, f"{base_url}/api/ready", trader_ready, interval=0.02)
+        reported = requests.get(f"{base_url}/api/ready", timeout=5).json().get("startup", {})
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return serving, ready, reported
+
+
+def _median(values):
+    return round(statistics.median(values), 3)
+
+
+def compare(results, baseline, tolerance):
+    """Print changes against a baseline; returns the list of regressions."""
+    regressions = []
+
+    def check(label, current, previous, floor=0.0):
+        if current is None or not previous:
+            return
+        change = (current - previous) / previous
+        flag = "REGRESSION" if change > tolerance and current - previous > floor else ""
+        print(f"  {label:<40} {previous:>10.3f} -> {current:>10.3f} ({change:+.1%}) {flag}")
+        if flag:
+            regressions.append(label)
+
+    print(f"\nComparison with baseline from {baseline.get('timestamp')} (tolerance {tolerance:.0%}):")
+    for metric in ("import_main_ms", "time_to_serving_s", "time_to_ready_s"):
+        check(metric, results.get(metric), baseline.get(metric))
+    previous_packages = baseline.get("import_packages_ms", {})
+    for package, ms in results["import_packages_ms"].items():
+        check(f"import {package} (ms)", ms, previous_packages.get(package), MIN_PACKAGE_CHANGE_MS)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Measurements per metric (medians are reported)")
+    parser.add_argument("--init-latency-ms", type=float, default=0.0, help="Emulated trader construction time")
+    parser.add_argument("--trades", type=int, default=1000, help="Trades in the stub trade history")
+    parser.add_argument("--top", type=int, default=15, help="Packages shown in the import breakdown")
+    parser.add_argument("--output", default="bench_startup.json", help="Results file")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression")
+    args = parser.parse_args()
+    # Settings of the stub server started by bench_api.spawn_server
+    args.exchange_latency_ms = args.ai_latency_ms = 0.0
+    args.push_interval = 15
+
+    totals, serving, ready, reported = [], [], [], []
+    packages = defaultdict(list)
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory(prefix="bench-startup-") as data_dir:
+            total, breakdown = import_breakdown(data_dir)
+            totals.append(total)
+            for package, ms in breakdown.items():
+                packages[package].append(ms)
+        with tempfile.TemporaryDirectory(prefix="bench-startup-") as data_dir:
+            run_serving, run_ready, run_reported = time_to_ready(args, data_dir)
+            serving.append(run_serving)
+            ready.append(run_ready)
+            reported.append(run_reported)
+
+    package_ms = {package: _median(values) for package, values in packages.items()}
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {key: value for key, value in vars(args).items() if key != "baseline"},
+        "import_main_ms": _median(totals),
+        "time_to_serving_s": _median(serving),
+        "time_to_ready_s": _median(ready),
+        "app_reported": reported[len(reported) // 2],
+        "import_packages_ms": dict(sorted(package_ms.items(), key=lambda item: item[1], reverse=True)),
+    }
+
+    print(f"import main: {results['import_main_ms']:.1f} ms")
+    print(f"serving after {results['time_to_serving_s']:.2f}s, trader ready after {results['time_to_ready_s']:.2f}s "
+          f"(app reported {results['app_reported']})")
+    print("Import time by package (self, ms):")
+    for package, ms in list(results["import_packages_ms"].items())[:args.top]:
+        print(f"  {package:<30} {ms:>9.1f}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Stub trader module
+
+This module provides a deterministic stand-in for btc_investor_ai_v4's
+BitcoinAITrader so the API can be benchmarked without exchange or OpenAI
+keys. Candles are a seeded random walk per asset, balances and trade
+history are fixed, and analyses are canned. Optional sleeps emulate the
+latency of the exchange and the model.
+
+Call install() before importing main so the app and trader_factory pick up
+the stub instead of the real trader.
+"""
+
+import sys
+import time
+import types
+from pathlib import Path
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtest import compute_indicators
+
+# Keys the benchmark configures; the stub never sends them anywhere
+STUB_KEYS = {
+    "coinbase_api_key": "stub-coinbase-key",
+    "coinbase_api_secret": "stub-coinbase-secret",
+    "openai_api_key": "stub-openai-key",
+}
+
+GRANULARITY_SECONDS = {
+    "ONE_MINUTE": 60,
+    "FIVE_MINUTE": 5 * 60,
+    "FIFTEEN_MINUTE": 15 * 60,
+    "THIRTY_MINUTE": 30 * 60,
+    "ONE_HOUR": 60 * 60,
+    "TWO_HOUR": 2 * 60 * 60,
+    "SIX_HOUR": 6 * 60 * 60,
+    "ONE_DAY": 24 * 60 * 60,
+}
+
+START_PRICES = {"BTC": 60000, "ETH": 3000, "SOL": 150, "XRP": 0.6}
+
+# Candles returned per fetch, like the exchange's maximum page
+CANDLE_COUNT = 300
+
+# Settings shared by every stub instance, set through configure()
+settings = {
+    "exchange_latency": 0.0,  # seconds slept per exchange call
+    "ai_latency": 0.0,  # seconds slept per analysis
+    "init_latency": 0.0,  # seconds slept when a trader is built (client setup, key checks)
+    "trade_count": 1000,  # trades in the stub history
+    "position_count": 20,  # open positions at start
+}
+
+
+def configure(**options):
+    """Override stub settings (exchange_latency, ai_latency, init_latency, trade_count, position_count)."""
+    unknown = set(options) - set(settings)
+    if unknown:
+        raise ValueError(f"Unknown stub settings: {', '.join(sorted(unknown))}")
+    settings.update(options)
+
+
+def stub_candles(symbol="BTC", granularity="ONE_HOUR", count=CANDLE_COUNT, end=None):
+    """Deterministic OHLCV candles of `symbol` ending at the last whole candle before `end`."""
+    seconds = GRANULARITY_SECONDS.get(granularity, 3600)
+    end = pd.Timestamp(end or datetime.now()).floor(f"{seconds}s")
+    rng = np.random.default_rng(sum(map(ord, symbol)) + seconds)
+    close = START_PRICES.get(symbol, 100) * np.exp(np.cumsum(rng.normal(0, 0.004, count)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.002, count))
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + spread),
+        "low": np.minimum(open_, close) * (1 - spread),
+        "close": close,
+        "volume": rng.uniform(10, 500, count),
+    }, index=pd.date_range(end=end, periods=count, freq=f"{seconds}s"))
+
+
+def stub_trade_history(count, symbol="BTC"):
+    """Deterministic trade log: a BUY and a SELL per closed position, oldest first."""
+    rng = np.random.default_rng(7)
+    start = datetime(2024, 1, 1)
+    base = START_PRICES.get(symbol, 100)
+    trades = []
+    for i in range(count // 2):
+        position_id = f"stub-{i}"
+        entry = base * rng.uniform(0.8, 1.2)
+        size = round(float(rng.uniform(0.001, 0.05)), 6)
+        opened = start + timedelta(hours=2 * i)
+        trades.append({"position_id": position_id, "size": size, "side": "BUY", "price": entry,
+                       "timestamp": opened.isoformat(), "reason": "strategy"})
+        trades.append({"position_id": position_id, "size": size, "side": "SELL", "price": entry * rng.uniform(0.9, 1.1),
+                       "timestamp": (opened + timedelta(hours=1)).isoformat(), "reason": "take_profit"})
+    return trades
+
+
+class StubBitcoinAITrader:
+    """Deterministic BitcoinAITrader with the methods the API calls."""
+
+    def __init__(self, coinbase_api_key=None, coinbase_api_secret=None, ai_api_key=None, crypto_asset="BTC"):
+        if settings["init_latency"]:
+            time.sleep(settings["init_latency"])
+        self.crypto_asset = crypto_asset
+        self.product_id = f"{crypto_asset}-USD"
+        self.trade_history = stub_trade_history(settings["trade_count"], crypto_asset)
+        base = START_PRICES.get(crypto_asset, 100)
+        self.active_positions = {
+            f"open-{i}": {
+                "id": f"open-{i}",
+                "entry_price": base * (0.95 + i * 0.005),
+                "size": 0.01,
+                "stop_loss": base * 0.9,
+                "take_profit": base * 1.1,
+                "timestamp": datetime(2024, 6, 1).isoformat(),
+            }
+            for i in range(settings["position_count"])
+        }
+        self.balances = {"USD": 100000.0, crypto_asset: 1.5}
+
+    def _exchange_call(self):
+        if settings["exchange_latency"]:
+            time.sleep(settings["exchange_latency"])
+
+    # Market data
+
+    def fetch_market_data(self, granularity="ONE_HOUR", start=None):
+        self._exchange_call()
+        candles = stub_candles(self.crypto_asset, granularity)
+        if start is not None:
+            candles = candles[candles.index >= pd.Timestamp(start)]
+        return candles
+
+    def calculate_technical_indicators(self, df):
+        return compute_indicators(df)
+
+    def analyze_with_ai(self, df):
+        if settings["ai_latency"]:
+            time.sleep(settings["ai_latency"])
+        last = df.iloc[-1]
+        signal = "BUY" if last.get("rsi", 50) < 40 else "SELL" if last.get("rsi", 50) > 60 else "HOLD"
+        return {
+            "signal": signal,
+            "confidence": 0.7,
+            "position_size_percent": 5,
+            "stop_loss_percent": 5,
+            "take_profit_percent": 10,
+            "priority_indicators": ["rsi", "macd", "bb"],
+            "reasoning": {"summary": f"Stub {signal} analysis"},
+        }
+
+    # Account
+
+    def fetch_account_balance(self):
+        self._exchange_call()
+        return dict(self.balances)
+
+    def get_usd_balance(self):
+        return self.fetch_account_balance()["USD"]
+
+    def get_btc_balance(self):
+        return self.fetch_account_balance().get(self.crypto_asset, 0.0)
+
+    def execute_trade(self, action, amount, order_type="market", time_in_force="gtc"):
+        self._exchange_call()
+        return {"success": True, "order_id": f"stub-order-{len(self.trade_history)}", "side": action, "amount": amount}
+
+    # Positions and trade log
+
+    def load_active_positions(self):
+        return {position_id: dict(position) for position_id, position in self.active_positions.items()}
+
+    def save_active_positions(self, positions):
+        self.active_positions = {position_id: dict(position) for position_id, position in positions.items()}
+
+    # Like the trader, position changes load, modify and save the whole document
+
+    def add_position(self, entry_price, size, stop_loss=None, take_profit=None, **kwargs):
+        positions = self.load_active_positions()
+        position_id = f"open-{len(positions)}-{len(self.trade_history)}"
+        positions[position_id] = {
+            "id": position_id, "entry_price": entry_price, "size": size,
+            "stop_loss": stop_loss, "take_profit": take_profit, "timestamp": datetime.now().isoformat(),
+        }
+        self.save_active_positions(positions)
+        return position_id
+
+    def update_position_size(self, position_id, new_size):
+        positions = self.load_active_positions()
+        positions[position_id]["size"] = new_size
+        self.save_active_positions(positions)
+
+    def remove_position(self, position_id):
+        positions = self.load_active_positions()
+        positions.pop(position_id, None)
+        self.save_active_positions(positions)
+
+    def log_trade(self, position_id, size, side, price, reason=None):
+        self.trade_history.append({"position_id": position_id, "size": size, "side": side, "price": price,
+                                   "timestamp": datetime.now().isoformat(), "reason": reason})
+
+    def get_trade_history(self, limit=10):
+        # Logging order, like the trader's trade log
+        return self.trade_history[-limit:]
+
+
+def stub_ticker(symbol):
+    """Ticker stand-in for the price oracle: the newest stub close with a tight spread."""
+    price = float(stub_candles(symbol, "ONE_MINUTE", count=2)["close"].iloc[-1])
+    return price, price * 0.9999, price * 1.0001
+
+
+def install():
+    """Register the stub as btc_investor_ai_v4 so imports of the real trader resolve to it."""
+    module = types.ModuleType("btc_investor_ai_v4")
+    module.BitcoinAITrader = StubBitcoinAITrader
+    sys.modules["btc_investor_ai_v4"] = module
+    return module
@@ -0,0 +1,180 @@
+"""
+Candle Cache module
+
+This module provides a process-wide OHLCV candle cache shared by every
+endpoint. Entries are keyed by (symbol, granularity) and expire after a TTL
+derived from the candle granularity. Refreshes only ask the exchange for
+candles newer than the last one held, and concurrent callers for the same
+key share a single in-flight upstream request.
+"""
+
+import time
+import inspect
+import logging
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Candle length in seconds for each supported granularity
+GRANULARITY_SECONDS = {
+    "ONE_MINUTE": 60,
+    "FIVE_MINUTE": 5 * 60,
+    "FIFTEEN_MINUTE": 15 * 60,
+    "THIRTY_MINUTE": 30 * 60,
+    "ONE_HOUR": 60 * 60,
+    "TWO_HOUR": 2 * 60 * 60,
+    "SIX_HOUR": 6 * 60 * 60,
+    "ONE_DAY": 24 * 60 * 60,
+}
+
+# TTL bounds: the newest candle keeps changing until it closes, so even long
+# granularities are refreshed at least once a minute
+MIN_TTL = 5
+MAX_TTL = 60
+
+
+def ttl_for_granularity(granularity):
+    """Return the cache TTL in seconds for a granularity."""
+    seconds = GRANULARITY_SECONDS.get(granularity, 60 * 60)
+    return max(MIN_TTL, min(MAX_TTL, seconds / 12))
+
+
+def _accepts_kwarg(func, name):
+    """Check whether a callable accepts a given keyword argument."""
+    try:
+        params = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+    return name in params
+
+
+class _Entry:
+    __slots__ = ("frame", "fetched_at", "max_rows")
+
+    def __init__(self, frame, fetched_at, max_rows):
+        self.frame = frame
+        self.fetched_at = fetched_at
+        self.max_rows = max_rows
+
+
+class CandleCache:
+    """Shared (symbol, granularity) -> candle DataFrame cache."""
+
+    def __init__(self, ttl_func=ttl_for_granularity):
+        self.ttl_func = ttl_func
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol, granularity, fetch):
+        """
+        Return candles for (symbol, granularity), refreshing through `fetch` when stale.
+
+        Args:
+            symbol: Crypto asset symbol, e.g. "BTC"
+            granularity: Candle granularity, e.g. "ONE_HOUR"
+            fetch: The trader's fetch_market_data method
+
+        Returns:
+            A copy of the cached DataFrame, safe for the caller to modify
+        """
+        key = (symbol, granularity)
+        ttl = self.ttl_func(granularity)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.fetched_at < ttl:
+                self.hits += 1
+                return entry.frame.copy()
+
+            self.misses += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            # Another caller is already fetching this key - share its result
+            return future.result().copy()
+
+        try:
+            frame = self._refresh(key, entry, fetch)
+            future.set_result(frame)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+        return frame.copy()
+
+    def _refresh(self, key, entry, fetch):
+        """Fetch new candles for `key` and merge them into the cached frame."""
+        symbol, granularity = key
+        candle_seconds = GRANULARITY_SECONDS.get(granularity, 60 * 60)
+        started = time.monotonic()
+
+        incremental = (
+            entry is not None
+            and not entry.frame.empty
+            and _accepts_kwarg(fetch, "start")
+            # Too many missing candles means a gap: reload the whole window
+            and (started - entry.fetched_at) / candle_seconds < entry.max_rows
+        )
+
+        if incremental:
+            # Re-request the last held candle too, since it may not have closed yet
+            since = entry.frame.index[-1]
+            new_frame = fetch(granularity=granularity, start=since)
+            if new_frame is None or new_frame.empty:
+                frame = entry.frame
+            else:
+                frame = pd.concat([entry.frame, new_frame])
+                frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+                frame = frame.tail(entry.max_rows)
+            max_rows = entry.max_rows
+            logger.debug(f"Incremental candle refresh for {symbol}/{granularity}: {0 if new_frame is None else len(new_frame)} row(s)")
+        else:
+            frame = fetch(granularity=granularity)
+            max_rows = len(frame) if frame is not None else 0
+            logger.debug(f"Full candle refresh for {symbol}/{granularity}: {max_rows} row(s)")
+
+        if frame is None or frame.empty:
+            # Never cache an empty result, callers handle it as a failed fetch
+            return frame if frame is not None else pd.DataFrame()
+
+        with self._lock:
+            self._entries[key] = _Entry(frame, time.monotonic(), max(max_rows, len(frame)))
+        return frame
+
+    def latest(self, symbol, granularity):
+        """Return the cached frame without refreshing it, or None."""
+        with self._lock:
+            entry = self._entries.get((symbol, granularity))
+            return entry.frame.copy() if entry is not None else None
+
+    def invalidate(self, symbol=None):
+        """Drop cached candles for one symbol, or for every symbol."""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol]:
+                    del self._entries[key]
+
+    def stats(self):
+        """Return hit/miss counters and the cached keys."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "keys": [f"{symbol}:{granularity}" for symbol, granularity in self._entries]
+            }
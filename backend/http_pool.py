@@ -0,0 +1,360 @@
+"""
+HTTP Pool module
+
+This module holds the process-wide HTTP connections shared by every trader
+instance and every asset, so exchange and model calls reuse warm keep-alive
+connections instead of paying a TCP and TLS handshake per request:
+
+- one requests.Session per upstream origin, with a connection pool of
+  HTTP_POOL_SIZE connections (the Coinbase SDK otherwise sends each call
+  through a throwaway session)
+- one httpx.Client shared by the OpenAI clients, speaking HTTP/2 when the
+  h2 package is installed
+- a small TTL cache of resolved addresses used by these transports only,
+  so reconnects after an idle connection was dropped do not wait on a
+  lookup either; an address is looked up again after a failed connect
+
+Upstream clients are pointed at the pool by building new ones through their
+public constructors (OpenAI(http_client=...), a RESTClient subclass) with
+the settings of the clients the trader created.
+"""
+
+import os
+import time
+import socket
+import logging
+import functools
+import ipaddress
+import threading
+import importlib.util
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections kept per upstream origin
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+# Seconds a resolved address is reused; 0 disables the DNS cache
+DNS_TTL = float(os.getenv("HTTP_DNS_TTL", "300"))
+
+# Distinct (host, port, ...) lookups kept in the DNS cache
+DNS_CACHE_SIZE = 256
+
+# HTTP/2 needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+# DNS cache
+
+class DnsCache:
+    """TTL cache of resolved addresses, used only by the pooled transports."""
+
+    def __init__(self, ttl=DNS_TTL, max_entries=DNS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        """Address to connect to for host:port; IP literals are returned as they are."""
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        # Failed lookups raise and are not cached
+        address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (time.monotonic(), address)
+        return address
+
+    def invalidate(self, host, port):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _CachedDnsConnection:
+    """urllib3 connection mixin connecting to the cached address of its host."""
+
+    dns_cache = None
+
+    def _new_conn(self):
+        # urllib3 connects to _dns_host; TLS SNI and the Host header keep using
+        # the host name, which is restored before the handshake
+        host = getattr(self, "_dns_host", None)
+        if host is None:
+            # Another urllib3 layout: connect without the cache rather than fail
+            return super()._new_conn()
+        self._dns_host = self.dns_cache.resolve(host, self.port)
+        try:
+            return super()._new_conn()
+        except Exception:
+            # The address may be stale, so the next connection looks it up again
+            self.dns_cache.invalidate(host, self.port)
+            raise
+        finally:
+            self._dns_host = host
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections resolve hosts through a DnsCache."""
+
+    def __init__(self, dns_cache=None, **kwargs):
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        dns_cache = getattr(self, "dns_cache", None)
+        if dns_cache is None:
+            return
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        pool_classes = {}
+        for scheme, pool_cls, connection_cls in (
+            ("http", HTTPConnectionPool, HTTPConnection),
+            ("https", HTTPSConnectionPool, HTTPSConnection),
+        ):
+            cached_connection = type(f"Cached{connection_cls.__name__}", (_CachedDnsConnection, connection_cls),
+                                     {"dns_cache": dns_cache})
+            pool_classes[scheme] = type(f"Cached{pool_cls.__name__}", (pool_cls,), {"ConnectionCls": cached_connection})
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_dns_transport_class():
+    """httpx transport class sending requests to cached addresses (httpx is imported on first use)."""
+    import httpx
+
+    class CachedDnsTransport(httpx.BaseTransport):
+        """
+        Sends each request to the cached address of its host through an httpx transport per host.
+
+        The Host header and the sni_hostname request extension keep the host
+        name, so TLS verification, SNI and virtual hosting are unaffected.
+        Connections are pooled by address, so hosts sharing one do not share
+        a transport and its connections.
+        """
+
+        def __init__(self, new_transport, dns_cache):
+            self.new_transport = new_transport
+            self.dns_cache = dns_cache
+            self._transports = {}
+            self._lock = threading.Lock()
+
+        def _transport(self, host):
+            transport = self._transports.get(host)
+            if transport is None:
+                with self._lock:
+                    transport = self._transports.get(host)
+                    if transport is None:
+                        transport = self._transports[host] = self.new_transport()
+            return transport
+
+        def handle_request(self, request):
+            host = request.url.host
+            port = request.url.port or (443 if request.url.scheme == "https" else 80)
+            address = self.dns_cache.resolve(host, port)
+            if address != host:
+                request = httpx.Request(
+                    request.method,
+                    request.url.copy_with(host=address),
+                    headers=request.headers,
+                    stream=request.stream,
+                    extensions={**request.extensions, "sni_hostname": host},
+                )
+            transport = self._transport(host)
+            try:
+                return transport.handle_request(request)
+            except httpx.ConnectError:
+                # The address may be stale, so the next connection looks it up again
+                self.dns_cache.invalidate(host, port)
+                raise
+
+        def close(self):
+            with self._lock:
+                for transport in self._transports.values():
+                    transport.close()
+                self._transports.clear()
+
+    return CachedDnsTransport
+
+
+# Connection pools
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HttpPool:
+    """Keep-alive sessions per upstream origin plus a shared httpx client."""
+
+    def __init__(self, pool_size=POOL_SIZE, dns_ttl=DNS_TTL):
+        self.pool_size = pool_size
+        self.dns_cache = DnsCache(dns_ttl) if dns_ttl > 0 else None
+        self._sessions = {}
+        self._httpx_client = None
+        self._lock = threading.Lock()
+
+    def session(self, url):
+        """The shared requests.Session for the origin of `url`."""
+        origin = _origin(url)
+        session = self._sessions.get(origin)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                adapter = _PooledAdapter(self.dns_cache, pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount(f"{urlsplit(origin).scheme}://", adapter)
+                self._sessions[origin] = session
+                logger.info(f"Opened HTTP pool for {origin} ({self.pool_size} connections)")
+        return session
+
+    def request(self, method, url, **kwargs):
+        return self.session(url).request(method, url, **kwargs)
+
+    def httpx_client(self):
+        """The shared httpx.Client, created on first use."""
+        if self._httpx_client is not None:
+            return self._httpx_client
+        with self._lock:
+            if self._httpx_client is None:
+                import httpx
+
+                def new_transport():
+                    return httpx.HTTPTransport(
+                        http2=HTTP2_AVAILABLE,
+                        limits=httpx.Limits(max_connections=None, max_keepalive_connections=self.pool_size),
+                    )
+
+                if self.dns_cache is not None:
+                    transport = _cached_dns_transport_class()(new_transport, self.dns_cache)
+                else:
+                    transport = new_transport()
+                self._httpx_client = httpx.Client(transport=transport)
+                logger.info(f"Opened shared httpx client (HTTP/2 {'on' if HTTP2_AVAILABLE else 'off, h2 not installed'})")
+        return self._httpx_client
+
+    def stats(self):
+        return {
+            "origins": sorted(self._sessions),
+            "pool_size": self.pool_size,
+            "httpx_client": self._httpx_client is not None,
+            "http2": HTTP2_AVAILABLE,
+            "dns_cache_entries": len(self.dns_cache) if self.dns_cache is not None else None,
+        }
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            if self._httpx_client is not None:
+                self._httpx_client.close()
+                self._httpx_client = None
+            if self.dns_cache is not None:
+                self.dns_cache.clear()
+
+
+shared_pool = HttpPool()
+
+
+# Upstream clients
+
+@functools.lru_cache(maxsize=None)
+def _pooled_rest_client_class():
+    """RESTClient subclass sending its requests through a pool session (coinbase is imported on first use)."""
+    from coinbase.rest import RESTClient
+    from coinbase.rest.rest_base import handle_exception
+
+    class PooledRESTClient(RESTClient):
+        """Coinbase RESTClient sending requests through a keep-alive session, optionally unsigned."""
+
+        def __init__(self, *args, session, send_url, sign=True, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.session = session
+            self.send_url = send_url
+            self.sign = sign
+
+        def set_headers(self, method, path):
+            if self.sign:
+                return super().set_headers(method, path)
+            # The simulator does not check signatures, so any key works
+            return {"Content-Type": "application/json"}
+
+        def send_request(self, http_method, url_path, params, headers, data=None):
+            # Same contract as RESTBase.send_request, minus the per-call session
+            response = self.session.request(
+                http_method,
+                f"{self.send_url}{url_path}",
+                params=params,
+                json={} if data is None else data,
+                headers=headers,
+                timeout=self.timeout,
+            )
+            handle_exception(response)
+            return response.json()
+
+    return PooledRESTClient
+
+
+def pooled_coinbase_client(client, base_url=None, sign=True, pool=shared_pool):
+    """
+    Build a RESTClient with the credentials of `client` that sends its requests through the pool.
+
+    Args:
+        client: The Coinbase RESTClient to take the key, host and timeout from
+        base_url: Scheme and host to send to instead of https://{client.base_url}
+        sign: False to send requests without the JWT Authorization header
+    """
+    send_url = (base_url or f"https://{client.base_url}").rstrip("/")
+    return _pooled_rest_client_class()(
+        api_key=client.api_key,
+        api_secret=client.api_secret,
+        base_url=client.base_url,
+        timeout=client.timeout,
+        session=pool.session(send_url),
+        send_url=send_url,
+        sign=sign,
+    )
+
+
+def pooled_openai_client(client, base_url=None, pool=shared_pool):
+    """
+    Build an OpenAI client with the settings of `client` that uses the shared httpx client.
+
+    Requests carry their own URL, headers and timeout, so one httpx client
+    serves every OpenAI client; a client given its http_client does not
+    close it when collected.
+    """
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=client.api_key,
+        organization=client.organization,
+        base_url=base_url or client.base_url,
+        timeout=client.timeout,
+        max_retries=client.max_retries,
+        http_client=pool.httpx_client(),
+    )
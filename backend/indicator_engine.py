@@ -0,0 +1,459 @@
+"""
+Indicator Engine module
+
+This module maintains technical indicators incrementally per
+(symbol, granularity). Rolling state is kept between requests (running
+sums for SMA, Bollinger Bands, the Awesome Oscillator and MFI, Wilder
+smoothing for RSI and ATR, EMA state for MACD, short fixed windows for the
+Stochastic RSI) so that each new candle is folded in with O(1) work. The
+still-open candle is read against the state without being folded in, and
+the committed indicator rows are kept in a numpy buffer, so no request
+copies the state or converts the window row by row. A full recompute only
+happens on cold start or when the candle window no longer lines up with
+the stored state (a gap or a rewritten history).
+"""
+
+import math
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SMA_PERIODS = (20, 50)
+EMA_PERIODS = (12, 26)
+MACD_SIGNAL_PERIOD = 9
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+BB_PERIOD = 20
+BB_STD = 2
+AO_FAST_PERIOD = 5
+AO_SLOW_PERIOD = 34
+STOCH_RSI_PERIOD = 14
+STOCH_RSI_SMOOTH = 3
+MFI_PERIOD = 14
+
+# Running sums are rebuilt from their window this often to bound float drift
+RESYNC_INTERVAL = 1000
+
+# Initial number of indicator rows a series buffer holds
+BUFFER_SIZE = 256
+
+# Marks a read of the committed state, without a pending value
+_NO_PENDING = object()
+
+INDICATOR_COLUMNS = [
+    "sma_20", "sma_50", "ema_12", "ema_26",
+    "macd", "macd_signal", "macd_hist",
+    "rsi", "atr",
+    "bb_upper", "bb_middle", "bb_lower",
+    "awesome_oscillator", "stoch_rsi_k", "stoch_rsi_d", "mfi",
+]
+
+
+class _RollingWindow:
+    """Fixed-size window with a running sum and sum of squares."""
+
+    def __init__(self, period):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def push(self, value):
+        if len(self.values) == self.period:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+        self.updates += 1
+        if self.updates % RESYNC_INTERVAL == 0:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    def totals(self, pending=_NO_PENDING):
+        """Return (count, sum, sum of squares), with `pending` as the newest value if given."""
+        count, total, total_sq = len(self.values), self.total, self.total_sq
+        if pending is _NO_PENDING:
+            return count, total, total_sq
+        total += pending
+        total_sq += pending * pending
+        if count == self.period:
+            old = self.values[0]
+            total -= old
+            total_sq -= old * old
+        else:
+            count += 1
+        return count, total, total_sq
+
+    def mean(self, pending=_NO_PENDING):
+        count, total, _ = self.totals(pending)
+        return total / self.period if count == self.period else None
+
+    def std(self, pending=_NO_PENDING):
+        """Sample standard deviation (ddof=1), matching pandas' rolling().std()."""
+        count, total, total_sq = self.totals(pending)
+        if count != self.period:
+            return None
+        n = self.period
+        variance = (total_sq - total * total / n) / (n - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class _Ema:
+    """Exponential moving average seeded with the first value (pandas adjust=False)."""
+
+    def __init__(self, period):
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+
+    def push(self, value):
+        self.value = self.peek(value)
+        return self.value
+
+    def peek(self, value):
+        """Return the average `push(value)` would give, without pushing it."""
+        if self.value is None:
+            return value
+        return self.value + self.alpha * (value - self.value)
+
+
+class _Wilder:
+    """Wilder smoothing seeded with the simple mean of the first `period` values."""
+
+    def __init__(self, period):
+        self.period = period
+        self.seed = []
+        self.value = None
+
+    def push(self, value):
+        if self.value is None:
+            self.seed.append(value)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = []
+        else:
+            self.value = (self.value * (self.period - 1) + value) / self.period
+        return self.value
+
+    def peek(self, value):
+        """Return the average `push(value)` would give, without pushing it."""
+        if self.value is not None:
+            return (self.value * (self.period - 1) + value) / self.period
+        if len(self.seed) + 1 == self.period:
+            return (sum(self.seed) + value) / self.period
+        return None
+
+
+class _RecentValues:
+    """Last `period` values of a series that may contain gaps (None)."""
+
+    def __init__(self, period):
+        self.values = deque(maxlen=period)
+
+    def push(self, value):
+        self.values.append(value)
+
+    def _window(self, pending):
+        """The values, with `pending` as the newest if given, when they fill the window without gaps."""
+        values = self.values
+        if pending is not _NO_PENDING:
+            values = list(values)
+            if len(values) == self.values.maxlen:
+                del values[0]
+            values.append(pending)
+        if len(values) == self.values.maxlen and None not in values:
+            return values
+        return None
+
+    def mean(self, pending=_NO_PENDING):
+        values = self._window(pending)
+        return sum(values) / len(values) if values is not None else None
+
+    def range(self, pending=_NO_PENDING):
+        """Return (min, max) of a full window without gaps, else None."""
+        values = self._window(pending)
+        return (min(values), max(values)) if values is not None else None
+
+
+class IndicatorState:
+    """Rolling indicator state for one candle series."""
+
+    def __init__(self):
+        self.windows = {period: _RollingWindow(period) for period in SMA_PERIODS}
+        self.emas = {period: _Ema(period) for period in EMA_PERIODS}
+        self.macd_signal = _Ema(MACD_SIGNAL_PERIOD)
+        self.avg_gain = _Wilder(RSI_PERIOD)
+        self.avg_loss = _Wilder(RSI_PERIOD)
+        self.atr = _Wilder(ATR_PERIOD)
+        self.ao_fast = _RollingWindow(AO_FAST_PERIOD)
+        self.ao_slow = _RollingWindow(AO_SLOW_PERIOD)
+        self.recent_rsi = _RecentValues(STOCH_RSI_PERIOD)
+        self.stoch_rsi = _RecentValues(STOCH_RSI_SMOOTH)
+        self.stoch_rsi_k = _RecentValues(STOCH_RSI_SMOOTH)
+        self.positive_flow = _RollingWindow(MFI_PERIOD)
+        self.negative_flow = _RollingWindow(MFI_PERIOD)
+        self.prev_close = None
+        self.prev_typical = None
+        # Timestamp and close of the last candle folded into the state
+        self.last_index = None
+        self.last_close = None
+
+    def advance(self, high, low, close, volume=None, commit=True):
+        """
+        Return one candle's indicator values.
+
+        With commit=True the candle is folded into the state (it has
+        closed); otherwise it is only read against the state, which is left
+        unchanged.
+        """
+        def feed(component, value):
+            # The argument that reads the component as if `value` had been pushed
+            if commit:
+                component.push(value)
+                return _NO_PENDING
+            return value
+
+        def step(average, value):
+            return average.push(value) if commit else average.peek(value)
+
+        row = {}
+
+        closes = {period: feed(window, close) for period, window in self.windows.items()}
+        for period, window in self.windows.items():
+            row[f"sma_{period}"] = window.mean(closes[period])
+
+        bb_window = self.windows[BB_PERIOD]
+        middle, std = bb_window.mean(closes[BB_PERIOD]), bb_window.std(closes[BB_PERIOD])
+        row["bb_middle"] = middle
+        row["bb_upper"] = middle + BB_STD * std if middle is not None else None
+        row["bb_lower"] = middle - BB_STD * std if middle is not None else None
+
+        for period, ema in self.emas.items():
+            row[f"ema_{period}"] = step(ema, close)
+        macd = row["ema_12"] - row["ema_26"]
+        signal = step(self.macd_signal, macd)
+        row["macd"] = macd
+        row["macd_signal"] = signal
+        row["macd_hist"] = macd - signal
+
+        rsi = None
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            avg_gain = step(self.avg_gain, max(change, 0.0))
+            avg_loss = step(self.avg_loss, max(-change, 0.0))
+            if avg_gain is not None and avg_loss is not None:
+                rsi = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        row["rsi"] = rsi
+
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        row["atr"] = step(self.atr, true_range)
+
+        median = (high + low) / 2.0
+        fast = self.ao_fast.mean(feed(self.ao_fast, median))
+        slow = self.ao_slow.mean(feed(self.ao_slow, median))
+        row["awesome_oscillator"] = fast - slow if fast is not None and slow is not None else None
+
+        # Stochastic RSI in percent, %K and %D smoothed with simple means
+        rsi_range = self.recent_rsi.range(feed(self.recent_rsi, rsi))
+        stoch = None
+        if rsi_range is not None and rsi_range[1] > rsi_range[0]:
+            stoch = (rsi - rsi_range[0]) / (rsi_range[1] - rsi_range[0]) * 100.0
+        row["stoch_rsi_k"] = self.stoch_rsi.mean(feed(self.stoch_rsi, stoch))
+        row["stoch_rsi_d"] = self.stoch_rsi_k.mean(feed(self.stoch_rsi_k, row["stoch_rsi_k"]))
+
+        mfi = None
+        typical = (high + low + close) / 3.0
+        if volume is not None and self.prev_typical is not None:
+            flow = typical * volume
+            count, positive, _ = self.positive_flow.totals(
+                feed(self.positive_flow, flow if typical > self.prev_typical else 0.0))
+            _, negative, _ = self.negative_flow.totals(
+                feed(self.negative_flow, flow if typical < self.prev_typical else 0.0))
+            if count == MFI_PERIOD:
+                mfi = 100.0 if negative <= 0 else 100.0 - 100.0 / (1.0 + positive / negative)
+        row["mfi"] = mfi
+
+        if commit:
+            self.prev_close = close
+            self.prev_typical = typical
+        return row
+
+
+def _columns(frame):
+    """Return high/low/close/volume arrays; high and low fall back to close, volume to None."""
+    close = frame["close"].to_numpy(dtype=float)
+    high = frame["high"].to_numpy(dtype=float) if "high" in frame.columns else close
+    low = frame["low"].to_numpy(dtype=float) if "low" in frame.columns else close
+    volume = frame["volume"].to_numpy(dtype=float) if "volume" in frame.columns else [None] * len(close)
+    return high, low, close, volume
+
+
+def _row_values(row):
+    return [np.nan if row[col] is None else row[col] for col in INDICATOR_COLUMNS]
+
+
+class _Series:
+    """Committed state plus the indicator rows of the closed candles it covers."""
+
+    def __init__(self):
+        self.state = IndicatorState()
+        # Rows start:end of the buffers are kept; appends are amortized O(1)
+        self.values = np.empty((BUFFER_SIZE, len(INDICATOR_COLUMNS)), dtype=float)
+        self.stamps = np.empty(BUFFER_SIZE, dtype=object)
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def append(self, stamp, row):
+        if self.end == len(self.stamps):
+            self._make_room()
+        self.values[self.end] = _row_values(row)
+        self.stamps[self.end] = stamp
+        self.end += 1
+
+    def _make_room(self):
+        # Move the kept rows to the front, growing the buffers when they are half full
+        kept = len(self)
+        size = len(self.stamps) * 2 if kept * 2 > len(self.stamps) else len(self.stamps)
+        values = np.empty((size, len(INDICATOR_COLUMNS)), dtype=float)
+        stamps = np.empty(size, dtype=object)
+        values[:kept] = self.values[self.start:self.end]
+        stamps[:kept] = self.stamps[self.start:self.end]
+        self.values, self.stamps, self.start, self.end = values, stamps, 0, kept
+
+    def trim(self, first_stamp):
+        """Drop the rows of candles older than `first_stamp`."""
+        while self.start < self.end and self.stamps[self.start] < first_stamp:
+            self.stamps[self.start] = None
+            self.start += 1
+
+    def first_stamp(self):
+        return self.stamps[self.start] if self.start < self.end else None
+
+
+class IndicatorEngine:
+    """Keeps the rolling indicator state per (symbol, granularity)."""
+
+    def __init__(self):
+        self._series = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.full_recomputes = 0
+        self.incremental_updates = 0
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def compute(self, symbol, granularity, frame):
+        """
+        Return a DataFrame of indicator columns aligned with `frame`'s index.
+
+        The last candle is treated as still open: it is evaluated on a copy of
+        the state and only committed once a newer candle arrives.
+        """
+        if frame.empty:
+            return pd.DataFrame(index=frame.index, columns=INDICATOR_COLUMNS, dtype=float)
+
+        key = (symbol, granularity)
+        with self._key_lock(key):
+            high, low, close, volume = _columns(frame)
+            index = frame.index
+            last = len(frame) - 1
+
+            series = self._series.get(key)
+            start = self._resume_position(series, frame, close)
+            if start is None:
+                series = _Series()
+                start = 0
+                self.full_recomputes += 1
+                logger.debug(f"Full indicator recompute for {symbol}/{granularity} over {len(frame)} candle(s)")
+            else:
+                self.incremental_updates += 1
+
+            state = series.state
+            for i in range(start, last):
+                series.append(index[i], state.advance(high[i], low[i], close[i], volume[i]))
+            if start < last:
+                state.last_index = index[last - 1]
+                state.last_close = close[last - 1]
+
+            # Only keep rows still inside the candle window
+            series.trim(index[0])
+            self._series[key] = series
+
+            # Evaluate the still-open candle without committing it
+            provisional = state.advance(high[last], low[last], close[last], volume[last], commit=False)
+
+            values = np.empty((len(series) + 1, len(INDICATOR_COLUMNS)), dtype=float)
+            values[:-1] = series.values[series.start:series.end]
+            values[-1] = _row_values(provisional)
+            if len(series) == last and (last == 0 or series.first_stamp() == index[0]):
+                # The kept rows are exactly the window's closed candles
+                return pd.DataFrame(values, index=index, columns=INDICATOR_COLUMNS)
+            stamps = np.append(series.stamps[series.start:series.end], np.array([index[last]], dtype=object))
+            result = pd.DataFrame(values, index=pd.Index(stamps), columns=INDICATOR_COLUMNS)
+            return result.reindex(index)
+
+    @staticmethod
+    def _resume_position(series, frame, close):
+        """
+        Return the position of the first uncommitted candle, or None when a
+        full recompute is needed (cold start, gap or rewritten history).
+        """
+        if series is None or series.state.last_index is None:
+            return None
+        try:
+            position = frame.index.get_loc(series.state.last_index)
+        except KeyError:
+            # The committed candle fell out of the window or a gap appeared
+            return None
+        if not isinstance(position, (int, np.integer)) or position >= len(frame) - 1:
+            return None
+        if close[position] != series.state.last_close:
+            # A closed candle changed upstream - rebuild from scratch
+            return None
+        return position + 1
+
+    def apply(self, symbol, granularity, frame):
+        """Return a copy of `frame` with the engine's indicator columns attached."""
+        indicators = self.compute(symbol, granularity, frame)
+        result = frame.copy()
+        for col in INDICATOR_COLUMNS:
+            result[col] = indicators[col]
+        return result
+
+    def apply_many(self, granularity, frames):
+        """
+        Attach indicators to several symbols' frames in one call.
+
+        Args:
+            frames: Dictionary mapping symbol to its candle DataFrame
+
+        Returns:
+            Dictionary mapping symbol to its frame with indicator columns
+        """
+        return {symbol: self.apply(symbol, granularity, frame) for symbol, frame in frames.items()}
+
+    def reset(self, symbol=None):
+        """Forget the rolling state for one symbol, or for every symbol."""
+        with self._lock:
+            if symbol is None:
+                self._series.clear()
+            else:
+                for key in [k for k in self._series if k[0] == symbol]:
+                    del self._series[key]
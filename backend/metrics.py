@@ -0,0 +1,359 @@
+"""
+Metrics module
+
+This module collects the API's runtime metrics and renders them in the
+Prometheus text exposition format:
+
+- per-route request duration histograms, request counters and in-flight
+  gauges, recorded by wrapping each route's ASGI app (no per-request route
+  matching on top of the router's own)
+- per-method duration histograms of the upstream trader calls
+- values read from other components only when /metrics is scraped (cache
+  hit/miss counters and the like), so they cost nothing between scrapes
+- a sampler thread keeping bounded CPU and RSS histories of the process
+
+Recording a value takes one lock and a bisect; nothing is formatted until a
+scrape.
+"""
+
+import os
+import sys
+import time
+import bisect
+import logging
+import threading
+import functools
+from collections import deque
+from datetime import datetime
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the request and upstream call histogram buckets
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Trader methods that talk to the exchange or the model
+UPSTREAM_METHODS = ("fetch_market_data", "fetch_account_balance", "execute_trade", "analyze_with_ai")
+
+# Seconds between two CPU/RSS samples and the number of samples kept
+SAMPLE_INTERVAL = float(os.getenv("METRICS_SAMPLE_INTERVAL", "5"))
+SAMPLE_HISTORY = int(os.getenv("METRICS_SAMPLE_HISTORY", "720"))
+
+# Starlette appends the charset to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=REQUEST_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (plus +Inf) followed by the sum
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                bucket = _labels(self.labelnames, labels, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{bucket} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(values[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Named metrics plus callbacks that report values at scrape time."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=REQUEST_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, name, kind, documentation, labelnames, collect):
+        """
+        Report a metric computed when /metrics is scraped.
+
+        Args:
+            collect: Callable returning {label_values_tuple: value}
+        """
+        self._collectors.append((name, kind, documentation, tuple(labelnames), collect))
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for name, kind, documentation, labelnames, collect in self._collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                logger.debug(f"Metrics collector {name} failed: {e}")
+                continue
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values.items():
+                if value is not None:
+                    lines.append(f"{name}{_labels(labelnames, labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request duration by route", ("route", "method"))
+requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ("route", "method", "status"))
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Requests (and open WebSockets) being handled by route", ("route",))
+upstream_duration = registry.histogram(
+    "trader_call_duration_seconds", "Duration of upstream trader calls by method and outcome", ("method", "outcome"))
+
+
+# Routes
+
+def _timed_route_app(route_app, route_path):
+    """Wrap one route's ASGI app to record its duration, status and in-flight count."""
+
+    async def timed_app(scope, receive, send):
+        if scope["type"] != "http":
+            # WebSockets only count as in flight while open
+            requests_in_flight.inc(route_path)
+            try:
+                await route_app(scope, receive, send)
+            finally:
+                requests_in_flight.dec(route_path)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        requests_in_flight.inc(route_path)
+        started = time.perf_counter()
+        try:
+            await route_app(scope, receive, send_with_status)
+        finally:
+            request_duration.observe(time.perf_counter() - started, route_path, method)
+            requests_total.inc(route_path, method, str(status[0]))
+            requests_in_flight.dec(route_path)
+
+    timed_app.metrics_route = route_path
+    return timed_app
+
+
+def instrument_routes(app):
+    """Record metrics for every route registered on `app`; safe to call more than once."""
+    count = 0
+    for route in app.router.routes:
+        route_app = getattr(route, "app", None)
+        path = getattr(route, "path", None)
+        if route_app is None or path is None or hasattr(route_app, "metrics_route"):
+            continue
+        route.app = _timed_route_app(route_app, path)
+        count += 1
+    if count:
+        logger.info(f"Recording request metrics for {count} route(s)")
+
+
+# Upstream trader calls
+
+def instrument_trader(trader, methods=UPSTREAM_METHODS):
+    """Time the trader's upstream calls; wraps the methods on the instance, once."""
+    if trader is None or getattr(trader, "_metrics_instrumented", False):
+        return trader
+    trader._metrics_instrumented = True
+
+    def wrap(name):
+        original = getattr(trader, name, None)
+        if original is None:
+            return
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = original(*args, **kwargs)
+                # execute_trade reports failures in its result instead of raising
+                outcome = "error" if isinstance(result, dict) and result.get("error") else "success"
+                return result
+            finally:
+                upstream_duration.observe(time.perf_counter() - started, name, outcome)
+
+        setattr(trader, name, timed)
+
+    for name in methods:
+        wrap(name)
+    return trader
+
+
+# Cache statistics
+
+def register_caches(caches):
+    """
+    Export hit/miss counters of caches that keep `hits` and `misses` attributes.
+
+    Args:
+        caches: {cache_name: cache_object}
+    """
+    for kind in ("hits", "misses"):
+        registry.add_collector(
+            f"cache_{kind}_total", "counter", f"Cache {kind} by cache", ("cache",),
+            lambda kind=kind: {(name,): getattr(cache, kind, None) for name, cache in caches.items()},
+        )
+
+
+# Process CPU and memory
+
+def _rss_bytes():
+    """Current resident set size, or the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class ResourceSampler:
+    """Bounded CPU and RSS history of this process, sampled by a background thread."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, history=SAMPLE_HISTORY):
+        self.interval = interval
+        self.cpu_usage_data = deque(maxlen=history)
+        self.memory_usage_data = deque(maxlen=history)
+        self._stop = threading.Event()
+        self._thread = None
+        self._last = (time.monotonic(), time.process_time())
+
+    def sample(self):
+        """Take one sample: CPU percent since the previous sample and the current RSS."""
+        now, cpu = time.monotonic(), time.process_time()
+        last_now, last_cpu = self._last
+        self._last = (now, cpu)
+        timestamp = datetime.now().isoformat()
+        percent = (cpu - last_cpu) / (now - last_now) * 100 if now > last_now else 0.0
+        self.cpu_usage_data.append({"timestamp": timestamp, "cpu_percent": round(percent, 2)})
+        self.memory_usage_data.append({"timestamp": timestamp, "rss_bytes": _rss_bytes()})
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._last = (time.monotonic(), time.process_time())
+            self._thread = threading.Thread(target=self._sample_loop, name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug(f"Resource sample failed: {e}")
+
+    def register(self):
+        """Export the latest sample and the process CPU time."""
+        registry.add_collector(
+            "process_cpu_percent", "gauge", "CPU use of the process over the last sample interval", (),
+            lambda: {(): self.cpu_usage_data[-1]["cpu_percent"] if self.cpu_usage_data else None},
+        )
+        registry.add_collector(
+            "process_resident_memory_bytes", "gauge", "Resident memory of the process", (),
+            lambda: {(): _rss_bytes()},
+        )
+        registry.add_collector(
+            "process_cpu_seconds_total", "counter", "User and system CPU time of the process", (),
+            lambda: {(): time.process_time()},
+        )
@@ -0,0 +1,383 @@
+"""
+Position Journal module
+
+This module keeps the active positions in memory and persists them as an
+append-only journal of position events (open, update, close) instead of
+rewriting the whole positions document on every change. Journal writes are
+batched and fsynced by a background thread, the journal is periodically
+compacted into a snapshot, and on startup the snapshot plus the journal
+tail are replayed to rebuild the positions map.
+
+Once attached, the journal is the trader's position store: its loads are
+served from memory and its saves are journaled as the events that changed
+the positions. The trader's own positions document is only rewritten from
+the journal every few seconds while positions change and before a strategy
+worker process reads it, and the changes a worker made to it are merged
+back afterwards.
+"""
+
+import os
+import copy
+import json
+import time
+import logging
+import functools
+import threading
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Journal events written since the last snapshot before compacting
+COMPACT_EVERY = 1000
+
+# Seconds between journal fsyncs while events are pending
+FSYNC_INTERVAL = 0.2
+
+# Minimum seconds between two writes of the trader's positions document
+EXPORT_INTERVAL = 5
+
+OP_OPEN = "open"
+OP_UPDATE = "update"
+OP_CLOSE = "close"
+# Marks the positions at this point as written to the trader's document
+OP_EXPORT = "export"
+
+
+def _position_map(positions):
+    """Return positions as a {position_id: position} dict from a dict or a list."""
+    if isinstance(positions, dict):
+        return {str(position_id): position for position_id, position in positions.items()}
+    result = {}
+    for position in positions or []:
+        position_id = position.get("id") or position.get("position_id")
+        if position_id is not None:
+            result[str(position_id)] = position
+    return result
+
+
+def _diff(base, target):
+    """Return the (op, position_id, data) events that turn `base` into `target`."""
+    events = [(OP_CLOSE, position_id, None) for position_id in base.keys() - target.keys()]
+    for position_id, position in target.items():
+        existing = base.get(position_id)
+        if existing is None or existing.keys() - position.keys():
+            # New, or fields were dropped, so write the whole position
+            if existing != position:
+                events.append((OP_OPEN, position_id, position))
+            continue
+        changes = {key: value for key, value in position.items() if existing.get(key) != value}
+        if changes:
+            events.append((OP_UPDATE, position_id, changes))
+    return events
+
+
+class PositionJournal:
+    """In-memory active positions backed by a snapshot and an event journal."""
+
+    def __init__(self, directory, compact_every=COMPACT_EVERY, fsync_interval=FSYNC_INTERVAL,
+                 export_interval=EXPORT_INTERVAL):
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.snapshot_path = os.path.join(self.directory, "positions.snapshot.json")
+        self.journal_path = os.path.join(self.directory, "positions.journal")
+        self.compact_every = compact_every
+        self.fsync_interval = fsync_interval
+        self.export_interval = export_interval
+
+        self.positions = {}
+        self.seq = 0
+        # Positions as last written to the trader's document (None until known)
+        self.exported = None
+        self._dirty = False
+        self._last_export = 0.0
+        self._load_document = None
+        self._save_document = None
+        self._since_snapshot = 0
+        self._pending = []
+        # Reentrant: the trader's save may load positions while an export holds it
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        # True once the journal has been reconciled with a trader
+        self.ready = False
+
+        self.replay()
+        self._file = open(self.journal_path, "a", encoding="utf-8")
+        self._writer = threading.Thread(target=self._write_loop, name="position-journal-writer", daemon=True)
+        self._writer.start()
+
+    # Replay
+
+    def replay(self):
+        """Rebuild the positions map from the snapshot and the journal tail."""
+        positions, seq, exported = {}, 0, None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            positions = snapshot.get("positions", {})
+            seq = snapshot.get("seq", 0)
+            exported = snapshot.get("exported")
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            logger.error(f"Unreadable positions snapshot {self.snapshot_path}: {e}")
+
+        replayed = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-write
+                        logger.warning("Skipping incomplete positions journal entry")
+                        continue
+                    # Events at or below the snapshot seq are already in it
+                    if event.get("seq", 0) <= seq:
+                        continue
+                    if event.get("op") == OP_EXPORT:
+                        exported = copy.deepcopy(positions)
+                    self._apply(positions, event)
+                    seq = event["seq"]
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            self.positions = positions
+            self.seq = seq
+            self.exported = exported
+            self._dirty = exported is not None and exported != positions
+            self._since_snapshot = replayed
+        logger.info(f"Replayed {len(positions)} position(s) from snapshot and {replayed} journal event(s)")
+
+    @staticmethod
+    def _apply(positions, event):
+        op, position_id = event.get("op"), event.get("id")
+        if op == OP_OPEN:
+            positions[position_id] = event.get("data") or {}
+        elif op == OP_UPDATE and position_id in positions:
+            positions[position_id].update(event.get("data") or {})
+        elif op == OP_CLOSE:
+            positions.pop(position_id, None)
+
+    # Events
+
+    def _record(self, op, position_id, data=None):
+        """Apply an event to the map and queue it for the journal."""
+        event = {"op": op, "id": str(position_id)}
+        if data is not None:
+            event["data"] = copy.deepcopy(data)
+        with self._lock:
+            self.seq += 1
+            event["seq"] = self.seq
+            self._apply(self.positions, copy.deepcopy(event))
+            self._pending.append(json.dumps(event, default=str))
+            self._since_snapshot += 1
+            self._dirty = True
+        self._wakeup.set()
+
+    def _mark_exported(self):
+        """Journal that the current positions are what the trader's document holds."""
+        with self._lock:
+            self.seq += 1
+            self.exported = copy.deepcopy(self.positions)
+            self._pending.append(json.dumps({"op": OP_EXPORT, "seq": self.seq}))
+            self._since_snapshot += 1
+            self._dirty = False
+        self._last_export = time.monotonic()
+        self._wakeup.set()
+
+    def add(self, position_id, position):
+        self._record(OP_OPEN, position_id, position)
+
+    def update(self, position_id, changes):
+        """Merge `changes` into an open position; returns False if it is not open."""
+        if str(position_id) not in self.positions:
+            return False
+        self._record(OP_UPDATE, position_id, changes)
+        return True
+
+    def remove(self, position_id):
+        if str(position_id) in self.positions:
+            self._record(OP_CLOSE, position_id)
+
+    def sync_from(self, positions):
+        """
+        Journal the differences between `positions` and the current map.
+
+        Returns:
+            Number of events written
+        """
+        target = _position_map(positions)
+        with self._lock:
+            events = _diff(self.positions, target)
+            for op, position_id, data in events:
+                self._record(op, position_id, data)
+        return len(events)
+
+    def reconcile(self, document):
+        """
+        Merge the trader's positions document into the map.
+
+        Only the changes made to the document since the journal last wrote it
+        (e.g. by a strategy worker process) are applied, so positions changed
+        here in the meantime are kept. Without a previous write, the document
+        replaces the map.
+
+        Returns:
+            Number of events written
+        """
+        target = _position_map(document)
+        with self._lock:
+            base = self.positions if self.exported is None else self.exported
+            events = [event for event in _diff(base, target)
+                      if event[0] == OP_OPEN or event[1] in self.positions]
+            for op, position_id, data in events:
+                self._record(op, position_id, data)
+            if self.positions == target:
+                self._mark_exported()
+        # Write back the positions changed here since the last export
+        self.export()
+        return len(events)
+
+    # Reads
+
+    def get(self, position_id):
+        with self._lock:
+            position = self.positions.get(str(position_id))
+            return copy.deepcopy(position) if position is not None else None
+
+    def all(self):
+        """Return a copy of every open position, keyed by position id."""
+        with self._lock:
+            return copy.deepcopy(self.positions)
+
+    def __contains__(self, position_id):
+        return str(position_id) in self.positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    # Persistence
+
+    def _write_loop(self):
+        while not self._closed:
+            # While the document is behind, wake up in time for its next export
+            timeout = None
+            if self._dirty and self._save_document is not None:
+                timeout = max(0.0, self._last_export + self.export_interval - time.monotonic())
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if self._dirty and time.monotonic() - self._last_export >= self.export_interval:
+                    self.export()
+                if self._since_snapshot >= self.compact_every:
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Error writing positions journal: {e}")
+            # Let more events gather into the next fsync
+            time.sleep(self.fsync_interval)
+
+    def flush(self):
+        """Append pending events to the journal and fsync it."""
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            self._file.write("\n".join(batch) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            return len(batch)
+
+    def compact(self):
+        """Write the positions map as a snapshot and truncate the journal."""
+        with self._io_lock:
+            with self._lock:
+                positions = copy.deepcopy(self.positions)
+                exported = copy.deepcopy(self.exported)
+                seq = self.seq
+                # Pending events up to `seq` are covered by the snapshot
+                self._pending = []
+                self._since_snapshot = 0
+
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"seq": seq, "positions": positions, "exported": exported}, f, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            self._file.close()
+            self._file = open(self.journal_path, "w", encoding="utf-8")
+        logger.info(f"Compacted positions journal into a snapshot of {len(positions)} position(s)")
+
+    def export(self):
+        """
+        Write the positions to the trader's document if they changed since the last write.
+
+        Returns:
+            True if the document was written
+        """
+        if self._save_document is None:
+            return False
+        # Held across the write so no event lands between the copy and its export marker
+        with self._lock:
+            if not self._dirty:
+                return False
+            try:
+                self._save_document(copy.deepcopy(self.positions))
+            except Exception:
+                # Retry with the next interval rather than on every wakeup
+                self._last_export = time.monotonic()
+                raise
+            self._mark_exported()
+        return True
+
+    def close(self):
+        """Write back the positions, flush pending events and stop the writer thread."""
+        try:
+            self.export()
+        except Exception as e:
+            logger.error(f"Error writing positions document on close: {e}")
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        with self._io_lock:
+            self._file.close()
+
+    # Trader integration
+
+    def attach(self, trader):
+        """
+        Make the journal `trader`'s position store and merge its positions document.
+
+        The trader's load_active_positions and save_active_positions methods
+        are replaced on the instance: loads are served from memory, and a save
+        is journaled as the events that changed the positions instead of
+        rewriting the document. The original methods are kept to merge and
+        export the document.
+        """
+        if getattr(trader, "_position_journal", None) is not self:
+            trader._position_journal = self
+            trader._position_document = (trader.load_active_positions, trader.save_active_positions)
+
+            @functools.wraps(trader._position_document[0])
+            def load_active_positions(*args, **kwargs):
+                return self.all()
+
+            @functools.wraps(trader._position_document[1])
+            def save_active_positions(positions, *args, **kwargs):
+                self.sync_from(positions)
+
+            trader.load_active_positions = load_active_positions
+            trader.save_active_positions = save_active_positions
+
+        self._load_document, self._save_document = trader._position_document
+        events = self.reconcile(self._load_document())
+        self.ready = True
+        return events
@@ -0,0 +1,179 @@
+"""
+Price Oracle module
+
+This module keeps the last traded price of each symbol from the exchange
+ticker endpoint (last price plus best bid/ask), so order placement and P&L
+read a cached float instead of downloading a candle frame for one number.
+Quotes have a freshness bound; symbols read recently are refreshed in the
+background so readers rarely wait on the network, and when the ticker is
+unreachable the close of the newest cached candle is used instead.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import Future
+
+from http_pool import shared_pool
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Public Coinbase Exchange ticker: last trade price and best bid/ask, or the
+# local simulator's copy of it
+TICKER_URL = "https://api.exchange.coinbase.com/products/{product_id}/ticker"
+if os.getenv("EXCHANGE_SIMULATOR_URL"):
+    TICKER_URL = os.getenv("EXCHANGE_SIMULATOR_URL").rstrip("/") + "/products/{product_id}/ticker"
+TICKER_TIMEOUT = 5
+
+# Seconds a quote may be served before it must be fetched again
+PRICE_MAX_AGE = float(os.getenv("PRICE_MAX_AGE", "10"))
+
+# Background refresh period for symbols read in the last WATCH_WINDOW seconds
+REFRESH_INTERVAL = 2
+WATCH_WINDOW = 5 * 60
+
+# Keep-alive connections shared with the rest of the process
+_session = shared_pool.session(TICKER_URL)
+
+
+def fetch_coinbase_ticker(symbol):
+    """Fetch the ticker of `symbol` against USD; returns (price, bid, ask)."""
+    response = _session.get(TICKER_URL.format(product_id=f"{symbol}-USD"), timeout=TICKER_TIMEOUT)
+    response.raise_for_status()
+    ticker = response.json()
+    bid = float(ticker["bid"]) if ticker.get("bid") else None
+    ask = float(ticker["ask"]) if ticker.get("ask") else None
+    return float(ticker["price"]), bid, ask
+
+
+class Quote:
+    """Last price of one symbol and where it came from."""
+
+    __slots__ = ("price", "bid", "ask", "source", "fetched_at", "fetched_monotonic")
+
+    def __init__(self, price, bid=None, ask=None, source="ticker"):
+        self.price = price
+        self.bid = bid
+        self.ask = ask
+        self.source = source
+        self.fetched_at = datetime.now()
+        self.fetched_monotonic = time.monotonic()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.fetched_monotonic
+
+    def to_dict(self):
+        return {
+            "price": self.price,
+            "bid": self.bid,
+            "ask": self.ask,
+            "source": self.source,
+            "as_of": self.fetched_at.isoformat(),
+            "age_seconds": round(self.age, 3),
+        }
+
+
+class PriceOracle:
+    """Per-symbol last-price cache fed by the exchange ticker."""
+
+    def __init__(self, fetch_ticker=fetch_coinbase_ticker, fallback=None, max_age=PRICE_MAX_AGE):
+        """
+        Args:
+            fetch_ticker: Callable(symbol) -> (price, bid, ask)
+            fallback: Optional callable(symbol) -> price used when the ticker fails
+            max_age: Freshness bound of a quote in seconds
+        """
+        self.fetch_ticker = fetch_ticker
+        self.fallback = fallback
+        self.max_age = max_age
+        self._quotes = {}
+        self._inflight = {}
+        self._last_read = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def cached(self, symbol="BTC", max_age=None):
+        """Return the cached price if it is fresh enough, else None. Never blocks on I/O."""
+        max_age = self.max_age if max_age is None else max_age
+        self._last_read[symbol] = time.monotonic()
+        quote = self._quotes.get(symbol)
+        if quote is not None and quote.age < max_age:
+            return quote.price
+        return None
+
+    def get(self, symbol="BTC", max_age=None):
+        """Return the current price of `symbol`, fetching the ticker if the quote is stale."""
+        price = self.cached(symbol, max_age)
+        if price is not None:
+            return price
+        return self.refresh(symbol).price
+
+    def quote(self, symbol="BTC", max_age=None):
+        """Return the full quote of `symbol` as a dictionary."""
+        self.get(symbol, max_age)
+        return self._quotes[symbol].to_dict()
+
+    def refresh(self, symbol):
+        """Fetch a new quote; concurrent refreshes of one symbol share a request."""
+        with self._lock:
+            future = self._inflight.get(symbol)
+            owner = future is None
+            if owner:
+                future = self._inflight[symbol] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            quote = self._fetch(symbol)
+            self._quotes[symbol] = quote
+            future.set_result(quote)
+            return quote
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(symbol, None)
+
+    def _fetch(self, symbol):
+        try:
+            price, bid, ask = self.fetch_ticker(symbol)
+            return Quote(price, bid, ask)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Ticker unavailable for {symbol}, using the latest candle close: {e}")
+            price = self.fallback(symbol)
+            if price is None:
+                raise
+            return Quote(float(price), source="candles")
+
+    # Background refresh
+
+    def start(self):
+        """Start refreshing recently read symbols in the background."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="price-oracle", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(REFRESH_INTERVAL):
+            now = time.monotonic()
+            for symbol, last_read in list(self._last_read.items()):
+                if now - last_read > WATCH_WINDOW:
+                    self._last_read.pop(symbol, None)
+                    continue
+                try:
+                    self.refresh(symbol)
+                except Exception as e:
+                    logger.debug(f"Background price refresh failed for {symbol}: {e}")
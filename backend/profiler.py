@@ -0,0 +1,265 @@
+"""
+Profiler module
+
+This module captures on-demand profiles of the running API, either of a
+single request (sent with an X-Profile header) or of the whole process for a
+number of seconds (through the admin endpoint). Profiles are returned as
+collapsed stacks (flamegraph.pl / speedscope input) or speedscope JSON.
+
+Profiling is a wall-clock stack sampler over every thread, so time spent in
+the trader I/O pool (exchange calls, indicator calculations) shows up next
+to the event loop's own work; each stack is rooted at its thread name.
+
+Profiling is disabled unless PROFILING_TOKEN is set, in which case callers
+must send it in the X-Profile-Token header. When disabled the middleware is
+not installed at all.
+"""
+
+import os
+import sys
+import json
+import hmac
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Shared secret enabling profiling; unset means profiling is off
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+
+# Seconds between two stack samples
+SAMPLE_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+
+# Longest whole-process profile in seconds
+MAX_PROFILE_SECONDS = 120
+
+FORMAT_COLLAPSED = "collapsed"
+FORMAT_SPEEDSCOPE = "speedscope"
+SUPPORTED_FORMATS = (FORMAT_COLLAPSED, FORMAT_SPEEDSCOPE)
+
+PROFILE_HEADER = b"x-profile"
+TOKEN_HEADER = b"x-profile-token"
+
+# Leaf functions of threads that are only waiting for work
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+# Only one profile runs at a time
+_active = threading.Lock()
+
+
+def check_token(token):
+    """Return True if `token` matches PROFILING_TOKEN."""
+    if not PROFILING_TOKEN or not token:
+        return False
+    return hmac.compare_digest(str(token), PROFILING_TOKEN)
+
+
+class StackSampler:
+    """Samples the Python stacks of every thread at a fixed interval."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, include_idle=False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+                    frame = frame.f_back
+                if not self.include_idle and stack and (os.path.basename(stack[0][0]), stack[0][1]) in IDLE_LEAVES:
+                    continue
+                stack.append((None, names.get(ident, f"thread-{ident}"), 0))
+                # Root (thread name) first
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    # Output formats
+
+    @staticmethod
+    def _frame_label(frame):
+        filename, name, _ = frame
+        if filename is None:
+            return name
+        return f"{name} ({os.path.basename(filename)})"
+
+    def collapsed(self):
+        """Collapsed stacks: one "root;...;leaf count" line per distinct stack."""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            lines.append(";".join(self._frame_label(frame).replace(";", ":") for frame in stack) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name="profile"):
+        """Speedscope JSON with one sampled profile per thread, weighted in seconds."""
+        frames = []
+        frame_index = {}
+        profiles = {}
+        for stack, count in self.stacks.items():
+            thread_name = stack[0][1]
+            indexes = []
+            for frame in stack[1:]:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[1], "file": frame[0], "line": frame[2]})
+                indexes.append(frame_index[frame])
+            profile = profiles.setdefault(thread_name, {"samples": [], "weights": []})
+            profile["samples"].append(indexes)
+            profile["weights"].append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "btc-trader profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(profile["weights"]),
+                    "samples": profile["samples"],
+                    "weights": profile["weights"],
+                }
+                for thread_name, profile in sorted(profiles.items())
+            ],
+        }
+
+    def render(self, profile_format, name="profile"):
+        """Return (body_bytes, media_type) in the requested format."""
+        if profile_format == FORMAT_SPEEDSCOPE:
+            return json.dumps(self.speedscope(name)).encode("utf-8"), "application/json"
+        return self.collapsed().encode("utf-8"), "text/plain"
+
+
+async def profile_process(seconds, interval=SAMPLE_INTERVAL):
+    """
+    Sample the whole process for `seconds` without blocking the event loop.
+
+    Returns:
+        The stopped StackSampler, or None if another profile is running
+    """
+    if not _active.acquire(blocking=False):
+        return None
+    try:
+        sampler = StackSampler(interval).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+        return sampler
+    finally:
+        _active.release()
+
+
+async def _send_response(send, status, body, media_type, headers=()):
+    if media_type.startswith("text/"):
+        media_type += "; charset=utf-8"
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", media_type.encode()), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def _json_error(status, detail):
+    return status, json.dumps({"detail": detail}).encode("utf-8"), "application/json"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests sent with "X-Profile: collapsed|speedscope".
+
+    The request runs as usual but its response is replaced by the profile;
+    the original status code is returned in X-Profiled-Status.
+    """
+
+    def __init__(self, app, interval=SAMPLE_INTERVAL):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile_format = token = None
+        for key, value in scope["headers"]:
+            if key == PROFILE_HEADER:
+                profile_format = value.decode("latin-1").strip().lower()
+            elif key == TOKEN_HEADER:
+                token = value.decode("latin-1")
+        if profile_format is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not check_token(token):
+            await _send_response(send, *_json_error(403, "Invalid or missing X-Profile-Token"))
+            return
+        if profile_format not in SUPPORTED_FORMATS:
+            await _send_response(send, *_json_error(400, f"Unsupported profile format: {profile_format}. Supported formats: {', '.join(SUPPORTED_FORMATS)}"))
+            return
+        if not _active.acquire(blocking=False):
+            await _send_response(send, *_json_error(409, "Another profile is already running"))
+            return
+
+        status = [500]
+
+        async def capture(message):
+            # The profile replaces the response, so the original one is dropped
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+
+        try:
+            sampler = StackSampler(self.interval).start()
+            try:
+                await self.app(scope, receive, capture)
+            finally:
+                sampler.stop()
+        finally:
+            _active.release()
+
+        name = f"{scope['method']} {scope['path']}"
+        logger.info(f"Profiled {name} ({sampler.duration * 1000:.0f} ms, {sampler.samples} samples)")
+        body, media_type = sampler.render(profile_format, name)
+        await _send_response(send, 200, body, media_type, (
+            (b"x-profiled-status", str(status[0]).encode()),
+            (b"x-profile-duration", f"{sampler.duration:.6f}".encode()),
+        ))
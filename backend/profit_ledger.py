@@ -0,0 +1,243 @@
+"""
+Profit Ledger module
+
+This module keeps a materialized profit ledger for a trader: running
+realized P&L, buy/sell volume, invested capital, the set of closed positions
+and the open positions. It is built once from the full trade history and
+then updated as the trader logs trades and opens, resizes or removes
+positions, so a profit summary only costs O(open positions).
+"""
+
+import inspect
+import logging
+import functools
+import threading
+from datetime import datetime
+
+from utils import calculate_profit_loss, realized_trade_profit, trades_in_time_order
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Passed as the trade history limit when rebuilding, so no trades are cut off
+FULL_HISTORY_LIMIT = 10 ** 9
+
+
+def _bound_args(func, args, kwargs):
+    """Return the call arguments of `func` as an ordered list of values, or None."""
+    try:
+        return list(inspect.signature(func).bind(*args, **kwargs).arguments.values())
+    except (TypeError, ValueError):
+        return None
+
+
+def _bound_arg(func, args, kwargs, name, position):
+    """Return a named call argument of `func`, falling back to its position."""
+    try:
+        arguments = inspect.signature(func).bind(*args, **kwargs).arguments
+    except (TypeError, ValueError):
+        arguments = dict(kwargs)
+        values = list(args)
+    else:
+        values = list(arguments.values())
+    if name in arguments:
+        return arguments[name]
+    return values[position] if len(values) > position else None
+
+
+def _iter_positions(active_positions):
+    """Yield (position_id, position) pairs from a dict or a list of positions."""
+    if isinstance(active_positions, dict):
+        yield from active_positions.items()
+    else:
+        for position in active_positions or []:
+            yield position.get("id") or position.get("position_id"), position
+
+
+class ProfitLedger:
+    """Running totals behind calculate_total_profit_summary."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self._listeners = []
+        self.ready = False
+
+    def add_listener(self, callback):
+        """Call `callback(trade)` with every trade record the ledger sees logged."""
+        self._listeners.append(callback)
+
+    def _reset(self):
+        self.realized_profit = 0
+        self.total_buy_volume = 0
+        self.total_sell_volume = 0
+        self.total_investment = 0
+        self.closed_positions = set()
+        self.open_positions = {}
+        # Cost and size bought per position, used to price its sell trades
+        self._entries = {}
+
+    def rebuild(self, trade_history, active_positions):
+        """Recompute every total from the full trade history and open positions."""
+        with self._lock:
+            self._reset()
+            for trade in trades_in_time_order(trade_history):
+                self._apply_trade(trade)
+            for position_id, position in _iter_positions(active_positions):
+                self.open_positions[position_id] = {
+                    "entry_price": position.get("entry_price", 0),
+                    "size": position.get("size", 0),
+                }
+            self.ready = True
+        logger.info(f"Profit ledger rebuilt from {len(trade_history or [])} trade(s) and {len(self.open_positions)} open position(s)")
+
+    def _apply_trade(self, trade):
+        """Fold one trade record into the totals. Caller holds the lock."""
+        profit = realized_trade_profit(trade, self._entries)
+        self.realized_profit += profit
+        if trade.get("side") == "BUY":
+            price = trade.get("price", 0)
+            size = trade.get("size", 0)
+            self.total_investment += price * size
+            self.total_buy_volume += size
+        elif trade.get("side") == "SELL":
+            self.total_sell_volume += trade.get("size", 0)
+            self.closed_positions.add(trade.get("position_id"))
+        return profit
+
+    def record_trade(self, position_id, size, side, price, reason=None):
+        """Record a trade logged through the trader and pass it on to the listeners."""
+        trade = {
+            "timestamp": datetime.now().isoformat(),
+            "position_id": position_id,
+            "size": size,
+            "side": side,
+            "price": price,
+            "reason": reason
+        }
+        with self._lock:
+            profit = self._apply_trade(trade)
+        if side == "SELL":
+            # Stored with the trade; a rebuild from the trader's log derives the same value
+            trade["profit_amount"] = profit
+
+        for callback in self._listeners:
+            try:
+                callback(trade)
+            except Exception as e:
+                logger.warning(f"Trade listener failed: {e}")
+        return trade
+
+    def open_position(self, position_id, entry_price, size):
+        with self._lock:
+            self.open_positions[position_id] = {"entry_price": entry_price, "size": size}
+
+    def resize_position(self, position_id, size):
+        with self._lock:
+            if position_id in self.open_positions:
+                self.open_positions[position_id]["size"] = size
+
+    def close_position(self, position_id):
+        with self._lock:
+            self.open_positions.pop(position_id, None)
+
+    def summary(self, current_price):
+        """
+        Return the same dictionary as utils.calculate_total_profit_summary.
+
+        Only the open positions are walked to add unrealized P&L.
+        """
+        with self._lock:
+            positions = list(self.open_positions.values())
+            summary = {
+                "realized_profit": self.realized_profit,
+                "unrealized_profit": 0,
+                "total_profit": 0,
+                "realized_profit_percentage": 0,
+                "unrealized_profit_percentage": 0,
+                "total_profit_percentage": 0,
+                "total_buy_volume": self.total_buy_volume,
+                "total_sell_volume": self.total_sell_volume,
+                "open_positions_count": len(positions),
+                "closed_positions_count": len(self.closed_positions)
+            }
+            total_investment = self.total_investment
+
+        open_positions_value = 0
+        for position in positions:
+            entry_price = position.get("entry_price", 0)
+            size = position.get("size", 0)
+            open_positions_value += entry_price * size
+            if entry_price > 0 and size > 0:
+                summary["unrealized_profit"] += calculate_profit_loss(entry_price, current_price, size, True)
+
+        summary["total_profit"] = summary["realized_profit"] + summary["unrealized_profit"]
+
+        if total_investment > 0:
+            summary["realized_profit_percentage"] = (summary["realized_profit"] / total_investment) * 100
+            summary["total_profit_percentage"] = (summary["total_profit"] / total_investment) * 100
+
+        if open_positions_value > 0:
+            summary["unrealized_profit_percentage"] = (summary["unrealized_profit"] / open_positions_value) * 100
+
+        return summary
+
+    def attach(self, trader):
+        """
+        Rebuild the ledger from `trader` and keep it updated from then on.
+
+        Returns the full trade history the ledger was rebuilt from. The trader's log_trade, add_position, update_position_size and
+        remove_position methods are wrapped on the instance, so trades made
+        by the strategy itself are recorded as well.
+        """
+        if getattr(trader, "_profit_ledger", None) is not self:
+            trader._profit_ledger = self
+            self._install_hooks(trader)
+
+        trade_history = trader.get_trade_history(limit=FULL_HISTORY_LIMIT)
+        active_positions = trader.load_active_positions()
+        self.rebuild(trade_history, active_positions)
+        return trade_history
+
+    def _install_hooks(self, trader):
+        """Wrap the trader's position and trade methods to keep the ledger current."""
+        def wrap(name, after):
+            original = getattr(trader, name, None)
+            if original is None:
+                return
+
+            @functools.wraps(original)
+            def wrapper(*args, **kwargs):
+                result = original(*args, **kwargs)
+                try:
+                    after(original, args, kwargs, result)
+                except Exception as e:
+                    logger.warning(f"Profit ledger could not record {name}: {e}")
+                return result
+
+            setattr(trader, name, wrapper)
+
+        def after_log_trade(original, args, kwargs, result):
+            values = _bound_args(original, args, kwargs) or list(args)
+            position_id, size, side, price = values[:4]
+            reason = values[4] if len(values) > 4 else None
+            self.record_trade(position_id, size, side, price, reason)
+
+        def after_add_position(original, args, kwargs, result):
+            entry_price = _bound_arg(original, args, kwargs, "entry_price", 0)
+            size = _bound_arg(original, args, kwargs, "size", 1)
+            if result is not None:
+                self.open_position(result, entry_price, size)
+
+        def after_update_position_size(original, args, kwargs, result):
+            position_id = _bound_arg(original, args, kwargs, "position_id", 0)
+            size = _bound_arg(original, args, kwargs, "new_size", 1)
+            self.resize_position(position_id, size)
+
+        def after_remove_position(original, args, kwargs, result):
+            self.close_position(_bound_arg(original, args, kwargs, "position_id", 0))
+
+        wrap("log_trade", after_log_trade)
+        wrap("add_position", after_add_position)
+        wrap("update_position_size", after_update_position_size)
+        wrap("remove_position", after_remove_position)
@@ -0,0 +1,199 @@
+"""
+Push Hub module
+
+This module fans server-side updates out to WebSocket clients. Each client
+subscribes to topics such as "price:BTC", "positions", "balance",
+"profit" or "analysis:ETH". A published message is serialized once and
+queued for every subscriber without awaiting any socket, so one slow client
+never delays the others. Each connection drains its own bounded queue; a client whose queue
+stays full is treated as a slow consumer and disconnected.
+"""
+
+import json
+import asyncio
+import logging
+from datetime import datetime
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Messages buffered per connection before it counts as a slow consumer
+DEFAULT_QUEUE_SIZE = 100
+
+# Consecutive dropped messages after which a slow consumer is disconnected
+MAX_DROPPED = 10
+
+# Topics a client receives if it never sends a subscribe message
+DEFAULT_TOPICS = ("price:BTC", "positions", "balance")
+
+# Legacy "type" field sent alongside the topic for existing frontend handlers
+TOPIC_TYPES = {
+    "price": "market_update",
+    "positions": "position_update",
+    "balance": "balance_update",
+    "profit": "profit_update",
+    "analysis": "analysis_update",
+}
+
+
+def topic_kind(topic):
+    """Return the topic family, e.g. "price" for "price:BTC"."""
+    return topic.split(":", 1)[0]
+
+
+def _json_default(value):
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class PushClient:
+    """One WebSocket connection with its subscriptions and send queue."""
+
+    def __init__(self, websocket, queue_size=DEFAULT_QUEUE_SIZE):
+        self.websocket = websocket
+        self.topics = set()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.sender = None
+
+    def offer(self, message):
+        """Queue a serialized message; return False if the queue is full."""
+        try:
+            self.queue.put_nowait(message)
+            self.dropped = 0
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def drain(self):
+        """Send queued messages until the connection closes."""
+        while True:
+            message = await self.queue.get()
+            await self.websocket.send_text(message)
+
+
+class PushHub:
+    """Topic-based fan-out to WebSocket clients."""
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE, max_dropped=MAX_DROPPED):
+        self.queue_size = queue_size
+        self.max_dropped = max_dropped
+        self.clients = set()
+        self._latest = {}
+
+    async def connect(self, websocket, topics=None):
+        """Accept a connection and start its sender task."""
+        await websocket.accept()
+        client = PushClient(websocket, self.queue_size)
+        self.clients.add(client)
+        client.sender = asyncio.ensure_future(self._run_sender(client))
+        self.subscribe(client, topics if topics else DEFAULT_TOPICS)
+        return client
+
+    async def _run_sender(self, client):
+        try:
+            await client.drain()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"WebSocket sender stopped: {e}")
+        finally:
+            self.clients.discard(client)
+
+    def disconnect(self, client):
+        """Forget a client and stop its sender task."""
+        self.clients.discard(client)
+        if client.sender is not None and not client.sender.done():
+            client.sender.cancel()
+
+    def subscribe(self, client, topics):
+        """Add topics to a client and replay the latest message of each."""
+        for topic in topics:
+            if topic in client.topics:
+                continue
+            client.topics.add(topic)
+            latest = self._latest.get(topic)
+            if latest is not None:
+                client.offer(latest)
+
+    def unsubscribe(self, client, topics):
+        client.topics.difference_update(topics)
+
+    def subscribed_topics(self):
+        """Return every topic at least one client is subscribed to."""
+        topics = set()
+        for client in self.clients:
+            topics.update(client.topics)
+        return topics
+
+    def publish(self, topic, data):
+        """
+        Queue a message for every subscriber of `topic`.
+
+        Returns:
+            Number of clients the message was queued for
+        """
+        message = json.dumps({
+            "topic": topic,
+            "type": TOPIC_TYPES.get(topic_kind(topic), topic_kind(topic)),
+            "data": data,
+            "timestamp": datetime.now().isoformat()
+        }, default=_json_default)
+        self._latest[topic] = message
+
+        delivered = 0
+        for client in list(self.clients):
+            if topic not in client.topics:
+                continue
+            if client.offer(message):
+                delivered += 1
+            elif client.dropped >= self.max_dropped:
+                logger.warning(f"Disconnecting slow WebSocket consumer after {client.dropped} dropped messages")
+                self.disconnect(client)
+                asyncio.ensure_future(self._close(client))
+        return delivered
+
+    async def _close(self, client):
+        try:
+            await client.websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def broadcast(self, message: str):
+        """Queue a raw text message for every connected client."""
+        for client in list(self.clients):
+            client.offer(message)
+
+    async def handle_message(self, client, text):
+        """
+        Apply a client control message.
+
+        Supported messages are {"action": "subscribe", "topics": [...]},
+        {"action": "unsubscribe", "topics": [...]} and "ping". Anything else
+        is treated as a keep-alive.
+        """
+        if text == "ping":
+            client.offer(json.dumps({"type": "pong"}))
+            return
+        try:
+            message = json.loads(text)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(message, dict):
+            return
+
+        topics = message.get("topics") or []
+        if isinstance(topics, str):
+            topics = [topics]
+        action = message.get("action")
+        if action == "subscribe":
+            self.subscribe(client, topics)
+        elif action == "unsubscribe":
+            self.unsubscribe(client, topics)
+        else:
+            return
+        client.offer(json.dumps({"type": "subscriptions", "topics": sorted(client.topics)}))
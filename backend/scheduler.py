@@ -0,0 +1,289 @@
+"""
+Scheduler module
+
+This module runs periodic jobs on the asyncio event loop. Each job sleeps
+until its next fire time instead of being polled, supports interval and
+cron triggers with optional random jitter, never overlaps with a previous
+run of itself, and applies a catch-up policy when fire times were missed
+(e.g. after the host slept). Per-job metrics — last and next run, outcome
+and a duration histogram — are kept for the scheduler endpoint.
+"""
+
+import random
+import asyncio
+import logging
+import inspect
+import time
+from datetime import datetime, timedelta
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the run duration histogram buckets
+DURATION_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 900, float("inf"))
+
+# Catch-up policies for fire times missed while the process was not running them
+CATCH_UP_ONCE = "once"  # run once for all missed fire times, then resume the schedule
+CATCH_UP_SKIP = "skip"  # drop missed fire times and wait for the next one
+
+# Longest single sleep, so a wall-clock jump (suspend, clock change) is noticed
+MAX_SLEEP = 300
+
+
+class IntervalTrigger:
+    """Fire every `seconds` seconds."""
+
+    def __init__(self, seconds=0, minutes=0, hours=0):
+        self.interval = timedelta(seconds=seconds, minutes=minutes, hours=hours)
+        if self.interval.total_seconds() <= 0:
+            raise ValueError("Interval must be positive")
+
+    def next_after(self, moment):
+        return moment + self.interval
+
+    def __str__(self):
+        return f"every {self.interval.total_seconds():g}s"
+
+
+def _parse_cron_field(field, low, high):
+    """Expand one cron field (*, */n, a-b, a-b/n, a,b,c) into a set of values."""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid cron field: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronTrigger:
+    """Fire on a five-field cron expression: minute hour day-of-month month day-of-week."""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression}")
+        self.expression = expression
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        # Cron counts Sunday as 0 (and 7); Python's weekday() counts Monday as 0
+        self.weekdays = {(day - 1) % 7 for day in _parse_cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        # Like cron, a restricted day-of-month and day-of-week match either one
+        return day_ok or weekday_ok
+
+    def next_after(self, moment):
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression}")
+
+    def __str__(self):
+        return f"cron {self.expression}"
+
+
+def parse_trigger(spec):
+    """Build a trigger from a cron expression or a number of seconds."""
+    spec = str(spec).strip()
+    if " " in spec:
+        return CronTrigger(spec)
+    return IntervalTrigger(seconds=float(spec))
+
+
+class Job:
+    """One scheduled job and its run metrics."""
+
+    def __init__(self, name, func, trigger, jitter=0, catch_up=CATCH_UP_ONCE):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.next_run_at = None
+        self.last_run_at = None
+        self.last_duration = None
+        self.last_outcome = None
+        self.last_error = None
+        self.running = False
+        self.runs = 0
+        self.errors = 0
+        self.skipped_overlap = 0
+        self.missed = 0
+        self.bucket_counts = [0] * len(DURATION_BUCKETS)
+        self.duration_sum = 0.0
+        self.task = None
+
+    def observe(self, duration):
+        self.duration_sum += duration
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if duration <= bound:
+                self.bucket_counts[i] += 1
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trigger": str(self.trigger),
+            "jitter_seconds": self.jitter,
+            "catch_up": self.catch_up,
+            "running": self.running,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "last_duration_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "last_outcome": self.last_outcome,
+            "last_error": self.last_error,
+            "runs": self.runs,
+            "errors": self.errors,
+            "skipped_overlap": self.skipped_overlap,
+            "missed": self.missed,
+            "duration_histogram": {
+                "buckets": {("+Inf" if bound == float("inf") else f"{bound:g}"): count
+                            for bound, count in zip(DURATION_BUCKETS, self.bucket_counts)},
+                "sum": round(self.duration_sum, 3),
+                "count": self.runs,
+            },
+        }
+
+
+class Scheduler:
+    """Timer-driven asyncio job scheduler."""
+
+    def __init__(self, run_sync=None):
+        """
+        Args:
+            run_sync: Optional coroutine function(func) used to run synchronous
+                jobs off the event loop; defaults to the loop's executor
+        """
+        self.run_sync = run_sync
+        self.jobs = {}
+        self._started = False
+
+    def add_job(self, name, func, trigger, jitter=0, catch_up=CATCH_UP_ONCE):
+        """Register a job; it starts with the scheduler, or right away if already started."""
+        if name in self.jobs:
+            raise ValueError(f"Job already scheduled: {name}")
+        job = Job(name, func, trigger, jitter, catch_up)
+        self.jobs[name] = job
+        if self._started:
+            job.task = asyncio.ensure_future(self._job_loop(job))
+        return job
+
+    def start(self):
+        """Start every job's timer; call from a running event loop."""
+        self._started = True
+        for job in self.jobs.values():
+            if job.task is None:
+                job.task = asyncio.ensure_future(self._job_loop(job))
+
+    def stop(self):
+        self._started = False
+        for job in self.jobs.values():
+            if job.task is not None:
+                job.task.cancel()
+                job.task = None
+
+    def _schedule_next(self, job, after):
+        """Return the next fire time after `after` and the jittered time to run it."""
+        base = job.trigger.next_after(after)
+        due = base
+        if job.jitter:
+            due += timedelta(seconds=random.uniform(0, job.jitter))
+        job.next_run_at = due
+        return base, due
+
+    async def _job_loop(self, job):
+        base, due = self._schedule_next(job, datetime.now())
+        logger.info(f"Scheduled job {job.name} ({job.trigger}), next run at {due.isoformat()}")
+        while True:
+            # Sleep until the fire time in bounded steps so clock jumps are noticed
+            while True:
+                remaining = (due - datetime.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, MAX_SLEEP))
+
+            now = datetime.now()
+            # Count the fire times that passed while we were not running
+            missed = 0
+            next_due = job.trigger.next_after(base)
+            while next_due <= now:
+                missed += 1
+                next_due = job.trigger.next_after(next_due)
+
+            if missed:
+                job.missed += missed
+                logger.warning(f"Job {job.name} missed {missed} run(s); catch-up policy: {job.catch_up}")
+
+            if missed and job.catch_up == CATCH_UP_SKIP:
+                pass
+            elif job.running:
+                job.skipped_overlap += 1
+                logger.warning(f"Job {job.name} is still running - skipping this run")
+            else:
+                asyncio.ensure_future(self._run(job))
+
+            # Keep the schedule anchored to its own fire times so jitter and
+            # loop lateness do not accumulate; re-anchor only after a catch-up
+            base, due = self._schedule_next(job, now if missed else base)
+
+    async def _run(self, job):
+        job.running = True
+        job.last_run_at = datetime.now()
+        started = time.monotonic()
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                await job.func()
+            elif self.run_sync is not None:
+                await self.run_sync(job.func)
+            else:
+                await asyncio.get_running_loop().run_in_executor(None, job.func)
+            job.last_outcome = "success"
+            job.last_error = None
+        except Exception as e:
+            job.errors += 1
+            job.last_outcome = "error"
+            job.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            job.last_duration = time.monotonic() - started
+            job.runs += 1
+            job.observe(job.last_duration)
+            job.running = False
+
+    async def run_now(self, name):
+        """Run a job immediately unless it is already running; returns False if skipped."""
+        job = self.jobs[name]
+        if job.running:
+            job.skipped_overlap += 1
+            return False
+        await self._run(job)
+        return True
+
+    def status(self):
+        return [job.to_dict() for job in self.jobs.values()]
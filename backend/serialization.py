@@ -0,0 +1,119 @@
+"""
+Serialization module
+
+This module turns indicator DataFrames into JSON-safe payloads. NaN and
+infinite values are masked over whole columns at once instead of cell by
+cell, and the result can be shaped as a list of row dicts (the historical
+response format) or as one array per column.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Supported response shapes for market data
+FORMAT_ROWS = "rows"
+FORMAT_COLUMNS = "columns"
+SUPPORTED_FORMATS = (FORMAT_ROWS, FORMAT_COLUMNS)
+
+
+def _clean_column(series):
+    """Convert a column to a list of native Python values with NaN/inf replaced by None."""
+    values = series.to_numpy()
+    kind = values.dtype.kind
+
+    if kind in "iub":
+        # Integers and booleans can never hold NaN
+        return values.tolist()
+
+    if kind == "f":
+        mask = ~np.isfinite(values)
+        cleaned = values.tolist()
+        for i in np.flatnonzero(mask):
+            cleaned[i] = None
+        return cleaned
+
+    # Object or other dtypes: fall back to pandas' missing-value detection
+    mask = pd.isna(series).to_numpy()
+    cleaned = values.tolist()
+    for i in np.flatnonzero(mask):
+        cleaned[i] = None
+    for i, value in enumerate(cleaned):
+        if isinstance(value, float) and np.isinf(value):
+            cleaned[i] = None
+    return cleaned
+
+
+def _timestamps(index):
+    """Format the frame index as ISO-8601 strings."""
+    if isinstance(index, pd.DatetimeIndex) and index.tz is None and not (index.asi8 % 1_000_000_000).any():
+        # Whole-second naive timestamps format identically to isoformat()
+        return np.datetime_as_string(index.values, unit="s").tolist()
+    return [idx.isoformat() if hasattr(idx, "isoformat") else str(idx) for idx in index]
+
+
+def _clean_frame(df):
+    """Clean every column of a DataFrame, keyed by column name."""
+    return {str(name): _clean_column(df[name]) for name in df.columns}
+
+
+def frame_to_columns(df):
+    """
+    Serialize a DataFrame as one array per column plus a timestamp array.
+
+    Returns:
+        Dictionary mapping "timestamp" and each column name to a list
+    """
+    columns = {"timestamp": _timestamps(df.index)}
+    columns.update(_clean_frame(df))
+    return columns
+
+
+def frame_to_records(df):
+    """
+    Serialize a DataFrame as a list of row dictionaries.
+
+    Each row contains every column plus an ISO-8601 "timestamp" key, which
+    matches the shape previously built with DataFrame.iterrows().
+    """
+    columns = _clean_frame(df)
+    names = list(columns.keys()) + ["timestamp"]
+    return [dict(zip(names, row)) for row in zip(*columns.values(), _timestamps(df.index))]
+
+
+def serialize_frame(df, response_format=FORMAT_ROWS):
+    """Serialize a DataFrame in the requested response format."""
+    if response_format == FORMAT_COLUMNS:
+        return frame_to_columns(df)
+    return frame_to_records(df)
+
+
+def parse_since(since):
+    """Parse a `since` cursor (an ISO-8601 candle timestamp); raises ValueError if invalid."""
+    try:
+        return pd.Timestamp(since)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid since cursor: {since}") from e
+
+
+def slice_since(df, since):
+    """
+    Return the rows of a DataFrame at or after the `since` timestamp.
+
+    The candle at `since` itself is included because the newest candle keeps
+    changing until it closes, so clients always receive its latest values.
+    """
+    if df.empty or not isinstance(df.index, pd.DatetimeIndex):
+        return df
+    if df.index.tz is not None and since.tzinfo is None:
+        since = since.tz_localize(df.index.tz)
+    elif df.index.tz is None and since.tzinfo is not None:
+        since = since.tz_convert(None)
+    return df[df.index >= since]
+
+
+def cursor_for(df):
+    """Return the cursor a client should send back as `since` on its next request."""
+    if df.empty:
+        return None
+    last = df.index[-1]
+    return last.isoformat() if hasattr(last, "isoformat") else str(last)
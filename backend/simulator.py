@@ -0,0 +1,377 @@
+"""
+Simulator module
+
+This module is a local stand-in for the upstream services the trader talks
+to, so the API can be load-tested and benchmarked without live keys:
+
+- a fake Coinbase Advanced Trade exchange serving candles, products, best
+  bid/ask, accounts and immediately filled orders (plus the public ticker
+  used by the price oracle), from a recorded CSV or a synthetic random walk
+- a fake OpenAI chat completions endpoint returning trading analyses
+
+Each upstream has its own latency distribution and error rate. Point the
+trader at it by setting EXCHANGE_SIMULATOR_URL before starting the API
+(see trader_factory.create_trader).
+
+Usage:
+    python simulator.py [--port 8100] [--exchange-latency lognormal:80:40]
+                        [--llm-latency lognormal:1500:500] [--exchange-error-rate 0.01]
+                        [--llm-error-rate 0.02] [--candles-csv candles.csv]
+"""
+
+import os
+import json
+import uuid
+import random
+import asyncio
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+GRANULARITY_SECONDS = {
+    "ONE_MINUTE": 60,
+    "FIVE_MINUTE": 5 * 60,
+    "FIFTEEN_MINUTE": 15 * 60,
+    "THIRTY_MINUTE": 30 * 60,
+    "ONE_HOUR": 60 * 60,
+    "TWO_HOUR": 2 * 60 * 60,
+    "SIX_HOUR": 6 * 60 * 60,
+    "ONE_DAY": 24 * 60 * 60,
+}
+
+# Coinbase returns at most this many candles per request
+MAX_CANDLES = 350
+
+# Days of one-minute history generated per synthetic product
+SYNTHETIC_DAYS = 30
+
+# Rough starting prices of the synthetic products
+START_PRICES = {"BTC": 60000, "ETH": 3000, "SOL": 150, "XRP": 0.6, "ADA": 0.45, "DOGE": 0.15, "SHIB": 0.00002, "USDC": 1.0}
+
+STARTING_BALANCES = {"USD": 100000.0, "BTC": 1.0, "ETH": 10.0, "SOL": 100.0, "XRP": 10000.0}
+
+
+class LatencyModel:
+    """
+    Random upstream latency, parsed from "fixed:MS", "normal:MEAN:SD" or
+    "lognormal:MEAN:SD" (milliseconds).
+    """
+
+    def __init__(self, spec="fixed:0"):
+        parts = spec.split(":")
+        self.kind = parts[0]
+        self.mean = float(parts[1]) if len(parts) > 1 else 0.0
+        self.sd = float(parts[2]) if len(parts) > 2 else 0.0
+        if self.kind not in ("fixed", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.spec = spec
+
+    def sample(self):
+        """Return one latency in seconds."""
+        if self.kind == "fixed" or self.sd <= 0 or self.mean <= 0:
+            ms = self.mean
+        elif self.kind == "normal":
+            ms = random.gauss(self.mean, self.sd)
+        else:
+            # Parameters of the underlying normal for the requested mean and sd
+            sigma2 = np.log(1 + (self.sd / self.mean) ** 2)
+            ms = random.lognormvariate(np.log(self.mean) - sigma2 / 2, np.sqrt(sigma2))
+        return max(ms, 0.0) / 1000.0
+
+
+class Upstream:
+    """Latency and error-rate settings of one simulated service."""
+
+    def __init__(self, name, latency, error_rate=0.0):
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+
+    async def delay(self):
+        """Wait out the sampled latency; return an error response to send instead, or None."""
+        self.requests += 1
+        await asyncio.sleep(self.latency.sample())
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            status = random.choice((429, 500, 503))
+            return JSONResponse(status_code=status, content={"error": "SIMULATED_ERROR", "message": f"Simulated {self.name} error"})
+        return None
+
+
+def _synthetic_candles(symbol, seed):
+    """Generate SYNTHETIC_DAYS of one-minute candles ending now, deterministic per symbol."""
+    count = SYNTHETIC_DAYS * 24 * 60
+    rng = np.random.default_rng(seed + sum(map(ord, symbol)))
+    close = START_PRICES.get(symbol, 100) * np.exp(np.cumsum(rng.normal(0, 0.0008, count)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, count))
+    end = pd.Timestamp.utcnow().floor("min").tz_localize(None)
+    index = pd.date_range(end=end, periods=count, freq="min")
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + spread),
+        "low": np.minimum(open_, close) * (1 - spread),
+        "close": close,
+        "volume": rng.uniform(1, 50, count),
+    }, index=index)
+
+
+class Market:
+    """Candle history per product and a simulated account."""
+
+    def __init__(self, candles_csv=None, seed=42):
+        self.seed = seed
+        self.recorded = None
+        if candles_csv:
+            frame = pd.read_csv(candles_csv)
+            frame.index = pd.to_datetime(frame.pop("timestamp"))
+            self.recorded = frame.sort_index()
+        self._minutes = {}
+        self._frames = {}
+        self.balances = dict(STARTING_BALANCES)
+        self.orders = {}
+        self._lock = threading.Lock()
+
+    def minutes(self, symbol):
+        if symbol not in self._minutes:
+            self._minutes[symbol] = self.recorded if self.recorded is not None else _synthetic_candles(symbol, self.seed)
+        return self._minutes[symbol]
+
+    def frame(self, symbol, granularity):
+        """Candles of `symbol` resampled to `granularity`, cached."""
+        key = (symbol, granularity)
+        if key not in self._frames:
+            seconds = GRANULARITY_SECONDS.get(granularity, 3600)
+            self._frames[key] = self.minutes(symbol).resample(f"{seconds}s").agg(
+                {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+            ).dropna()
+        return self._frames[key]
+
+    def last_price(self, symbol):
+        return float(self.minutes(symbol)["close"].iloc[-1])
+
+    def fill(self, product_id, side, quote_size=None, base_size=None):
+        """Fill a market order immediately at the last price and update balances."""
+        base, quote = product_id.split("-", 1)
+        price = self.last_price(base)
+        with self._lock:
+            if side == "BUY":
+                spend = float(quote_size) if quote_size else float(base_size) * price
+                if self.balances.get(quote, 0) < spend:
+                    return None
+                size = spend / price
+                self.balances[quote] = self.balances.get(quote, 0) - spend
+                self.balances[base] = self.balances.get(base, 0) + size
+            else:
+                size = float(base_size) if base_size else float(quote_size) / price
+                if self.balances.get(base, 0) < size:
+                    return None
+                self.balances[base] = self.balances.get(base, 0) - size
+                self.balances[quote] = self.balances.get(quote, 0) + size * price
+            order_id = str(uuid.uuid4())
+            self.orders[order_id] = {
+                "order_id": order_id,
+                "product_id": product_id,
+                "side": side,
+                "status": "FILLED",
+                "filled_size": f"{size:.8f}",
+                "average_filled_price": f"{price:.8f}",
+                "created_time": datetime.now(timezone.utc).isoformat(),
+            }
+            return self.orders[order_id]
+
+
+def _money(value, currency):
+    return {"value": f"{value:.8f}", "currency": currency}
+
+
+def create_app(exchange, llm, market):
+    """Build the simulator app around two upstream settings and a market."""
+    app = FastAPI(title="Upstream simulator")
+
+    # Exchange (Coinbase Advanced Trade paths)
+
+    @app.get("/api/v3/brokerage/products/{product_id}/candles")
+    async def get_candles(product_id: str, start: int = None, end: int = None, granularity: str = "ONE_HOUR"):
+        error = await exchange.delay()
+        if error:
+            return error
+        frame = market.frame(product_id.split("-")[0], granularity)
+        if end is not None:
+            frame = frame[frame.index <= pd.Timestamp(end, unit="s")]
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start, unit="s")]
+        frame = frame.tail(MAX_CANDLES)
+        candles = [
+            {
+                "start": str(int(ts.timestamp())),
+                "low": f"{row.low:.8f}",
+                "high": f"{row.high:.8f}",
+                "open": f"{row.open:.8f}",
+                "close": f"{row.close:.8f}",
+                "volume": f"{row.volume:.8f}",
+            }
+            for ts, row in zip(frame.index, frame.itertuples(index=False))
+        ]
+        # Newest first, like Coinbase
+        return {"candles": candles[::-1]}
+
+    @app.get("/api/v3/brokerage/products/{product_id}")
+    async def get_product(product_id: str):
+        error = await exchange.delay()
+        if error:
+            return error
+        base, quote = product_id.split("-", 1)
+        return {"product_id": product_id, "price": f"{market.last_price(base):.8f}", "base_currency_id": base, "quote_currency_id": quote}
+
+    @app.get("/api/v3/brokerage/best_bid_ask")
+    async def get_best_bid_ask(product_ids: str = "BTC-USD"):
+        error = await exchange.delay()
+        if error:
+            return error
+        pricebooks = []
+        for product_id in product_ids.split(","):
+            price = market.last_price(product_id.split("-")[0])
+            pricebooks.append({
+                "product_id": product_id,
+                "bids": [{"price": f"{price * 0.9999:.8f}", "size": "1"}],
+                "asks": [{"price": f"{price * 1.0001:.8f}", "size": "1"}],
+                "time": datetime.now(timezone.utc).isoformat(),
+            })
+        return {"pricebooks": pricebooks}
+
+    @app.get("/products/{product_id}/ticker")
+    async def get_ticker(product_id: str):
+        error = await exchange.delay()
+        if error:
+            return error
+        price = market.last_price(product_id.split("-")[0])
+        return {"price": f"{price:.8f}", "bid": f"{price * 0.9999:.8f}", "ask": f"{price * 1.0001:.8f}", "time": datetime.now(timezone.utc).isoformat()}
+
+    @app.get("/api/v3/brokerage/accounts")
+    async def get_accounts():
+        error = await exchange.delay()
+        if error:
+            return error
+        accounts = [
+            {
+                "uuid": str(uuid.uuid5(uuid.NAMESPACE_DNS, currency)),
+                "name": f"{currency} Wallet",
+                "currency": currency,
+                "available_balance": _money(balance, currency),
+                "hold": _money(0, currency),
+                "active": True,
+            }
+            for currency, balance in market.balances.items()
+        ]
+        return {"accounts": accounts, "has_next": False, "cursor": "", "size": len(accounts)}
+
+    @app.post("/api/v3/brokerage/orders")
+    async def create_order(request: Request):
+        error = await exchange.delay()
+        if error:
+            return error
+        body = await request.json()
+        config = (body.get("order_configuration") or {}).get("market_market_ioc") or {}
+        order = market.fill(body.get("product_id", "BTC-USD"), body.get("side", "BUY"), config.get("quote_size"), config.get("base_size"))
+        if order is None:
+            return {"success": False, "failure_reason": "UNKNOWN_FAILURE_REASON", "error_response": {"error": "INSUFFICIENT_FUND", "message": "Insufficient balance in source account"}}
+        return {
+            "success": True,
+            "order_id": order["order_id"],
+            "success_response": {"order_id": order["order_id"], "product_id": order["product_id"], "side": order["side"], "client_order_id": body.get("client_order_id", "")},
+            "order_configuration": body.get("order_configuration"),
+        }
+
+    @app.get("/api/v3/brokerage/orders/historical/{order_id}")
+    async def get_order(order_id: str):
+        error = await exchange.delay()
+        if error:
+            return error
+        order = market.orders.get(order_id)
+        if order is None:
+            return JSONResponse(status_code=404, content={"error": "NOT_FOUND", "message": "Order not found"})
+        return {"order": order}
+
+    # LLM (OpenAI chat completions)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        error = await llm.delay()
+        if error:
+            return error
+        body = await request.json()
+        signal = random.choice(["BUY", "SELL", "HOLD"])
+        analysis = {
+            "signal": signal,
+            "confidence": round(random.uniform(0.4, 0.9), 2),
+            "position_size_percent": 5,
+            "stop_loss_percent": 5,
+            "take_profit_percent": 10,
+            "priority_indicators": ["rsi", "macd", "bb"],
+            "reasoning": {"summary": f"Simulated {signal} analysis"},
+        }
+        content = json.dumps(analysis)
+        return {
+            "id": f"chatcmpl-sim-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(datetime.now().timestamp()),
+            "model": body.get("model", "simulator"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.get("/simulator/stats")
+    async def get_stats():
+        return {
+            upstream.name: {"latency": upstream.latency.spec, "error_rate": upstream.error_rate, "requests": upstream.requests, "errors": upstream.errors}
+            for upstream in (exchange, llm)
+        }
+
+    return app
+
+
+def app_from_env():
+    """Build the app from SIM_* environment variables."""
+    exchange = Upstream("exchange", LatencyModel(os.getenv("SIM_EXCHANGE_LATENCY", "lognormal:80:40")), float(os.getenv("SIM_EXCHANGE_ERROR_RATE", "0")))
+    llm = Upstream("llm", LatencyModel(os.getenv("SIM_LLM_LATENCY", "lognormal:1500:500")), float(os.getenv("SIM_LLM_ERROR_RATE", "0")))
+    market = Market(os.getenv("SIM_CANDLES_CSV"), int(os.getenv("SIM_SEED", "42")))
+    return create_app(exchange, llm, market)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--exchange-latency", default=os.getenv("SIM_EXCHANGE_LATENCY", "lognormal:80:40"))
+    parser.add_argument("--llm-latency", default=os.getenv("SIM_LLM_LATENCY", "lognormal:1500:500"))
+    parser.add_argument("--exchange-error-rate", type=float, default=float(os.getenv("SIM_EXCHANGE_ERROR_RATE", "0")))
+    parser.add_argument("--llm-error-rate", type=float, default=float(os.getenv("SIM_LLM_ERROR_RATE", "0")))
+    parser.add_argument("--candles-csv", default=os.getenv("SIM_CANDLES_CSV"),
+                        help="Recorded one-minute candles with timestamp,open,high,low,close,volume columns")
+    parser.add_argument("--seed", type=int, default=int(os.getenv("SIM_SEED", "42")))
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(
+        Upstream("exchange", LatencyModel(args.exchange_latency), args.exchange_error_rate),
+        Upstream("llm", LatencyModel(args.llm_latency), args.llm_error_rate),
+        Market(args.candles_csv, args.seed),
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Single Flight module
+
+This module deduplicates concurrent async work per key: while a call for a
+key is running, every other caller for the same key awaits the same task
+and receives the same result (or exception) instead of starting its own.
+"""
+
+import asyncio
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Run at most one coroutine per key at a time and share its outcome."""
+
+    def __init__(self):
+        self._tasks = {}
+
+    def _start(self, key, func):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return task
+
+    def _finished(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved so background refreshes don't log
+        # "Task exception was never retrieved" when nobody awaits them
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight task for {key} failed: {task.exception()}")
+
+    async def do(self, key, func):
+        """
+        Await the in-flight call for `key`, starting `func()` if there is none.
+
+        The shared task is shielded, so a caller that disconnects does not
+        cancel the work other callers are waiting on.
+        """
+        return await asyncio.shield(self._start(key, func))
+
+    def refresh(self, key, func):
+        """Start `func()` in the background unless a call for `key` is already running."""
+        return self._start(key, func)
+
+    def in_flight(self, key):
+        """Return True while a call for `key` is running."""
+        return key in self._tasks
@@ -0,0 +1,182 @@
+"""
+Strategy Runner module
+
+This module runs trader.run_strategy() for several crypto assets in
+parallel, each in its own worker process. A process per run keeps the
+strategy's indicator and AI work off the API process and isolates the
+assets from each other: a run that exceeds its timeout is terminated
+without blocking the others. Every run is recorded with its duration and
+outcome.
+
+Workers run strategy_worker.py as a script in a fresh interpreter, so they
+never import the API module that started them.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from strategy_worker import OUTCOME_SUCCESS, OUTCOME_ERROR
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Assets run concurrently; each run owns one worker process
+MAX_PARALLEL_RUNS = int(os.getenv("STRATEGY_WORKERS", "4"))
+
+# Seconds a single asset's strategy run may take before it is terminated
+DEFAULT_RUN_TIMEOUT = float(os.getenv("STRATEGY_TIMEOUT", str(15 * 60)))
+
+# Completed runs kept for reporting
+RUN_HISTORY_SIZE = 200
+
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_SKIPPED = "skipped"
+
+# Worker entry point, run as a script (see strategy_worker.py)
+WORKER_SCRIPT = str(Path(__file__).with_name("strategy_worker.py"))
+
+
+class StrategyRunner:
+    """Runs asset strategies in parallel worker processes and records each run."""
+
+    def __init__(self, max_parallel=MAX_PARALLEL_RUNS, timeout=DEFAULT_RUN_TIMEOUT, on_complete=None, on_start=None):
+        """
+        Args:
+            max_parallel: Maximum number of assets running at once
+            timeout: Default per-asset timeout in seconds
+            on_complete: Optional callable(result) called after every run
+            on_start: Optional callable() called before workers start while
+                none is running, so no worker reads or writes a file it prepares
+        """
+        self.timeout = timeout
+        self.on_complete = on_complete
+        self.on_start = on_start
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="strategy-runner")
+        self._active = set()
+        self._history = deque(maxlen=RUN_HISTORY_SIZE)
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+
+    def submit(self, keys, crypto_asset, timeout=None):
+        """
+        Start a strategy run for one asset in the background.
+
+        Returns:
+            A Future resolving to the run result, or None if the asset is
+            already running
+        """
+        # Submits are serialized so no worker starts while the start callback runs
+        with self._submit_lock:
+            with self._lock:
+                if crypto_asset in self._active:
+                    logger.info(f"Strategy for {crypto_asset} is already running - skipping")
+                    self._history.append(self._result(crypto_asset, datetime.now(), 0, OUTCOME_SKIPPED, "Already running"))
+                    return None
+                first = not self._active
+            if first and self.on_start is not None:
+                # Once per batch: no worker is running yet
+                try:
+                    self.on_start()
+                except Exception as e:
+                    logger.warning(f"Strategy start callback failed: {e}")
+            with self._lock:
+                self._active.add(crypto_asset)
+            return self._executor.submit(self._run, keys, crypto_asset, timeout or self.timeout)
+
+    def submit_all(self, keys, assets, timeout=None):
+        """Start every asset's run; returns the Futures of the runs that were started."""
+        return [future for future in (self.submit(keys, asset, timeout) for asset in assets) if future is not None]
+
+    def run_all(self, keys, assets, timeout=None):
+        """Run every asset in parallel and wait for all of them; returns their results."""
+        return [future.result() for future in self.submit_all(keys, assets, timeout)]
+
+    async def run_all_async(self, keys, assets, timeout=None):
+        """Like run_all, but awaits the runs instead of blocking the calling thread."""
+        # Submitting may run the start callback, which does file I/O
+        futures = await asyncio.to_thread(self.submit_all, keys, assets, timeout)
+        return list(await asyncio.gather(*(asyncio.wrap_future(future) for future in futures)))
+
+    def _run(self, keys, crypto_asset, timeout):
+        started_at = datetime.now()
+        started = time.monotonic()
+        error = None
+        try:
+            process = subprocess.Popen(
+                [sys.executable, WORKER_SCRIPT],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True
+            )
+            request = json.dumps({"keys": keys, "crypto_asset": crypto_asset})
+            try:
+                output, _ = process.communicate(request, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+                try:
+                    process.communicate(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.communicate()
+                outcome, error = OUTCOME_TIMEOUT, f"Timed out after {timeout:.0f}s"
+            else:
+                try:
+                    reply = json.loads(output.strip().splitlines()[-1])
+                    outcome, error = reply["outcome"], reply["error"]
+                except (IndexError, ValueError, KeyError):
+                    outcome, error = OUTCOME_ERROR, f"Worker exited with code {process.returncode}"
+        except Exception as e:
+            outcome, error = OUTCOME_ERROR, f"{type(e).__name__}: {e}"
+        finally:
+            with self._lock:
+                self._active.discard(crypto_asset)
+
+        duration = time.monotonic() - started
+        result = self._result(crypto_asset, started_at, duration, outcome, error)
+        with self._lock:
+            self._history.append(result)
+
+        if outcome == OUTCOME_SUCCESS:
+            logger.info(f"Strategy for {crypto_asset} completed in {duration:.1f}s")
+        else:
+            logger.error(f"Strategy for {crypto_asset} finished with {outcome} after {duration:.1f}s: {error}")
+
+        if self.on_complete is not None:
+            try:
+                self.on_complete(result)
+            except Exception as e:
+                logger.warning(f"Strategy completion callback failed: {e}")
+        return result
+
+    @staticmethod
+    def _result(crypto_asset, started_at, duration, outcome, error):
+        return {
+            "asset": crypto_asset,
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round(duration, 3),
+            "outcome": outcome,
+            "error": error,
+        }
+
+    def history(self, limit=50):
+        """Return the most recent runs, newest first."""
+        with self._lock:
+            runs = list(self._history)
+        return runs[::-1][:limit]
+
+    def running(self):
+        with self._lock:
+            return sorted(self._active)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
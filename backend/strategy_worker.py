@@ -0,0 +1,52 @@
+"""
+Strategy Worker module
+
+This module is the entry point of the worker processes started by the
+strategy runner. It is run as a script, reads the API keys and the crypto
+asset as JSON on stdin, builds a trader for that asset, runs its strategy
+and writes the outcome as one JSON line on stdout.
+
+Importing it does no work, and the worker never imports the API module, so
+a worker starts without opening the API's stores, threads or sockets.
+"""
+
+import sys
+import json
+import logging
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_ERROR = "error"
+
+
+def run(keys, crypto_asset):
+    """Build a trader for one asset and run its strategy; returns (outcome, error)."""
+    try:
+        from trader_factory import create_trader
+
+        trader = create_trader(
+            coinbase_api_key=keys["coinbase_api_key"],
+            coinbase_api_secret=keys["coinbase_api_secret"].replace("\\n", "\n"),
+            openai_api_key=keys["openai_api_key"],
+            crypto_asset=crypto_asset
+        )
+        trader.run_strategy()
+        return OUTCOME_SUCCESS, None
+    except BaseException as e:
+        return OUTCOME_ERROR, f"{type(e).__name__}: {e}"
+
+
+def main():
+    request = json.load(sys.stdin)
+    crypto_asset = request["crypto_asset"]
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s | %(levelname)-8s | [{crypto_asset}] %(message)s")
+
+    # stdout carries the outcome only; the trader's prints go to the log
+    result_stream = sys.stdout
+    sys.stdout = sys.stderr
+    outcome, error = run(request["keys"], crypto_asset)
+    result_stream.write(json.dumps({"outcome": outcome, "error": error}) + "\n")
+    result_stream.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis_store import AnalysisStore, frame_fingerprint
+
+
+def make_frame(count=50):
+    close = 60000 + np.arange(count, dtype=float)
+    return pd.DataFrame({"close": close, "rsi": np.linspace(30, 70, count)},
+                        index=pd.date_range("2024-01-01", periods=count, freq=pd.Timedelta(hours=1)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnalysisStore(tmp_path / "analysis.sqlite3")
+    yield store
+    store.close()
+
+
+def test_fingerprint_ignores_the_open_candle():
+    frame = make_frame()
+    ticked = frame.copy()
+    ticked.iloc[-1, 0] += 250
+    assert frame_fingerprint(ticked) == frame_fingerprint(frame)
+
+    closed_changed = frame.copy()
+    closed_changed.iloc[-2, 0] += 250
+    assert frame_fingerprint(closed_changed) != frame_fingerprint(frame)
+
+    # A new candle opening closes the previous one
+    assert frame_fingerprint(make_frame(51)) != frame_fingerprint(frame)
+
+
+def test_hit_restamps_the_result(store):
+    analyzed_at = datetime.now() - timedelta(hours=1)
+    fingerprint = frame_fingerprint(make_frame())
+    store.put("BTC", fingerprint, {"status": "success", "data": {"signal": "HOLD"}, "timestamp": analyzed_at})
+
+    result = store.get("BTC", fingerprint)
+    assert result["data"] == {"signal": "HOLD"}
+    assert result["reused"]
+    assert result["analyzed_at"] == analyzed_at
+    assert (datetime.now() - result["timestamp"]).total_seconds() < 60
+    assert store.latest("BTC") is result
+    assert store.get("BTC", "other") is None
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+
+
+def test_restamp_survives_a_restart(store, tmp_path):
+    analyzed_at = datetime.now() - timedelta(hours=1)
+    store.put("BTC", "old", {"status": "success", "data": {"signal": "SELL"}, "timestamp": analyzed_at - timedelta(hours=1)})
+    store.put("BTC", "new", {"status": "success", "data": {"signal": "BUY"}, "timestamp": analyzed_at})
+    store.get("BTC", "old")
+    store.close()
+
+    restarted = AnalysisStore(tmp_path / "analysis.sqlite3")
+    latest = restarted.latest("BTC")
+    assert latest["data"] == {"signal": "SELL"}
+    assert latest["reused"]
+    restarted.close()
+
+
+def test_entries_are_bounded(tmp_path):
+    store = AnalysisStore(tmp_path / "analysis.sqlite3", max_entries=3)
+    for i in range(5):
+        store.put("BTC", f"fp-{i}", {"status": "success", "data": {"i": i}, "timestamp": datetime.now()})
+    assert store.stats()["entries"] == 3
+    assert store.get("BTC", "fp-0") is None
+    assert store.get("BTC", "fp-4")["data"] == {"i": 4}
+    store.close()
+
+
+def test_older_layout_is_replaced(tmp_path):
+    path = tmp_path / "analysis.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE analyses (symbol TEXT, fingerprint TEXT, created_at TEXT, last_access REAL, "
+                     "size INTEGER, payload TEXT, PRIMARY KEY (symbol, fingerprint))")
+    conn.close()
+
+    store = AnalysisStore(path)
+    store.put("BTC", "fp", {"status": "success", "data": {}, "timestamp": datetime.now()})
+    assert store.stats()["entries"] == 1
+    store.close()
@@ -0,0 +1,90 @@
+import pytest
+
+from balance_service import BalanceService
+
+
+class Trader:
+    """Trader whose account fetch and direct balance methods disagree."""
+
+    def __init__(self, usd=1000.0, btc=0.5):
+        self.usd = usd
+        self.btc = btc
+        self.fetches = 0
+
+    def fetch_account_balance(self):
+        self.fetches += 1
+        return {
+            "USD": {"available": 900.0, "hold": 100.0, "total": 1000.0},
+            "ETH": {"available": 2.0, "hold": 0.0, "total": 2.0},
+        }
+
+    def get_usd_balance(self):
+        return self.usd
+
+    def get_btc_balance(self):
+        return self.btc
+
+
+def test_direct_balances_override_the_snapshot():
+    snapshot = BalanceService(ttl=60).get(Trader())
+    assert snapshot.balances["USD"] == {"available": 1000.0, "hold": 100.0, "total": 1000.0}
+    assert snapshot.balances["BTC"] == {"available": 0.5, "hold": 0.0, "total": 0.5}
+    assert snapshot.available("ETH") == 2.0
+
+
+def test_failed_direct_balance_keeps_the_fetched_one():
+    trader = Trader(btc=None)
+    trader.get_usd_balance = lambda: 1 / 0
+    snapshot = BalanceService(ttl=60).get(trader)
+    assert snapshot.available("USD") == 900.0
+    assert "BTC" not in snapshot.balances
+
+
+def test_snapshot_is_shared_until_a_fill_drops_it():
+    trader = Trader()
+    trader.execute_trade = lambda action, amount: {"success": True, "side": action}
+    service = BalanceService(ttl=60)
+    service.track_fills(trader)
+    service.track_fills(trader)
+
+    service.get(trader)
+    service.get(trader)
+    assert trader.fetches == 1
+
+    trader.usd = 400.0
+    trader.execute_trade("BUY", 600.0)
+    assert service.get(trader).available("USD") == 400.0
+    assert trader.fetches == 2
+
+
+def test_failed_order_still_drops_the_snapshot():
+    trader = Trader()
+
+    def execute_trade(action, amount):
+        raise TimeoutError("order status unknown")
+
+    trader.execute_trade = execute_trade
+    service = BalanceService(ttl=60)
+    service.track_fills(trader)
+    service.get(trader)
+    with pytest.raises(TimeoutError):
+        trader.execute_trade("SELL", 0.1)
+    service.get(trader)
+    assert trader.fetches == 2
+
+
+def test_fetch_started_before_a_fill_is_not_cached():
+    trader = Trader()
+    service = BalanceService(ttl=60)
+    original = trader.fetch_account_balance
+
+    def fetch_during_fill():
+        # The order fills while the balances are in flight
+        service.invalidate()
+        return original()
+
+    trader.fetch_account_balance = fetch_during_fill
+    service.get(trader)
+    trader.fetch_account_balance = original
+    service.get(trader)
+    assert trader.fetches == 2
@@ -0,0 +1,110 @@
+import time
+import threading
+
+import pandas as pd
+import pytest
+
+import candle_cache
+from candle_cache import CandleCache, ttl_for_granularity
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(candle_cache.time, "monotonic", clock)
+    return clock
+
+
+def make_frame(start, count):
+    index = pd.date_range(start, periods=count, freq=pd.Timedelta(hours=1))
+    return pd.DataFrame({"close": [float(i) for i in range(count)]}, index=index)
+
+
+class Exchange:
+    """fetch_market_data stand-in recording every call."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = []
+
+    def fetch_market_data(self, granularity="ONE_HOUR", start=None):
+        self.calls.append(start)
+        return self.frame if start is None else self.frame[self.frame.index >= start]
+
+
+def test_ttl_follows_the_granularity():
+    assert ttl_for_granularity("ONE_MINUTE") == candle_cache.MIN_TTL
+    assert ttl_for_granularity("FIVE_MINUTE") == 25
+    assert ttl_for_granularity("ONE_DAY") == candle_cache.MAX_TTL
+
+
+def test_entries_expire_after_their_ttl(clock):
+    exchange = Exchange(make_frame("2024-01-01", 48))
+    cache = CandleCache(ttl_func=lambda granularity: 30)
+
+    cache.get("BTC", "ONE_HOUR", exchange.fetch_market_data)
+    clock.now += 29
+    cache.get("BTC", "ONE_HOUR", exchange.fetch_market_data)
+    assert exchange.calls == [None]
+    assert cache.stats()["hits"] == 1
+
+    # Expired: only candles from the last one held are asked for
+    clock.now += 2
+    exchange.frame = make_frame("2024-01-01", 49)
+    frame = cache.get("BTC", "ONE_HOUR", exchange.fetch_market_data)
+    assert exchange.calls == [None, exchange.frame.index[47]]
+    assert len(frame) == 48
+    assert frame.index[-1] == exchange.frame.index[-1]
+
+
+def test_returned_frames_are_copies(clock):
+    exchange = Exchange(make_frame("2024-01-01", 10))
+    cache = CandleCache(ttl_func=lambda granularity: 30)
+    frame = cache.get("BTC", "ONE_HOUR", exchange.fetch_market_data)
+    frame["close"] = -1.0
+    assert (cache.get("BTC", "ONE_HOUR", exchange.fetch_market_data)["close"] >= 0).all()
+
+
+def test_concurrent_misses_share_one_request():
+    release = threading.Event()
+    calls = []
+
+    def fetch_market_data(granularity="ONE_HOUR"):
+        calls.append(granularity)
+        release.wait(5)
+        return make_frame("2024-01-01", 10)
+
+    cache = CandleCache(ttl_func=lambda granularity: 30)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("BTC", "ONE_HOUR", fetch_market_data)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Every caller has registered its miss before the fetch returns
+    deadline = time.monotonic() + 5
+    while cache.stats()["misses"] < len(threads) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ["ONE_HOUR"]
+    assert len(results) == 8 and all(len(frame) == 10 for frame in results)
+
+
+def test_failed_fetch_is_not_cached_and_reaches_every_waiter():
+    def fetch_market_data(granularity="ONE_HOUR"):
+        raise ConnectionError("exchange down")
+
+    cache = CandleCache(ttl_func=lambda granularity: 30)
+    with pytest.raises(ConnectionError):
+        cache.get("BTC", "ONE_HOUR", fetch_market_data)
+    assert cache.latest("BTC", "ONE_HOUR") is None
@@ -0,0 +1,130 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from http_pool import HttpPool, pooled_coinbase_client, pooled_openai_client
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so reused connections show up as one client port
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.server.seen.append({"path": self.path, "port": self.client_address[1], "headers": dict(self.headers)})
+        if self.path.startswith("/v1/chat/completions"):
+            payload = {"id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4",
+                       "choices": [{"index": 0, "finish_reason": "stop",
+                                    "message": {"role": "assistant", "content": "HOLD"}}]}
+        else:
+            payload = {"accounts": []}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if "close" in self.path:
+            # Every request then opens a new connection, which needs an address
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.seen = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Hosts looked up; localhost resolves to the IPv4 loopback the server listens on."""
+    real_getaddrinfo = socket.getaddrinfo
+    hosts = []
+
+    def getaddrinfo(host, *args, **kwargs):
+        if host == "localhost":
+            hosts.append(host)
+            host = "127.0.0.1"
+        return real_getaddrinfo(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return hosts
+
+
+@pytest.fixture
+def pool():
+    pool = HttpPool(pool_size=4, dns_ttl=300)
+    yield pool
+    pool.close()
+
+
+def test_session_and_address_are_reused_per_origin(server, lookups, pool):
+    origin = f"http://localhost:{server.server_port}"
+    assert pool.session(f"{origin}/a") is pool.session(f"{origin}/b")
+    assert pool.session(f"http://127.0.0.1:{server.server_port}") is not pool.session(origin)
+
+    for _ in range(3):
+        assert pool.request("GET", f"{origin}/api/v3/brokerage/accounts").json() == {"accounts": []}
+
+    assert len({request["port"] for request in server.seen}) == 1
+
+    # The first of these still goes over the kept-alive connection
+    for _ in range(3):
+        pool.request("GET", f"{origin}/status?close=1")
+    assert len({request["port"] for request in server.seen}) == 3
+    assert lookups == ["localhost"]
+
+
+def test_httpx_client_uses_the_dns_cache(server, lookups, pool):
+    client = pool.httpx_client()
+    assert pool.httpx_client() is client
+
+    for _ in range(3):
+        assert client.get(f"http://localhost:{server.server_port}/status?close=1").status_code == 200
+
+    assert len({request["port"] for request in server.seen}) == 3
+    assert lookups == ["localhost"]
+    # Requests go to the cached address under their own host name
+    assert {request["headers"]["Host"] for request in server.seen} == {f"localhost:{server.server_port}"}
+
+
+def test_pooled_clients_keep_their_settings(server, pool):
+    from coinbase.rest import RESTClient
+    from openai import OpenAI
+
+    url = f"http://127.0.0.1:{server.server_port}"
+    original = OpenAI(api_key="sk-test", max_retries=0, timeout=5, http_client=httpx.Client())
+    client = pooled_openai_client(original, f"{url}/v1", pool=pool)
+    original.close()
+    assert (client.api_key, client.max_retries, client.timeout) == ("sk-test", 0, 5)
+
+    completion = client.chat.completions.create(model="gpt-4", messages=[{"role": "user", "content": "BTC?"}])
+    assert completion.choices[0].message.content == "HOLD"
+
+    exchange = pooled_coinbase_client(RESTClient(api_key="key", api_secret="secret", timeout=5), url, sign=False,
+                                      pool=pool)
+    assert exchange.get_accounts() == {"accounts": []}
+
+    openai_request, exchange_request = server.seen
+    assert openai_request["path"] == "/v1/chat/completions"
+    assert openai_request["headers"]["Authorization"] == "Bearer sk-test"
+    assert exchange_request["path"].startswith("/api/v3/brokerage/accounts")
+    assert "Authorization" not in exchange_request["headers"]
+    assert pool.stats()["origins"] == [url]
@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import compute_indicators
+from indicator_engine import INDICATOR_COLUMNS, IndicatorEngine, IndicatorState
+
+# Where trader_factory finds the trader module
+TRADER_DIR = Path(__file__).resolve().parents[3]
+
+
+def make_candles(count, seed=7, volume=True):
+    rng = np.random.default_rng(seed)
+    close = 60000 + np.cumsum(rng.normal(0, 150, count))
+    spread = rng.uniform(20, 300, count)
+    frame = pd.DataFrame({
+        "open": close + rng.normal(0, 50, count),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+    }, index=pd.date_range("2024-01-01", periods=count, freq=pd.Timedelta(hours=1)))
+    if volume:
+        frame["volume"] = rng.uniform(1, 50, count)
+    return frame
+
+
+@pytest.fixture
+def candles():
+    return make_candles(300)
+
+
+def assert_matches(result, expected, columns=INDICATOR_COLUMNS):
+    for column in columns:
+        np.testing.assert_allclose(result[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                   rtol=1e-9, atol=1e-6, equal_nan=True, err_msg=column)
+
+
+def assert_matches_full_recompute(result, history):
+    # The engine keeps state from candles that slid out of the window, so
+    # compare against a recompute over everything it has seen
+    assert_matches(result, compute_indicators(history).loc[result.index])
+
+
+@pytest.mark.parametrize("volume", [True, False])
+def test_incremental_updates_match_full_recompute(volume):
+    candles = make_candles(300, volume=volume)
+    engine = IndicatorEngine()
+
+    # Slide a 200-candle window forward one candle at a time, as the API polls do
+    for end in range(200, len(candles) + 1):
+        frame = candles.iloc[end - 200:end]
+        result = engine.apply("BTC-USD", "ONE_HOUR", frame)
+        if end in (200, 250, len(candles)):
+            assert_matches_full_recompute(result, candles.iloc[:end])
+
+    assert engine.full_recomputes == 1
+    assert engine.incremental_updates == 100
+
+
+def test_provisional_candle_is_not_committed():
+    candles = make_candles(120)
+    engine = IndicatorEngine()
+    engine.apply("BTC-USD", "ONE_HOUR", candles)
+
+    # The open candle moves before it closes
+    revised = candles.copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] += 500
+    revised.iloc[-1, revised.columns.get_loc("high")] += 500
+    result = engine.apply("BTC-USD", "ONE_HOUR", revised)
+
+    assert engine.full_recomputes == 1
+    assert_matches_full_recompute(result, revised)
+
+
+def test_frontend_indicators_are_present():
+    result = IndicatorEngine().apply("BTC-USD", "ONE_HOUR", make_candles(120))
+    latest = result.iloc[-1]
+    for column in ("awesome_oscillator", "stoch_rsi_k", "stoch_rsi_d", "mfi"):
+        assert not np.isnan(latest[column]), column
+
+
+def test_open_candle_is_read_without_changing_the_state(candles):
+    state = IndicatorState()
+    for high, low, close, volume in candles[["high", "low", "close", "volume"]].itertuples(index=False):
+        provisional = state.advance(high, low, close, volume, commit=False)
+        # Reading the open candle and then closing it gives the same values
+        assert state.advance(high, low, close, volume) == pytest.approx(provisional, nan_ok=True)
+
+
+def test_matches_the_trader_formulas(candles, monkeypatch):
+    monkeypatch.syspath_prepend(str(TRADER_DIR))
+    trader_module = pytest.importorskip("btc_investor_ai_v4")
+    # The formulas need no exchange or OpenAI client
+    trader = trader_module.BitcoinAITrader.__new__(trader_module.BitcoinAITrader)
+    expected = trader.calculate_technical_indicators(candles.copy())
+
+    columns = [column for column in INDICATOR_COLUMNS if column in expected.columns]
+    assert columns, "the trader computes none of the engine's indicators"
+    assert_matches(IndicatorEngine().apply("BTC-USD", "ONE_HOUR", candles), expected, columns)
@@ -0,0 +1,118 @@
+import pytest
+
+from position_journal import PositionJournal
+
+
+class FileTrader:
+    """Trader whose position changes load, modify and save one positions document."""
+
+    def __init__(self, document=None):
+        self.document = {position_id: dict(position) for position_id, position in (document or {}).items()}
+        self.saves = 0
+
+    def load_active_positions(self):
+        return {position_id: dict(position) for position_id, position in self.document.items()}
+
+    def save_active_positions(self, positions):
+        self.saves += 1
+        self.document = {position_id: dict(position) for position_id, position in positions.items()}
+
+    def add_position(self, entry_price, size):
+        positions = self.load_active_positions()
+        position_id = f"pos-{entry_price}"
+        positions[position_id] = {"id": position_id, "entry_price": entry_price, "size": size}
+        self.save_active_positions(positions)
+        return position_id
+
+    def update_position_size(self, position_id, new_size):
+        positions = self.load_active_positions()
+        positions[position_id]["size"] = new_size
+        self.save_active_positions(positions)
+
+    def remove_position(self, position_id):
+        positions = self.load_active_positions()
+        positions.pop(position_id, None)
+        self.save_active_positions(positions)
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return tmp_path / "positions"
+
+
+def open_journal(directory):
+    # Long intervals so only explicit exports write the document
+    return PositionJournal(directory, fsync_interval=0.01, export_interval=3600)
+
+
+def test_trader_writes_go_to_the_journal(directory):
+    trader = FileTrader({"old": {"id": "old", "entry_price": 50000, "size": 0.5}})
+    journal = open_journal(directory)
+    journal.attach(trader)
+
+    first = trader.add_position(60000, 0.1)
+    trader.update_position_size(first, 0.2)
+    trader.remove_position("old")
+
+    assert trader.saves == 0
+    assert trader.load_active_positions() == {first: {"id": first, "entry_price": 60000, "size": 0.2}}
+
+    assert journal.export()
+    assert trader.saves == 1
+    assert trader.document == journal.all()
+    assert not journal.export()
+    journal.close()
+
+
+def test_positions_survive_a_restart(directory):
+    trader = FileTrader()
+    journal = open_journal(directory)
+    journal.attach(trader)
+    position_id = trader.add_position(60000, 0.1)
+    journal.update(position_id, {"stop_loss": 57000})
+    journal.close()
+
+    # The document was written on close; the journal replays to the same map
+    restarted = open_journal(directory)
+    assert restarted.all() == trader.document
+    assert restarted.all()[position_id]["stop_loss"] == 57000
+    restarted.close()
+
+
+def test_unexported_changes_win_over_a_stale_document(directory):
+    trader = FileTrader()
+    journal = open_journal(directory)
+    journal.attach(trader)
+    position_id = trader.add_position(60000, 0.1)
+    journal.export()
+    journal.update(position_id, {"size": 0.3})
+    # Crash before the document is rewritten: only the journal has the change
+    journal.flush()
+
+    restarted = open_journal(directory)
+    restarted.attach(FileTrader(trader.document))
+    assert restarted.get(position_id)["size"] == 0.3
+    restarted.close()
+
+
+def test_worker_changes_are_merged(directory):
+    trader = FileTrader()
+    journal = open_journal(directory)
+    journal.attach(trader)
+    kept = trader.add_position(60000, 0.1)
+    sold = trader.add_position(61000, 0.2)
+    journal.export()
+
+    # The API changes a position while a worker process rewrites the document
+    journal.update(kept, {"take_profit": 66000})
+    worker = FileTrader(trader.document)
+    worker.remove_position(sold)
+    bought = worker.add_position(62000, 0.3)
+    trader.document = worker.document
+
+    journal.attach(trader)
+    positions = journal.all()
+    assert set(positions) == {kept, bought}
+    assert positions[kept]["take_profit"] == 66000
+    assert trader.document == positions
+    journal.close()
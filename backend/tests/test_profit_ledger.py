@@ -0,0 +1,144 @@
+from datetime import datetime
+
+import pytest
+
+from profit_ledger import ProfitLedger
+from utils import calculate_total_profit_summary
+
+
+class FakeTrader:
+    """Trader keeping its trade log and positions in memory, like the JSON files."""
+
+    def __init__(self, trade_history=None, positions=None):
+        self.trade_history = list(trade_history or [])
+        self.positions = dict(positions or {})
+
+    def get_trade_history(self, limit=10):
+        return self.trade_history[-limit:]
+
+    def load_active_positions(self):
+        return {position_id: dict(position) for position_id, position in self.positions.items()}
+
+    def log_trade(self, position_id, size, side, price, reason=None):
+        self.trade_history.append({"timestamp": datetime.now().isoformat(), "position_id": position_id,
+                                   "size": size, "side": side, "price": price, "reason": reason})
+
+    def add_position(self, entry_price, size, stop_loss=None, take_profit=None):
+        position_id = f"pos-{len(self.positions)}-{len(self.trade_history)}"
+        self.positions[position_id] = {"id": position_id, "entry_price": entry_price, "size": size}
+        return position_id
+
+    def update_position_size(self, position_id, new_size):
+        self.positions[position_id]["size"] = new_size
+
+    def remove_position(self, position_id):
+        self.positions.pop(position_id, None)
+
+
+EARLIER_HISTORY = [
+    {"position_id": "old-1", "size": 0.5, "side": "BUY", "price": 50000},
+    {"position_id": "old-1", "size": 0.5, "side": "SELL", "price": 52000, "profit_amount": 900.0},
+    {"position_id": "old-2", "size": 0.2, "side": "BUY", "price": 55000},
+]
+
+
+def open_position(trader, price, size):
+    position_id = trader.add_position(price, size)
+    trader.log_trade(position_id, size, "BUY", price)
+    return position_id
+
+
+def trade_live(trader):
+    first = open_position(trader, 60000, 0.1)
+    second = open_position(trader, 62000, 0.2)
+    # Scale into the second position at a different price
+    trader.log_trade(second, 0.1, "BUY", 64000)
+    trader.update_position_size(second, 0.3)
+
+    # Partial, then full exit of the second position
+    trader.log_trade(second, 0.1, "SELL", 65000)
+    trader.update_position_size(second, 0.2)
+    trader.log_trade(second, 0.2, "SELL", 61000)
+    trader.remove_position(second)
+
+    # A position opened before the ledger was attached, closed at a loss
+    trader.log_trade("old-2", 0.2, "SELL", 53000)
+    trader.remove_position("old-2")
+
+    # A sell without any logged buy realizes nothing
+    trader.log_trade("unknown", 0.05, "SELL", 70000)
+    return first
+
+
+def test_live_totals_match_rebuilt_totals():
+    trader = FakeTrader(EARLIER_HISTORY, {"old-2": {"id": "old-2", "entry_price": 55000, "size": 0.2}})
+    live = ProfitLedger()
+    live.attach(trader)
+    trade_live(trader)
+
+    rebuilt = ProfitLedger()
+    rebuilt.rebuild(trader.get_trade_history(limit=10 ** 9), trader.load_active_positions())
+    recomputed = calculate_total_profit_summary(
+        trader.get_trade_history(limit=10 ** 9), list(trader.load_active_positions().values()), 66000)
+
+    assert live.summary(66000) == pytest.approx(rebuilt.summary(66000))
+    assert live.summary(66000) == pytest.approx(recomputed)
+
+
+def test_realized_profit_of_sells():
+    trader = FakeTrader()
+    ledger = ProfitLedger()
+    ledger.attach(trader)
+    trade_live(trader)
+
+    # Second position: 0.3 bought at an average of (62000 * 0.2 + 64000 * 0.1) / 0.3
+    average = (62000 * 0.2 + 64000 * 0.1) / 0.3
+    expected = (65000 - average) * 0.1 + (61000 - average) * 0.2
+    assert ledger.summary(66000)["realized_profit"] == pytest.approx(expected)
+
+
+def test_live_sells_carry_their_profit_amount():
+    trader = FakeTrader()
+    ledger = ProfitLedger()
+    recorded = []
+    ledger.add_listener(recorded.append)
+    ledger.attach(trader)
+
+    position_id = open_position(trader, 60000, 0.1)
+    trader.log_trade(position_id, 0.1, "SELL", 63000)
+
+    assert "profit_amount" not in recorded[0]
+    assert recorded[1]["profit_amount"] == pytest.approx(300.0)
+
+
+def test_newest_first_history_gives_the_same_totals():
+    trader = FakeTrader()
+    ledger = ProfitLedger()
+    ledger.attach(trader)
+    trade_live(trader)
+    history = trader.get_trade_history(limit=10 ** 9)
+    for second, trade in enumerate(history):
+        # Distinct times, and no recorded profit so every sell is priced from its buys
+        trade["timestamp"] = f"2024-01-01T00:00:{second:02d}"
+        trade.pop("profit_amount", None)
+
+    oldest_first = calculate_total_profit_summary(history, [], 66000)
+    newest_first = calculate_total_profit_summary(list(reversed(history)), [], 66000)
+    assert oldest_first["realized_profit"] == pytest.approx(ledger.summary(66000)["realized_profit"])
+    assert newest_first == pytest.approx(oldest_first)
+
+    rebuilt = ProfitLedger()
+    rebuilt.rebuild(list(reversed(history)), {})
+    assert rebuilt.summary(66000)["realized_profit"] == pytest.approx(oldest_first["realized_profit"])
+
+
+def test_recorded_profit_is_kept():
+    history = [
+        {"timestamp": "2024-01-01T00:00:00", "position_id": "a", "size": 1.0, "side": "BUY", "price": 100},
+        {"timestamp": "2024-01-02T00:00:00", "position_id": "a", "size": 1.0, "side": "SELL", "price": 150,
+         "profit": 42.0},
+        {"timestamp": "2024-01-03T00:00:00", "position_id": "b", "size": 1.0, "side": "SELL", "price": 150,
+         "profit_amount": -7.0},
+    ]
+    summary = calculate_total_profit_summary(list(reversed(history)), [], 150)
+    assert summary["realized_profit"] == pytest.approx(35.0)
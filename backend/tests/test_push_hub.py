@@ -0,0 +1,95 @@
+import json
+import asyncio
+
+from push_hub import PushHub
+
+
+class FakeWebSocket:
+    """WebSocket whose sends block until `release` is set, like a client that stopped reading."""
+
+    def __init__(self, blocked=False):
+        self.sent = []
+        self.closed_with = None
+        self.release = asyncio.Event()
+        if not blocked:
+            self.release.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_slow_consumer_is_evicted_without_delaying_others():
+    async def scenario():
+        hub = PushHub(queue_size=2, max_dropped=3)
+        slow_socket, fast_socket = FakeWebSocket(blocked=True), FakeWebSocket()
+        slow = await hub.connect(slow_socket, ["price:BTC"])
+        fast = await hub.connect(fast_socket, ["price:BTC"])
+
+        delivered = []
+        for price in range(8):
+            delivered.append(hub.publish("price:BTC", {"price": price}))
+            await settle()
+
+        assert slow not in hub.clients
+        assert slow_socket.closed_with == 1013
+        assert fast in hub.clients
+        # The fast client got every update while the slow one was stuck
+        assert [message["data"]["price"] for message in fast_socket.sent] == list(range(8))
+        # The slow client held one message in send plus its queue, then dropped three
+        assert delivered[-1] == 1
+        hub.disconnect(fast)
+
+    asyncio.run(scenario())
+
+
+def test_queue_draining_resets_the_drop_count():
+    async def scenario():
+        hub = PushHub(queue_size=1, max_dropped=2)
+        socket = FakeWebSocket(blocked=True)
+        client = await hub.connect(socket, ["balance"])
+
+        for value in range(3):
+            hub.publish("balance", {"USD": value})
+            await settle()
+        assert client.dropped == 1
+
+        # The client catches up before reaching the limit
+        socket.release.set()
+        await settle()
+        hub.publish("balance", {"USD": 3})
+        await settle()
+        assert client.dropped == 0
+        assert client in hub.clients
+        hub.disconnect(client)
+
+    asyncio.run(scenario())
+
+
+def test_subscribers_get_the_latest_message_and_only_their_topics():
+    async def scenario():
+        hub = PushHub()
+        hub.publish("profit", {"total_profit": 12.5})
+        socket = FakeWebSocket()
+        client = await hub.connect(socket, ["price:ETH"])
+        await hub.handle_message(client, json.dumps({"action": "subscribe", "topics": ["profit"]}))
+        hub.publish("price:BTC", {"price": 1})
+        await settle()
+        hub.disconnect(client)
+        return socket.sent
+
+    sent = asyncio.run(scenario())
+    assert sent[0]["topic"] == "profit" and sent[0]["type"] == "profit_update"
+    assert sent[1] == {"type": "subscriptions", "topics": ["price:ETH", "profit"]}
+    assert len(sent) == 2
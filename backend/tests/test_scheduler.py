@@ -0,0 +1,127 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import scheduler
+from scheduler import CATCH_UP_SKIP, CronTrigger, IntervalTrigger, Scheduler
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+real_sleep = asyncio.sleep
+
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake wall clock that moves only when the scheduler sleeps."""
+    clock = Clock()
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock.now
+
+    async def sleep(seconds):
+        # Let due runs start at the current time before the clock moves on
+        await real_sleep(0)
+        clock.advance(seconds)
+
+    monkeypatch.setattr(scheduler, "datetime", FakeDatetime)
+    monkeypatch.setattr(scheduler.asyncio, "sleep", sleep)
+    monkeypatch.setattr(scheduler.random, "uniform", lambda low, high: high)
+    return clock
+
+
+async def wait_until(condition, steps=10000):
+    for _ in range(steps):
+        if condition():
+            return
+        await real_sleep(0)
+    raise AssertionError("condition not reached")
+
+
+def test_interval_runs_stay_anchored_despite_jitter(clock):
+    runs = []
+
+    async def job():
+        runs.append(clock.now)
+
+    async def scenario():
+        jobs = Scheduler()
+        jobs.add_job("strategy", job, IntervalTrigger(seconds=60), jitter=20)
+        jobs.start()
+        await wait_until(lambda: len(runs) >= 5)
+        jobs.stop()
+
+    asyncio.run(scenario())
+    # Every run is 20s of jitter after its own fire time; the jitter never adds up
+    assert runs[:5] == [START + timedelta(seconds=60 * k + 20) for k in range(1, 6)]
+
+
+def test_overlapping_fire_times_are_skipped(clock):
+    release = None
+    runs = []
+
+    async def job():
+        runs.append(clock.now)
+        await release.wait()
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        jobs = Scheduler()
+        job_state = jobs.add_job("strategy", job, IntervalTrigger(seconds=60))
+        jobs.start()
+        await wait_until(lambda: job_state.skipped_overlap >= 3)
+        assert len(runs) == 1 and job_state.running
+
+        release.set()
+        await wait_until(lambda: len(runs) >= 2)
+        jobs.stop()
+        return job_state
+
+    job_state = asyncio.run(scenario())
+    assert job_state.missed == 0
+    assert job_state.runs >= 1
+    # The next run after the long one still falls on the schedule
+    assert (runs[1] - START).total_seconds() % 60 == 0
+
+
+def test_missed_fire_times_run_once_or_are_skipped(clock):
+    woke_up = START + timedelta(seconds=6 * 60 + 30)
+    # "once" runs on waking up; both policies then re-anchor the schedule there
+    for policy, first_run in (("once", woke_up), (CATCH_UP_SKIP, woke_up + timedelta(seconds=60))):
+        runs = []
+
+        async def job():
+            runs.append(clock.now)
+
+        async def scenario():
+            jobs = Scheduler()
+            job_state = jobs.add_job("strategy", job, IntervalTrigger(seconds=60), catch_up=policy)
+            jobs.start()
+            await real_sleep(0)
+            # The host sleeps through five fire times; the job's pending 60s sleep ends at woke_up
+            clock.now = woke_up - timedelta(seconds=60)
+            await wait_until(lambda: runs)
+            jobs.stop()
+            return job_state
+
+        clock.now = START
+        job_state = asyncio.run(scenario())
+        assert job_state.missed == 5
+        assert runs[0] == first_run
+
+
+def test_cron_trigger_next_fire_time():
+    trigger = CronTrigger("*/15 9-17 * * 1-5")
+    # Friday 17:50 -> Monday 09:00
+    assert trigger.next_after(datetime(2024, 1, 5, 17, 50)) == datetime(2024, 1, 8, 9, 0)
+    assert trigger.next_after(datetime(2024, 1, 8, 9, 0)) == datetime(2024, 1, 8, 9, 15)
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from serialization import FORMAT_COLUMNS, cursor_for, parse_since, serialize_frame, slice_since
+
+
+def make_frame(count=5, tz=None):
+    index = pd.date_range("2024-01-01", periods=count, freq=pd.Timedelta(hours=1), tz=tz)
+    return pd.DataFrame({"close": np.arange(count, dtype=float)}, index=index)
+
+
+def test_delta_starts_at_the_cursor_candle():
+    frame = make_frame()
+    cursor = cursor_for(frame.iloc[:3])
+    assert cursor == "2024-01-01T02:00:00"
+
+    # The candle at the cursor may not have closed, so it is sent again
+    delta = slice_since(frame, parse_since(cursor))
+    assert list(delta["close"]) == [2.0, 3.0, 4.0]
+    assert cursor_for(delta) == "2024-01-01T04:00:00"
+
+
+def test_cursor_between_candles_and_after_the_last():
+    frame = make_frame()
+    assert list(slice_since(frame, parse_since("2024-01-01T01:30:00"))["close"]) == [2.0, 3.0, 4.0]
+    latest = slice_since(frame, parse_since("2024-01-02T00:00:00"))
+    assert latest.empty
+    assert cursor_for(latest) is None
+
+
+def test_cursor_round_trips_across_time_zones():
+    utc_frame = make_frame(tz="UTC")
+    cursor = cursor_for(utc_frame.iloc[:2])
+    assert cursor == "2024-01-01T01:00:00+00:00"
+    assert list(slice_since(utc_frame, parse_since(cursor))["close"]) == [1.0, 2.0, 3.0, 4.0]
+
+    # A naive cursor against an aware index and the other way round
+    assert len(slice_since(utc_frame, parse_since("2024-01-01T03:00:00"))) == 2
+    assert len(slice_since(make_frame(), parse_since("2024-01-01T03:00:00+00:00"))) == 2
+
+
+def test_invalid_since_is_rejected():
+    with pytest.raises(ValueError):
+        parse_since("yesterday-ish")
+
+
+def test_delta_serializes_like_the_full_frame():
+    frame = make_frame()
+    frame.iloc[3, 0] = np.nan
+    delta = slice_since(frame, parse_since(cursor_for(frame.iloc[:3])))
+    full = serialize_frame(frame, FORMAT_COLUMNS)
+    assert serialize_frame(delta, FORMAT_COLUMNS) == {name: values[2:] for name, values in full.items()}
+    assert serialize_frame(delta)[1] == {"close": None, "timestamp": "2024-01-01T03:00:00"}
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def analyze():
+        calls.append("BTC")
+        await asyncio.sleep(0.01)
+        return {"signal": "HOLD"}
+
+    async def scenario():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("BTC", analyze) for _ in range(5)))
+        assert not flights.in_flight("BTC")
+        return results
+
+    results = asyncio.run(scenario())
+    assert calls == ["BTC"]
+    assert all(result is results[0] for result in results)
+
+
+def test_exception_reaches_every_caller():
+    async def analyze():
+        await asyncio.sleep(0.01)
+        raise TimeoutError("model timed out")
+
+    async def scenario():
+        flights = SingleFlight()
+        return await asyncio.gather(*(flights.do("BTC", analyze) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, TimeoutError) for result in asyncio.run(scenario()))
+
+
+def test_stale_result_is_served_while_one_refresh_runs():
+    """The stale-while-revalidate path of /api/ai-analysis: serve the old result, refresh once in the background."""
+    cache = {"BTC": "old"}
+    refreshes = []
+
+    async def scenario():
+        done = asyncio.Event()
+
+        async def refresh():
+            refreshes.append("BTC")
+            await done.wait()
+            cache["BTC"] = "new"
+            return "new"
+
+        flights = SingleFlight()
+
+        async def request():
+            flights.refresh("BTC", refresh)
+            return cache["BTC"]
+
+        served = [await request() for _ in range(3)]
+        assert flights.in_flight("BTC")
+        # A caller that needs the fresh result joins the running refresh
+        waiter = asyncio.ensure_future(flights.do("BTC", refresh))
+        done.set()
+        assert await waiter == "new"
+        assert not flights.in_flight("BTC")
+        return served
+
+    assert asyncio.run(scenario()) == ["old", "old", "old"]
+    assert refreshes == ["BTC"]
+    assert cache["BTC"] == "new"
+
+
+def test_failed_background_refresh_is_not_left_in_flight():
+    async def refresh():
+        raise ConnectionError("OpenAI unreachable")
+
+    async def scenario():
+        flights = SingleFlight()
+        task = flights.refresh("BTC", refresh)
+        with pytest.raises(ConnectionError):
+            await task
+        assert not flights.in_flight("BTC")
+        # The next request starts a new refresh
+        assert await flights.do("BTC", lambda: asyncio.sleep(0, result="new")) == "new"
+
+    asyncio.run(scenario())
+
+
+def test_disconnecting_caller_does_not_cancel_the_shared_call():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def analyze():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flights.do("BTC", analyze))
+        second = asyncio.ensure_future(flights.do("BTC", analyze))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
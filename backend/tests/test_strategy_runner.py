@@ -0,0 +1,50 @@
+import textwrap
+
+import pytest
+
+import strategy_runner
+from strategy_runner import StrategyRunner
+
+
+@pytest.fixture
+def worker_script(tmp_path, monkeypatch):
+    """Worker that succeeds for every asset but SLOW, which never finishes in time."""
+    script = tmp_path / "worker.py"
+    script.write_text(textwrap.dedent("""
+        import sys, json, time
+        request = json.load(sys.stdin)
+        print("trader output goes to the log")
+        if request["crypto_asset"] == "SLOW":
+            time.sleep(60)
+        sys.stdout.write(json.dumps({"outcome": "success", "error": None}) + "\\n")
+    """))
+    monkeypatch.setattr(strategy_runner, "WORKER_SCRIPT", str(script))
+    return script
+
+
+def test_batch_runs_in_workers_after_one_start_callback(worker_script):
+    starts = []
+    runner = StrategyRunner(max_parallel=2, timeout=30, on_start=lambda: starts.append(runner.running()))
+
+    results = runner.run_all({"coinbase_api_key": "key"}, ["BTC", "ETH", "SOL"])
+
+    assert [result["outcome"] for result in results] == ["success"] * 3
+    # Exported once, before any worker of the batch was running
+    assert starts == [[]]
+    runner.shutdown()
+
+
+def test_slow_worker_is_terminated(worker_script):
+    runner = StrategyRunner(timeout=1)
+    result, = runner.run_all({}, ["SLOW"])
+    assert result["outcome"] == "timeout"
+    runner.shutdown()
+
+
+def test_worker_failures_are_reported():
+    # The real worker cannot trade without keys and reports why
+    runner = StrategyRunner(timeout=60)
+    result, = runner.run_all({"coinbase_api_key": "", "coinbase_api_secret": "", "openai_api_key": ""}, ["BTC"])
+    assert result["outcome"] == "error"
+    assert result["error"]
+    runner.shutdown()
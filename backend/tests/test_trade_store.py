@@ -0,0 +1,100 @@
+import os
+import json
+
+import pytest
+
+from trade_store import TradeStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TradeStore(tmp_path / "trades.sqlite3")
+    yield store
+    store.close()
+
+
+def make_trades(count, side="BUY"):
+    return [{"timestamp": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}", "position_id": "pos-1",
+             "side": side, "size": 0.1, "price": 60000 + i} for i in range(count)]
+
+
+def all_pages(store, limit, **filters):
+    trades, cursor = store.page(limit=limit, **filters)
+    while cursor is not None:
+        page, cursor = store.page(limit=limit, cursor=cursor, **filters)
+        trades.extend(page)
+    return trades
+
+
+def test_migrate_skips_trades_already_stored(store):
+    history = make_trades(10)
+    assert store.migrate(history[:6], "first") == 6
+
+    # Overlapping, reordered history with live trades already appended
+    store.append(history[8])
+    assert store.migrate(list(reversed(history)), "second") == 3
+    assert store.count() == 10
+
+
+def test_identical_fills_are_kept(store):
+    fill = make_trades(1)[0]
+    store.append(dict(fill))
+    store.append(dict(fill))
+    assert store.count() == 2
+
+    # Re-importing the history holding both fills adds nothing
+    assert store.migrate([fill, fill], "trader history") == 0
+    assert store.migrate([fill, fill, fill], "trader history") == 1
+    assert store.count() == 3
+
+
+def test_trader_ids_identify_trades(store):
+    fill = make_trades(1)[0]
+    store.migrate([{**fill, "order_id": "a"}, {**fill, "order_id": "b"}], "first")
+    assert store.migrate([{**fill, "order_id": "b"}, {**fill, "order_id": "c"}], "second") == 1
+    assert store.count() == 3
+
+
+def test_json_file_is_imported_again_once_it_changes(store, tmp_path):
+    path = tmp_path / "trade_history.json"
+    history = make_trades(8)
+    path.write_text(json.dumps({"trades": history[:5]}))
+
+    assert store.migrate_json_file(path) == 5
+    assert store.migrate_json_file(path) == 0
+    assert store.migrated
+
+    # The trader appends to its file
+    path.write_text(json.dumps(history))
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+    assert store.migrate_json_file(path) == 3
+    assert store.count() == 8
+
+
+def test_pages_are_newest_first_by_trade_time(store):
+    history = make_trades(25)
+    # Imported oldest first, then an older trade arrives last
+    store.migrate(history[5:], "file")
+    store.migrate(history[:5], "late file")
+
+    trades = all_pages(store, limit=4)
+    assert [trade["price"] for trade in trades] == [trade["price"] for trade in reversed(history)]
+
+    sells = make_trades(3, side="SELL")
+    store.migrate(sells, "sells")
+    assert [trade["price"] for trade in all_pages(store, limit=2, side="SELL")] == [60002, 60001, 60000]
+
+
+def test_invalid_cursor_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.page(cursor="123")
+
+
+def test_page_sees_every_appended_trade(store):
+    for trade in make_trades(250, side="SELL"):
+        store.append(trade)
+
+    trades, next_cursor = store.page(limit=500, side="SELL")
+    assert len(trades) == 250
+    assert next_cursor is None
@@ -0,0 +1,81 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+import trader_calls
+from trader_calls import run_blocking
+
+
+@pytest.fixture(autouse=True)
+def fresh_semaphores(monkeypatch):
+    # Semaphores bind to the event loop of each asyncio.run
+    monkeypatch.setattr(trader_calls, "_semaphores", {})
+
+
+class Gauge:
+    """Blocking call recording how many copies of it run at once."""
+
+    def __init__(self, seconds=0.05):
+        self.seconds = seconds
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+
+
+async def run_many(endpoint, func, count):
+    await asyncio.gather(*(run_blocking(endpoint, func) for _ in range(count)))
+
+
+def test_endpoint_limit_bounds_concurrent_calls():
+    gauge = Gauge()
+    asyncio.run(run_many("execute-trade", gauge, 8))
+    assert gauge.peak == trader_calls.ENDPOINT_LIMITS["execute-trade"]
+
+
+def test_unknown_endpoint_gets_the_default_limit():
+    gauge = Gauge()
+    asyncio.run(run_many("new-endpoint", gauge, 10))
+    assert gauge.peak == trader_calls.DEFAULT_ENDPOINT_LIMIT
+
+
+def test_endpoints_do_not_share_a_limit():
+    trades, positions = Gauge(), Gauge()
+
+    async def both():
+        await asyncio.gather(run_many("execute-trade", trades, 4), run_many("positions", positions, 4))
+
+    asyncio.run(both())
+    assert trades.peak == 2
+    assert positions.peak == 4
+
+
+def test_timeout_raises_and_frees_the_slot():
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await run_blocking("configure", release.wait, 5, timeout=0.05)
+        # The limit of 1 is available again once the timed-out call was abandoned
+        release.set()
+        return await run_blocking("configure", lambda: "configured", timeout=5)
+
+    assert asyncio.run(scenario()) == "configured"
+
+
+def test_results_and_exceptions_come_back():
+    async def scenario():
+        assert await run_blocking("positions", lambda a, b=0: a + b, 1, b=2) == 3
+        with pytest.raises(ValueError):
+            await run_blocking("positions", int, "not a number")
+
+    asyncio.run(scenario())
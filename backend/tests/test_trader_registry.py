@@ -0,0 +1,57 @@
+import threading
+
+from trader_registry import Keyring, TraderRegistry
+
+KEYS = {"coinbase_api_key": "key", "coinbase_api_secret": "secret", "openai_api_key": "sk"}
+
+
+class Trader:
+    def __init__(self, crypto_asset, build):
+        self.crypto_asset = crypto_asset
+        self.build = build
+
+
+def make_registry(tmp_path, factory):
+    keyring = Keyring(tmp_path / "api_keys.json", lambda: dict(KEYS))
+    keyring.set(KEYS)
+    return TraderRegistry(keyring, factory)
+
+
+def test_traders_are_built_once_and_reused(tmp_path):
+    builds = []
+
+    def factory(crypto_asset, **keys):
+        builds.append(crypto_asset)
+        return Trader(crypto_asset, len(builds))
+
+    registry = make_registry(tmp_path, factory)
+    assert registry.get("ETH") is registry.get("ETH")
+    assert builds == ["ETH"]
+
+
+def test_trader_built_across_an_invalidation_is_discarded(tmp_path):
+    building = threading.Event()
+    release = threading.Event()
+    builds = []
+
+    def factory(crypto_asset, **keys):
+        builds.append(crypto_asset)
+        if len(builds) == 1:
+            building.set()
+            release.wait(5)
+        return Trader(crypto_asset, len(builds))
+
+    registry = make_registry(tmp_path, factory)
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("trader", registry.get("ETH")))
+    thread.start()
+    assert building.wait(5)
+
+    registry.invalidate()
+    release.set()
+    thread.join(5)
+
+    # The first build finished after the invalidation, so it was built again
+    assert result["trader"].build == 2
+    assert registry.get("ETH") is result["trader"]
+    assert builds == ["ETH", "ETH"]
@@ -0,0 +1,356 @@
+"""
+Trade Store module
+
+This module stores the trade history in SQLite (WAL mode) through
+SQLAlchemy instead of one JSON document that is rewritten on every trade.
+Rows are indexed on timestamp, position_id and side, new trades are written
+in batches by a background thread, and pages are read newest first with
+keyset (cursor) pagination on (timestamp, id), so reading a page costs the
+same at 100 trades or 1M whatever order the trades were imported in.
+
+Every row carries a unique trade key so the same trade imported twice is
+stored once: the trader's trade/order id when the trade has one, otherwise
+its content (timestamp, position, side, size, price) plus an occurrence
+number, so two genuinely identical fills stay two trades.
+"""
+
+import os
+import json
+import time
+import base64
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import (
+    create_engine, event, MetaData, Table, Column, Integer, Float, String, Text,
+    Index, select, func, tuple_
+)
+
+from utils import load_json_file
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# A batch is written once it holds this many trades or is this many seconds old
+BATCH_SIZE = 100
+BATCH_INTERVAL = 0.5
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 500
+
+# Trade fields holding an id assigned by the trader or the exchange, in order of preference
+TRADE_ID_FIELDS = ("trade_id", "order_id", "fill_id")
+
+metadata = MetaData()
+
+trades_table = Table(
+    "trades", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    # Empty when the trade has no time, so it sorts oldest
+    Column("timestamp", String(40), nullable=False),
+    Column("position_id", String(100)),
+    Column("side", String(10)),
+    Column("size", Float),
+    Column("price", Float),
+    Column("profit_amount", Float, nullable=True),
+    Column("payload", Text, nullable=False),
+    Column("trade_key", String(200), nullable=False),
+    Column("content_key", String(64), nullable=False),
+    # SQLite appends the rowid (id) to every index, so these also serve the
+    # (timestamp DESC, id DESC) page order and its cursor range
+    Index("idx_trades_timestamp", "timestamp"),
+    Index("idx_trades_position_id", "position_id", "timestamp"),
+    Index("idx_trades_side", "side", "timestamp"),
+    Index("idx_trades_trade_key", "trade_key", unique=True),
+    Index("idx_trades_content_key", "content_key"),
+)
+
+# Rows whose trade_key is already stored are skipped
+insert_new_trades = trades_table.insert().prefix_with("OR IGNORE")
+
+meta_table = Table(
+    "store_meta", metadata,
+    Column("key", String(100), primary_key=True),
+    Column("value", Text),
+)
+
+
+def _as_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _timestamp_text(value):
+    """Normalize a trade timestamp to ISO-8601 text so it sorts chronologically."""
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value).isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    try:
+        return datetime.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        return str(value)
+
+
+def _content_key(values):
+    """Hash the fields that describe a trade, independent of how it was logged."""
+    identity = [values[name] for name in ("timestamp", "position_id", "side", "size", "price")]
+    return hashlib.sha256(json.dumps(identity).encode()).hexdigest()
+
+
+def _assign_trade_keys(rows, stored_counts=None):
+    """
+    Give every row without a trader id the key "<content key>:<occurrence>".
+
+    Occurrences continue from `stored_counts` (content key -> rows already
+    stored), so a repeated identical fill gets the next number.
+    """
+    seen = dict(stored_counts or {})
+    for row in rows:
+        if row["trade_key"] is None:
+            occurrence = seen.get(row["content_key"], 0)
+            seen[row["content_key"]] = occurrence + 1
+            row["trade_key"] = f"{row['content_key']}:{occurrence}"
+    return rows
+
+
+def encode_cursor(timestamp, row_id):
+    """Encode a page position as an opaque cursor string."""
+    return base64.urlsafe_b64encode(json.dumps([timestamp, row_id]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed."""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(row_id, int) or not isinstance(timestamp, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return timestamp, row_id
+
+
+def _row_values(trade):
+    """Map a trade dict to the indexed columns plus its JSON payload."""
+    values = {
+        "timestamp": _timestamp_text(trade.get("timestamp") or trade.get("time")),
+        "position_id": None if trade.get("position_id") is None else str(trade.get("position_id")),
+        "side": trade.get("side"),
+        "size": _as_float(trade.get("size")),
+        "price": _as_float(trade.get("price")),
+        "profit_amount": _as_float(trade.get("profit_amount")),
+        "payload": json.dumps(trade, default=str),
+    }
+    values["content_key"] = _content_key(values)
+    trade_id = next((trade[name] for name in TRADE_ID_FIELDS if trade.get(name) not in (None, "")), None)
+    # Trades without a trader id get their key when they are written
+    values["trade_key"] = None if trade_id is None else f"id:{trade_id}"
+    return values
+
+
+class TradeStore:
+    """SQLite-backed trade history with batched writes and cursor pagination."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.engine = create_engine(f"sqlite:///{self.path}", connect_args={"check_same_thread": False})
+        event.listen(self.engine, "connect", self._configure_connection)
+        metadata.create_all(self.engine)
+
+        self._pending = []
+        self._cond = threading.Condition()
+        # Held from taking a batch until it is committed, so a reader's flush
+        # waits for a batch the writer thread is still inserting
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="trade-store-writer", daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def _configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    # Writes
+
+    def append(self, trade):
+        """Queue a trade; it is written with the next batch."""
+        with self._cond:
+            self._pending.append(_row_values(trade))
+            if len(self._pending) >= BATCH_SIZE:
+                self._cond.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                if len(self._pending) < BATCH_SIZE and not self._closed:
+                    self._cond.wait(BATCH_INTERVAL)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error writing trade batch: {e}")
+                time.sleep(BATCH_INTERVAL)
+            if closed:
+                return
+
+    def flush(self):
+        """Write every queued trade in a single transaction; returns once all of them are committed."""
+        with self._write_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(insert_new_trades, _assign_trade_keys(
+                        [dict(row) for row in batch], self._stored_counts(conn, batch)))
+            except Exception:
+                # Put the batch back so it is retried with the next flush
+                with self._cond:
+                    self._pending = batch + self._pending
+                raise
+            return len(batch)
+
+    def close(self):
+        """Write pending trades and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join(timeout=5)
+        self.engine.dispose()
+
+    @staticmethod
+    def _stored_counts(conn, rows):
+        """Count the stored rows sharing a content key with any keyless row."""
+        keys = list({row["content_key"] for row in rows if row["trade_key"] is None})
+        counts = {}
+        # Stay below SQLite's bound parameter limit
+        for i in range(0, len(keys), 500):
+            query = (select(trades_table.c.content_key, func.count())
+                     .where(trades_table.c.content_key.in_(keys[i:i + 500]))
+                     .group_by(trades_table.c.content_key))
+            counts.update(conn.execute(query).fetchall())
+        return counts
+
+    # Migration
+
+    def _get_meta(self, conn, key):
+        return conn.execute(select(meta_table.c.value).where(meta_table.c.key == key)).scalar()
+
+    def _set_meta(self, conn, key, value):
+        conn.execute(meta_table.insert().prefix_with("OR REPLACE"), {"key": key, "value": value})
+
+    def migrate(self, records, source):
+        """
+        Import trade records the store does not hold yet.
+
+        `records` is a whole history. Records are matched on their trade key,
+        so importing a history that overlaps the stored trades (e.g. on
+        restart, or trades logged by another process) only adds the new ones,
+        whatever their order. Identical records without a trader id are told
+        apart by their occurrence in `records`.
+
+        Returns:
+            Number of imported trades
+        """
+        self.flush()
+        rows = _assign_trade_keys([_row_values(trade) for trade in records or [] if isinstance(trade, dict)])
+        with self._write_lock, self.engine.begin() as conn:
+            before = conn.execute(select(func.count()).select_from(trades_table)).scalar()
+            if rows:
+                conn.execute(insert_new_trades, rows)
+            imported = conn.execute(select(func.count()).select_from(trades_table)).scalar() - before
+            if self._get_meta(conn, "migrated_from") is None:
+                self._set_meta(conn, "migrated_from", f"{source} at {datetime.now().isoformat()}")
+        if imported:
+            logger.info(f"Imported {imported} trade(s) into the trade store from {source}")
+        return imported
+
+    def migrate_json_file(self, filename):
+        """
+        Import the trades of a JSON trade history file (a list of trades, or {"trades": [...]}).
+
+        The file's size and modification time are recorded with the import,
+        so the file is only read again once it has changed; trades appended
+        since are then imported and the rest are skipped by their trade key.
+        A missing file is not recorded and is imported once it appears.
+        """
+        marker = f"migrated_file:{os.path.abspath(filename)}"
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return 0
+        version = {"size": stat.st_size, "mtime": stat.st_mtime}
+        with self.engine.connect() as conn:
+            recorded = self._get_meta(conn, marker)
+        if recorded is not None and {key: json.loads(recorded).get(key) for key in version} == version:
+            return 0
+
+        data = load_json_file(filename, default=[])
+        if isinstance(data, dict):
+            data = data.get("trades") or data.get("trade_history") or []
+        imported = self.migrate(data, str(filename))
+        with self.engine.begin() as conn:
+            self._set_meta(conn, marker, json.dumps({**version, "imported_at": datetime.now().isoformat()}))
+        return imported
+
+    @property
+    def migrated(self):
+        with self.engine.connect() as conn:
+            return self._get_meta(conn, "migrated_from") is not None
+
+    # Reads
+
+    def page(self, limit=DEFAULT_PAGE_SIZE, cursor=None, side=None, position_id=None, start=None, end=None):
+        """
+        Return one page of trades, newest first by trade time.
+
+        Args:
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: The next_cursor of the previous page (see decode_cursor)
+            side: Only "BUY" or "SELL" trades
+            position_id: Only trades of this position
+            start, end: ISO-8601 bounds on the trade timestamp (inclusive)
+
+        Returns:
+            (trades, next_cursor) where next_cursor is None on the last page
+        """
+        self.flush()
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        query = select(trades_table.c.id, trades_table.c.timestamp, trades_table.c.payload)
+        if cursor is not None:
+            # Rows after the cursor in (timestamp DESC, id DESC) order, as one index range
+            query = query.where(tuple_(trades_table.c.timestamp, trades_table.c.id) < decode_cursor(cursor))
+        if side:
+            query = query.where(trades_table.c.side == side)
+        if position_id:
+            query = query.where(trades_table.c.position_id == str(position_id))
+        if start:
+            query = query.where(trades_table.c.timestamp >= start)
+        if end:
+            query = query.where(trades_table.c.timestamp <= end, trades_table.c.timestamp != "")
+        query = query.order_by(trades_table.c.timestamp.desc(), trades_table.c.id.desc()).limit(limit + 1)
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        trades = [json.loads(row.payload) for row in rows]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more and rows else None
+        return trades, next_cursor
+
+    def count(self):
+        self.flush()
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(trades_table)).scalar()
@@ -0,0 +1,76 @@
+"""
+Trader Calls module
+
+This module runs blocking trader methods (exchange and OpenAI I/O, file
+access) off the asyncio event loop. Calls go through one shared, size-bounded
+thread pool, and each endpoint gets its own concurrency limit so a burst on
+one route cannot take every worker.
+"""
+
+import os
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Total number of worker threads shared by every endpoint
+MAX_WORKERS = int(os.getenv("TRADER_IO_WORKERS", "16"))
+
+# Maximum concurrent trader calls per endpoint
+DEFAULT_ENDPOINT_LIMIT = 4
+ENDPOINT_LIMITS = {
+    "market-data": 8,
+    "account-balance": 4,
+    "positions": 4,
+    "execute-trade": 2,
+    "update-position": 2,
+    "close-position": 2,
+    "trade-history": 4,
+    "profit-summary": 4,
+    "ai-analysis": 2,
+    "configure": 1,
+    "run-strategy": 2,
+    "push": 4,
+    "scheduler": 2,
+    "startup": 1,
+}
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="trader-io")
+_semaphores = {}
+
+
+def _semaphore(endpoint):
+    """Return the semaphore bounding concurrent calls for an endpoint."""
+    semaphore = _semaphores.get(endpoint)
+    if semaphore is None:
+        limit = ENDPOINT_LIMITS.get(endpoint, DEFAULT_ENDPOINT_LIMIT)
+        semaphore = _semaphores[endpoint] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+async def run_blocking(endpoint, func, *args, timeout=None, **kwargs):
+    """
+    Run a blocking callable on the shared trader I/O pool.
+
+    Args:
+        endpoint: Name of the calling endpoint, used for its concurrency limit
+        func: The blocking callable, e.g. trader.fetch_account_balance
+        timeout: Optional number of seconds before asyncio.TimeoutError is raised
+
+    Returns:
+        Whatever `func` returns; exceptions raised by `func` propagate
+    """
+    loop = asyncio.get_running_loop()
+    async with _semaphore(endpoint):
+        future = loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+        if timeout is not None:
+            return await asyncio.wait_for(future, timeout)
+        return await future
+
+
+def shutdown(wait=False):
+    """Stop accepting new calls and release the worker threads."""
+    _executor.shutdown(wait=wait)
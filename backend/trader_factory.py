@@ -5,19 +5,62 @@ This module creates BitcoinAITrader instances in a controlled way,
 completely isolated from any unwanted parameters.
 """
 
+import os
 import sys
 import logging
 from pathlib import Path
 
+from http_pool import pooled_coinbase_client, pooled_openai_client
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Base URL of the local upstream simulator (see simulator.py). When set,
+# traders send their Coinbase and OpenAI requests there instead.
+EXCHANGE_SIMULATOR_URL = os.getenv("EXCHANGE_SIMULATOR_URL")
+
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 # Import the trader class
 from btc_investor_ai_v4 import BitcoinAITrader
 
+
+def attach_shared_transport(trader_instance, simulator_url=None):
+    """
+    Send a trader's exchange and OpenAI requests through the shared HTTP pool.
+
+    The Coinbase RESTClient and OpenAI client found among the trader's
+    attributes are replaced by clients built with the same credentials and
+    settings that use the pool. With a simulator URL, Coinbase requests go
+    there unsigned and OpenAI requests to its /v1 API.
+    """
+    from coinbase.rest import RESTClient
+    from openai import OpenAI
+
+    if simulator_url:
+        simulator_url = simulator_url.rstrip("/")
+    attached = []
+    for name, client in list(vars(trader_instance).items()):
+        if isinstance(client, RESTClient):
+            setattr(trader_instance, name, pooled_coinbase_client(client, simulator_url, sign=not simulator_url))
+            attached.append(name)
+        elif isinstance(client, OpenAI):
+            openai_url = f"{simulator_url}/v1" if simulator_url else None
+            setattr(trader_instance, name, pooled_openai_client(client, openai_url))
+            # The replaced client owns its own httpx client
+            client.close()
+            attached.append(name)
+    if attached:
+        target = f"the simulator at {simulator_url}" if simulator_url else "the shared HTTP pool"
+        logger.info(f"Trader clients {', '.join(attached)} now use {target}")
+    elif simulator_url:
+        logger.warning("No exchange or OpenAI client found on the trader to point at the simulator")
+    else:
+        logger.debug("No exchange or OpenAI client found on the trader to attach to the shared HTTP pool")
+    return attached
+
+
 def create_trader(coinbase_api_key, coinbase_api_secret, openai_api_key, crypto_asset="BTC"):
     """
     Create a trader instance with EXACTLY the parameters needed.
@@ -39,6 +82,8 @@ def create_trader(coinbase_api_key, coinbase_api_secret, openai_api_key, crypto_
             crypto_asset     # Pass the crypto asset parameter
         )
         
+        attach_shared_transport(trader_instance, EXCHANGE_SIMULATOR_URL)
+        
         logger.info(f"Trader created successfully for {crypto_asset}!")
         return trader_instance
     except Exception as e:
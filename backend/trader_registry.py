@@ -0,0 +1,221 @@
+"""
+Trader Registry module
+
+This module keeps warm trader instances per (account, crypto asset) so that
+requests for non-BTC assets reuse an existing trader instead of re-reading
+the API keys file and building new exchange and OpenAI clients every time.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Traders unused for this long are dropped from the registry
+DEFAULT_IDLE_TTL = 15 * 60
+
+# Minimum seconds between two idle sweeps
+SWEEP_INTERVAL = 60
+
+
+def account_id(keys):
+    """Derive a stable, non-secret account identifier from a set of API keys."""
+    coinbase_api_key = (keys or {}).get("coinbase_api_key", "")
+    return hashlib.sha256(coinbase_api_key.encode("utf-8")).hexdigest()[:12]
+
+
+class Keyring:
+    """
+    In-memory copy of the API keys file.
+
+    The file is only re-read when its modification time changes, and keys
+    pushed through `set` (e.g. from /api/configure) are served directly.
+    """
+
+    def __init__(self, path, loader):
+        self.path = Path(path)
+        self._loader = loader
+        self._keys = None
+        self._mtime = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    @property
+    def version(self):
+        """Counter bumped every time the keys change."""
+        return self._version
+
+    def get(self):
+        """Return the current keys, reloading them if the file changed on disk."""
+        mtime = self._file_mtime()
+        with self._lock:
+            if mtime != self._mtime:
+                self._mtime = mtime
+                keys = self._loader() if mtime is not None else None
+                if keys != self._keys:
+                    self._keys = keys
+                    self._version += 1
+            return self._keys
+
+    def set(self, keys):
+        """Replace the keys after they were written to disk."""
+        with self._lock:
+            self._mtime = self._file_mtime()
+            if keys != self._keys:
+                self._keys = dict(keys)
+                self._version += 1
+
+
+class _Entry:
+    __slots__ = ("trader", "last_used")
+
+    def __init__(self, trader):
+        self.trader = trader
+        self.last_used = time.monotonic()
+
+
+class TraderRegistry:
+    """
+    Pool of trader instances keyed by (account, crypto_asset).
+
+    Instances are built lazily through `factory` on first use, reused for
+    every following request and dropped when the keyring changes or when
+    they have been idle for longer than `idle_ttl` seconds. Assets listed
+    in `pinned` are never evicted for being idle. A trader whose build was
+    overtaken by an invalidation is discarded and built again.
+    """
+
+    def __init__(self, keyring, factory, idle_ttl=DEFAULT_IDLE_TTL, pinned=("BTC",)):
+        self.keyring = keyring
+        self.factory = factory
+        self.idle_ttl = idle_ttl
+        self.pinned = set(pinned)
+        self._entries = {}
+        self._build_locks = {}
+        self._keys_version = None
+        # Bumped whenever every trader is dropped, so builds in progress are not registered
+        self._generation = 0
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _sync_keys(self):
+        """Drop every instance if the keys changed since they were built."""
+        keys = self.keyring.get()
+        with self._lock:
+            if self.keyring.version != self._keys_version:
+                if self._entries:
+                    logger.info(f"API keys changed - dropping {len(self._entries)} cached trader(s)")
+                self._entries.clear()
+                self._build_locks.clear()
+                self._generation += 1
+                self._keys_version = self.keyring.version
+        return keys
+
+    def get(self, crypto_asset="BTC"):
+        """Return a warm trader for `crypto_asset`, building it on first use."""
+        while True:
+            keys = self._sync_keys()
+            if not keys:
+                return None
+
+            self.evict_idle()
+
+            key = (account_id(keys), crypto_asset)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.last_used = time.monotonic()
+                    return entry.trader
+                build_lock = self._build_locks.setdefault(key, threading.Lock())
+                generation = self._generation
+
+            trader, current = self._build(key, keys, crypto_asset, build_lock, generation)
+            if current:
+                return trader
+            logger.info(f"Traders were invalidated while building {crypto_asset} - building it again")
+
+    def _build(self, key, keys, crypto_asset, build_lock, generation):
+        """Build the trader for `key`; returns (trader, current), current False if invalidated since `generation`."""
+        # Build outside the registry lock so other assets are not blocked,
+        # while concurrent callers for the same key wait for a single build
+        with build_lock:
+            with self._lock:
+                if self._generation != generation:
+                    return None, False
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.last_used = time.monotonic()
+                    return entry.trader, True
+
+            logger.info(f"Building trader for {crypto_asset} (account {key[0]})")
+            trader = self.factory(
+                coinbase_api_key=keys.get("coinbase_api_key", ""),
+                coinbase_api_secret=keys.get("coinbase_api_secret", ""),
+                openai_api_key=keys.get("openai_api_key", ""),
+                crypto_asset=crypto_asset
+            )
+            if trader is None:
+                return None, True
+
+            with self._lock:
+                if self._generation != generation:
+                    # Built with keys or state that were dropped meanwhile
+                    return None, False
+                self._entries[key] = _Entry(trader)
+            return trader, True
+
+    def put(self, crypto_asset, trader):
+        """Register an already-built trader for the current keys."""
+        keys = self._sync_keys()
+        if not keys or trader is None:
+            return
+        with self._lock:
+            self._entries[(account_id(keys), crypto_asset)] = _Entry(trader)
+
+    def invalidate(self):
+        """Drop every cached trader; traders still being built are discarded."""
+        with self._lock:
+            self._entries.clear()
+            self._build_locks.clear()
+            self._generation += 1
+
+    def evict_idle(self, force=False):
+        """Drop unpinned traders idle for longer than `idle_ttl`."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_sweep < SWEEP_INTERVAL:
+                return 0
+            self._last_sweep = now
+            expired = [
+                key for key, entry in self._entries.items()
+                if key[1] not in self.pinned and now - entry.last_used > self.idle_ttl
+            ]
+            for key in expired:
+                del self._entries[key]
+                self._build_locks.pop(key, None)
+        if expired:
+            logger.info(f"Evicted {len(expired)} idle trader(s): {', '.join(k[1] for k in expired)}")
+        return len(expired)
+
+    def stats(self):
+        """Return a small summary of the registry contents."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "traders": [
+                    {"account": key[0], "crypto_asset": key[1], "idle_seconds": round(now - entry.last_used, 1)}
+                    for key, entry in self._entries.items()
+                ]
+            }
@@ -1,6 +1,7 @@
 import os
 import json
-from datetime import datetime
+import numpy as np
+from datetime import datetime, timezone
 from pathlib import Path
 
 def load_json_file(filename, default=None):
@@ -39,6 +40,66 @@ def calculate_profit_loss(entry_price, current_price, size, is_long=True):
     else:
         return (entry_price - current_price) * size
 
+def _trade_time(trade):
+    """Return a trade's timestamp as a datetime, or None if it has none or it cannot be parsed."""
+    value = trade.get("timestamp") or trade.get("time")
+    try:
+        if isinstance(value, (int, float)):
+            value = datetime.fromtimestamp(value)
+        elif not isinstance(value, datetime):
+            value = datetime.fromisoformat(str(value))
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+    # Compare zone-aware times as naive UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def trades_in_time_order(trade_history):
+    """
+    Return the trades oldest first, whatever order the history was read in.
+
+    The sort is stable, so trades logged within the same timestamp keep
+    their order. A history with untimed trades is returned as given.
+    """
+    trades = list(trade_history or [])
+    times = [_trade_time(trade) for trade in trades]
+    if any(time is None for time in times):
+        return trades
+    return [trade for _, _, trade in sorted(zip(times, range(len(trades)), trades), key=lambda item: item[:2])]
+
+def recorded_trade_profit(trade):
+    """Return the profit the trader recorded with a trade (profit_amount or profit), or None."""
+    for key in ("profit_amount", "profit"):
+        if trade.get(key) is not None:
+            return trade[key]
+    return None
+
+def realized_trade_profit(trade, entries):
+    """
+    Realized profit of one trade record, applied to a history oldest first.
+
+    A SELL uses the profit the trader recorded with it when there is one,
+    otherwise it is priced against the size-weighted entry price of its
+    position's earlier BUY trades. BUY trades are added to `entries`
+    ({position_id: [cost, size]}) and realize nothing.
+    """
+    side = trade.get("side")
+    if side == "BUY":
+        size = trade.get("size", 0) or 0
+        entry = entries.setdefault(trade.get("position_id"), [0.0, 0.0])
+        entry[0] += (trade.get("price", 0) or 0) * size
+        entry[1] += size
+        return 0
+    if side != "SELL":
+        return 0
+    recorded = recorded_trade_profit(trade)
+    if recorded is not None:
+        return recorded
+    entry = entries.get(trade.get("position_id"))
+    if not entry or entry[1] <= 0 or not trade.get("price"):
+        # Sells without a logged buy have no entry price to be priced against
+        return 0
+    return calculate_profit_loss(entry[0] / entry[1], trade["price"], trade.get("size", 0) or 0)
+
 def calculate_profit_loss_percentage(entry_price, current_price, is_long=True):
     """Calculate profit/loss percentage for a position."""
     if is_long:
@@ -88,6 +149,105 @@ def calculate_position_risk(position, current_price):
     risk = abs(current_price - position['stop_loss']) / current_price * 100
     return risk
 
+def trades_to_arrays(trades):
+    """
+    Load a list of trade dicts into NumPy arrays in a single pass.
+
+    Returns:
+        Dictionary with float arrays entry_price, exit_price and size, a
+        boolean is_long array and a boolean closed array (trades that have
+        an exit price). Fields of open trades are NaN.
+    """
+    nan = float('nan')
+    entry, exit_, size, is_long, closed, has_entry = [], [], [], [], [], []
+
+    for t in trades:
+        is_long.append(t.get('side', 'BUY') == 'BUY')
+        if 'exit_price' in t:
+            # Closed trades need both fields, like calculate_profit_loss does
+            entry.append(t['entry_price'])
+            exit_.append(t['exit_price'])
+            size.append(t['size'])
+            closed.append(True)
+            has_entry.append(True)
+        else:
+            entry.append(t.get('entry_price', nan))
+            exit_.append(nan)
+            size.append(nan)
+            closed.append(False)
+            has_entry.append('entry_price' in t)
+
+    return {
+        "entry_price": np.array(entry, dtype=float),
+        "exit_price": np.array(exit_, dtype=float),
+        "size": np.array(size, dtype=float),
+        "is_long": np.array(is_long, dtype=bool),
+        "closed": np.array(closed, dtype=bool),
+        "has_entry": np.array(has_entry, dtype=bool),
+    }
+
+def _seq_sum(values):
+    """Sum left to right like the built-in sum(), so totals match it exactly."""
+    return sum(values.tolist())
+
+def calculate_performance_metrics(trades):
+    """
+    Compute every performance metric from one array load of the trades.
+
+    Gives the same results as the per-trade helpers (is_successful_trade,
+    calculate_profit_loss, ...) and adds profit factor, expectancy, max
+    drawdown and a per-trade Sharpe ratio over closed trades.
+    """
+    arrays = trades_to_arrays(trades)
+    entry = arrays["entry_price"]
+    exit_ = arrays["exit_price"]
+    size = arrays["size"]
+    is_long = arrays["is_long"]
+    closed = arrays["closed"]
+
+    # Same operation order as calculate_profit_loss(_percentage)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        diff = np.where(is_long, exit_ - entry, entry - exit_)
+        pl = diff * size
+        pl_pct = diff / entry * 100
+
+    winning = closed & arrays["has_entry"] & (pl_pct > 0)
+    losing = closed & ~winning
+
+    win_pl = pl[winning]
+    loss_pl = pl[losing]
+    closed_pl = pl[closed]
+    n_trades = len(trades)
+
+    gross_profit = _seq_sum(closed_pl[closed_pl > 0])
+    gross_loss = _seq_sum(closed_pl[closed_pl < 0])
+
+    # Equity curve of realized P&L in trade order, starting from zero
+    equity = np.cumsum(closed_pl)
+    peaks = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+    max_drawdown = float((peaks - equity).max()) if len(equity) else 0
+
+    closed_pct = pl_pct[closed]
+    sharpe = None
+    if len(closed_pct) > 1:
+        std = closed_pct.std(ddof=1)
+        if std > 0:
+            sharpe = float(closed_pct.mean() / std)
+
+    return {
+        "total_trades": n_trades,
+        "win_rate": len(win_pl) / n_trades * 100 if n_trades else 0,
+        "profit_loss": _seq_sum(closed_pl),
+        "avg_profit_per_trade": _seq_sum(win_pl) / len(win_pl) if len(win_pl) else 0,
+        "avg_loss_per_trade": _seq_sum(loss_pl) / len(loss_pl) if len(loss_pl) else 0,
+        "max_profit": win_pl.max().item() if len(win_pl) else 0,
+        "max_loss": loss_pl.min().item() if len(loss_pl) else 0,
+        "profit_factor": gross_profit / -gross_loss if gross_loss < 0 else None,
+        "expectancy": _seq_sum(closed_pl) / len(closed_pl) if len(closed_pl) else 0,
+        "max_drawdown": max_drawdown,
+        "sharpe_ratio": sharpe,
+    }
+
 def get_performance_summary(trades):
     """Get a summary of trading performance."""
     if not trades:
@@ -99,85 +259,23 @@ def get_performance_summary(trades):
             "avg_loss_per_trade": 0,
             "max_profit": 0,
             "max_loss": 0,
+            "profit_factor": None,
+            "expectancy": 0,
+            "max_drawdown": 0,
+            "sharpe_ratio": None,
         }
-    
-    winning_trades = [t for t in trades if is_successful_trade(t)]
-    losing_trades = [t for t in trades if not is_successful_trade(t) and 'exit_price' in t]
-    
-    total_pl = sum(
-        calculate_profit_loss(
-            t['entry_price'], 
-            t['exit_price'],
-            t['size'],
-            t.get('side', 'BUY') == 'BUY'
-        ) 
-        for t in trades if 'exit_price' in t
-    )
-    
-    avg_profit = (
-        sum(
-            calculate_profit_loss(
-                t['entry_price'], 
-                t['exit_price'],
-                t['size'],
-                t.get('side', 'BUY') == 'BUY'
-            ) 
-            for t in winning_trades
-        ) / len(winning_trades)
-    ) if winning_trades else 0
-    
-    avg_loss = (
-        sum(
-            calculate_profit_loss(
-                t['entry_price'], 
-                t['exit_price'],
-                t['size'],
-                t.get('side', 'BUY') == 'BUY'
-            ) 
-            for t in losing_trades
-        ) / len(losing_trades)
-    ) if losing_trades else 0
-    
-    max_profit = max(
-        [
-            calculate_profit_loss(
-                t['entry_price'], 
-                t['exit_price'],
-                t['size'],
-                t.get('side', 'BUY') == 'BUY'
-            )
-            for t in winning_trades
-        ] or [0]
-    )
-    
-    max_loss = min(
-        [
-            calculate_profit_loss(
-                t['entry_price'], 
-                t['exit_price'],
-                t['size'],
-                t.get('side', 'BUY') == 'BUY'
-            )
-            for t in losing_trades
-        ] or [0]
-    )
-    
-    return {
-        "total_trades": len(trades),
-        "win_rate": len(winning_trades) / len(trades) * 100 if trades else 0,
-        "profit_loss": total_pl,
-        "avg_profit_per_trade": avg_profit,
-        "avg_loss_per_trade": avg_loss,
-        "max_profit": max_profit,
-        "max_loss": max_loss,
-    }
+
+    return calculate_performance_metrics(trades)
 
 def calculate_total_profit_summary(trade_history, active_positions, current_price):
     """
     Calculate both realized and unrealized profit.
     
+    Sells realize the profit recorded with them; sells logged without one
+    are priced against their position's earlier buys (see realized_trade_profit).
+    
     Args:
-        trade_history: List of trade history entries
+        trade_history: List of trade history entries, in any order
         active_positions: List of active positions
         current_price: Current BTC price
         
@@ -201,9 +299,11 @@ def calculate_total_profit_summary(trade_history, active_positions, current_pric
     # Calculate realized profit from trade history
     closed_positions = set()
     total_investment = 0
+    entries = {}
     
     # First pass: calculate total investment and identify closed positions
-    for trade in trade_history:
+    for trade in trades_in_time_order(trade_history):
+        summary["realized_profit"] += realized_trade_profit(trade, entries)
         if trade.get("side") == "BUY":
             price = trade.get("price", 0)
             size = trade.get("size", 0)
@@ -212,8 +312,6 @@ def calculate_total_profit_summary(trade_history, active_positions, current_pric
         elif trade.get("side") == "SELL":
             summary["total_sell_volume"] += trade.get("size", 0)
             closed_positions.add(trade.get("position_id"))
-            if "profit_amount" in trade:
-                summary["realized_profit"] += trade["profit_amount"]
     
     summary["closed_positions_count"] = len(closed_positions)
     
@@ -2,6 +2,9 @@ import React, { useState, useEffect } from 'react';
 import { formatPrice, formatPercentage, formatBtcAmount } from '../lib/utils';
 import bitcoinApi from '../lib/api';
 
+// Profit is pushed every 15s; poll if the socket stays quiet for longer than this
+const PROFIT_PUSH_TIMEOUT = 45000;
+
 const ProfitSummary = () => {
   const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -28,9 +31,75 @@ const ProfitSummary = () => {
     };
 
     fetchProfitSummary();
-    // Refresh every 60 seconds
-    const interval = setInterval(fetchProfitSummary, 60000);
-    return () => clearInterval(interval);
+
+    // Receive profit updates over the WebSocket; poll only while it is down or quiet
+    let interval = null;
+    let pushTimeout = null;
+    const startPolling = () => {
+      if (!interval) {
+        interval = setInterval(fetchProfitSummary, 60000);
+      }
+    };
+    const stopPolling = () => {
+      if (interval) {
+        clearInterval(interval);
+        interval = null;
+      }
+    };
+
+    const expectPush = () => {
+      clearTimeout(pushTimeout);
+      pushTimeout = setTimeout(startPolling, PROFIT_PUSH_TIMEOUT);
+    };
+    const handleDown = () => {
+      clearTimeout(pushTimeout);
+      startPolling();
+    };
+
+    const handleOpen = () => {
+      // The socket starts with the default topics; this panel only needs profit
+      ws.send(JSON.stringify({ action: 'unsubscribe', topics: ['price:BTC', 'positions', 'balance'] }));
+      ws.send(JSON.stringify({ action: 'subscribe', topics: ['profit'] }));
+      expectPush();
+    };
+    const handleMessage = (event) => {
+      try {
+        const message = JSON.parse(event.data);
+        if (message.topic === 'profit') {
+          stopPolling();
+          expectPush();
+          setSummary(message.data);
+          setError(null);
+        }
+      } catch (err) {
+        console.error('Error parsing profit update:', err);
+      }
+    };
+
+    let ws = null;
+    if (typeof window !== 'undefined' && 'WebSocket' in window) {
+      ws = bitcoinApi.connectWebSocket();
+      ws.addEventListener('open', handleOpen);
+      ws.addEventListener('message', handleMessage);
+      ws.addEventListener('close', handleDown);
+      ws.addEventListener('error', handleDown);
+      // The socket may already be open, in which case 'open' never fires
+      if (ws.readyState === WebSocket.OPEN) {
+        handleOpen();
+      }
+    } else {
+      startPolling();
+    }
+
+    return () => {
+      stopPolling();
+      clearTimeout(pushTimeout);
+      if (ws) {
+        ws.removeEventListener('close', handleDown);
+        ws.removeEventListener('error', handleDown);
+        ws.close();
+      }
+    };
   }, []);
 
   if (loading) {